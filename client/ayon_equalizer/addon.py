@@ -21,10 +21,38 @@ class EqualizerAddon(AYONAddon, IHostAddon):
     host_name = "equalizer"
     version = __version__
     heartbeat = 100
+    heartbeat_mode = "fixed"
+    heartbeat_idle_interval = 500
+    heartbeat_budget = 0
+    heartbeat_stats = False
+    task_budget = 20
+    tools_mode = "host"
+    command_server = False
+    command_server_port = 0
+    background_publish = False
+    extract_cache = False
+    extract_cache_size = 1024
+    metadata_format = "json"
+    metadata_storage = "notes"
 
     def initialize(self, settings: dict[str, Any]) -> None:
         """Initialize Equalizer Addon."""
         self.heartbeat = settings["equalizer"]["heartbeat_interval"]
+        self.heartbeat_mode = settings["equalizer"]["heartbeat_mode"]
+        self.heartbeat_idle_interval = settings["equalizer"][
+            "heartbeat_idle_interval"]
+        self.heartbeat_budget = settings["equalizer"]["heartbeat_budget"]
+        self.heartbeat_stats = settings["equalizer"]["heartbeat_stats"]
+        self.task_budget = settings["equalizer"]["task_budget"]
+        self.tools_mode = settings["equalizer"]["tools_mode"]
+        self.command_server = settings["equalizer"]["command_server"]
+        self.command_server_port = settings["equalizer"][
+            "command_server_port"]
+        self.background_publish = settings["equalizer"]["background_publish"]
+        self.extract_cache = settings["equalizer"]["extract_cache"]
+        self.extract_cache_size = settings["equalizer"]["extract_cache_size"]
+        self.metadata_format = settings["equalizer"]["metadata_format"]
+        self.metadata_storage = settings["equalizer"]["metadata_storage"]
         self.enabled = True
 
     def add_implementation_envs(self, env: dict, _app: Any) -> None:  # noqa: ANN401
@@ -48,6 +76,21 @@ class EqualizerAddon(AYONAddon, IHostAddon):
 
         env["PYTHON_CUSTOM_SCRIPTS_3DE4"] = startup_path
         env["AYON_TDE4_HEARTBEAT_INTERVAL"] = str(self.heartbeat)
+        env["AYON_TDE4_HEARTBEAT_MODE"] = self.heartbeat_mode
+        env["AYON_TDE4_HEARTBEAT_IDLE_INTERVAL"] = str(
+            self.heartbeat_idle_interval)
+        env["AYON_TDE4_HEARTBEAT_BUDGET"] = str(self.heartbeat_budget)
+        env["AYON_TDE4_HEARTBEAT_STATS"] = "1" if self.heartbeat_stats else "0"
+        env["AYON_TDE4_TASK_BUDGET"] = str(self.task_budget)
+        env["AYON_TDE4_TOOLS_MODE"] = self.tools_mode
+        env["AYON_TDE4_COMMAND_SERVER"] = "1" if self.command_server else "0"
+        env["AYON_TDE4_COMMAND_SERVER_PORT"] = str(self.command_server_port)
+        env["AYON_TDE4_BACKGROUND_PUBLISH"] = (
+            "1" if self.background_publish else "0")
+        env["AYON_TDE4_EXTRACT_CACHE"] = "1" if self.extract_cache else "0"
+        env["AYON_TDE4_EXTRACT_CACHE_SIZE"] = str(self.extract_cache_size)
+        env["AYON_TDE4_METADATA_FORMAT"] = self.metadata_format
+        env["AYON_TDE4_METADATA_STORAGE"] = self.metadata_storage
 
     def get_launch_hook_paths(self) -> list[str]:
         """Get paths to launch hooks."""
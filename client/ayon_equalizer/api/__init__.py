@@ -1,12 +1,13 @@
 """API for the Equalizer plugin."""
 from .host import EqualizerHost
 from .pipeline import Container, maintained_model_selection
-from .plugin import EqualizerCreator, ExtractScriptBase
+from .plugin import EqualizerCreator, ExtractCacheMixin, ExtractScriptBase
 
 __all__ = [
     "Container",
     "EqualizerCreator",
     "EqualizerHost",
+    "ExtractCacheMixin",
     "ExtractScriptBase",
     "maintained_model_selection",
 ]
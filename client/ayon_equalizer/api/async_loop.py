@@ -0,0 +1,153 @@
+"""asyncio event loop stepped from the 3DEqualizer heartbeat.
+
+3DEqualizer doesn't provide any event loop other than its timer
+callback, so the host runs its own asyncio loop and runs one iteration
+of it on every heartbeat. Coroutines and blocking functions running in
+the executor can wait for AYON server while 3DEqualizer keeps working.
+
+Done callbacks are always called from the heartbeat on the main thread,
+so they can safely use `tde4`.
+
+Example:
+    >>> def on_done(result, error):
+    ...     if error is None:
+    ...         tde4.setCameraName(camera, result["name"])
+    >>> host.run_in_executor(
+    ...     ayon_api.get_representation_by_id,
+    ...     project_name, representation_id,
+    ...     on_done=on_done)
+
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+log = logging.getLogger(__name__)
+
+DoneCallback = Callable[[Any, Optional[BaseException]], None]
+
+
+class AsyncLoop:
+    """asyncio event loop advanced by `step`."""
+
+    def __init__(self) -> None:
+        """Initialize loop."""
+        self.loop = asyncio.new_event_loop()
+        self._pending: set[asyncio.Future] = set()
+
+    def step(self) -> bool:
+        """Run one iteration of the loop.
+
+        Only callbacks which are ready are run, the loop doesn't wait
+        for any I/O.
+
+        Returns:
+            bool: Whether there are unfinished futures.
+
+        """
+        if self.loop.is_closed():
+            return False
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        return bool(self._pending)
+
+    def run(
+            self,
+            awaitable: Awaitable,
+            on_done: Optional[DoneCallback] = None,
+    ) -> asyncio.Future:
+        """Run coroutine or future in the loop.
+
+        Args:
+            awaitable (Awaitable): Coroutine or future to run.
+            on_done (Optional[DoneCallback]): Called on the main thread
+                with the result and the exception, one of them is None.
+
+        Returns:
+            asyncio.Future: Future of the result.
+
+        """
+        future = asyncio.ensure_future(awaitable, loop=self.loop)
+        self._track(future, on_done)
+        return future
+
+    def run_in_executor(
+            self,
+            func: Callable[..., Any],
+            *args: Any,  # noqa: ANN401
+            on_done: Optional[DoneCallback] = None,
+    ) -> asyncio.Future:
+        """Run blocking function in a worker thread.
+
+        Function must not use `tde4`, use `on_done` callback to apply
+        its result to the scene.
+
+        Args:
+            func (Callable[..., Any]): Function to run.
+            *args (Any): Arguments of the function.
+            on_done (Optional[DoneCallback]): Called on the main thread
+                with the result and the exception, one of them is None.
+
+        Returns:
+            asyncio.Future: Future of the result.
+
+        """
+        future = self.loop.run_in_executor(None, func, *args)
+        self._track(future, on_done)
+        return future
+
+    def call_in_main_thread(
+            self,
+            func: Callable[..., Any],
+            *args: Any,  # noqa: ANN401
+    ) -> None:
+        """Call function on the main thread on the next heartbeat.
+
+        Can be called from any thread.
+
+        Args:
+            func (Callable[..., Any]): Function to call.
+            *args (Any): Arguments of the function.
+
+        """
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def close(self) -> None:
+        """Cancel unfinished futures and close the loop."""
+        if self.loop.is_closed():
+            return
+        for future in tuple(self._pending):
+            future.cancel()
+        # let cancelled coroutines run their cleanup
+        self.step()
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+
+    def _track(
+            self,
+            future: asyncio.Future,
+            on_done: Optional[DoneCallback],
+    ) -> None:
+        """Keep reference to the future and call `on_done` when done."""
+        self._pending.add(future)
+
+        def _done(done_future: asyncio.Future) -> None:
+            self._pending.discard(done_future)
+            if on_done is None:
+                return
+            if done_future.cancelled():
+                on_done(None, asyncio.CancelledError())
+                return
+            error = done_future.exception()
+            result = None if error is not None else done_future.result()
+            try:
+                on_done(result, error)
+            except Exception:
+                log.exception("Done callback %s failed", on_done)
+
+        future.add_done_callback(_done)
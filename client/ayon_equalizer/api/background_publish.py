@@ -0,0 +1,296 @@
+"""Integration of published files in a background process.
+
+Collectors, validators and extractors need `tde4`, so they must run in
+3DEqualizer. Integration only copies extracted files and talks to AYON
+server, which can take a long time for big files or slow connection.
+
+With background publishing enabled, instances are marked as processed
+on farm, so integrators in 3DEqualizer skip them. Data of the instances
+are written to a JSON file in the format used by farm publishing and
+integrated by `ayon addon core publish` started as separate process.
+3DEqualizer polls the process from the heartbeat, so the artist can
+work while the files are transferred.
+
+The process reports processed plugins and errors to a progress file
+read on every poll, see `plugins/background_publish`. Directory with
+the metadata, log and progress files can be removed when the publish
+succeeds, after a failure it is kept until 3DEqualizer exits, so
+the log can be inspected.
+
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import shutil
+import subprocess
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ayon_equalizer import EQUALIZER_HOST_DIR
+
+if TYPE_CHECKING:
+    import pyblish.api
+
+PUBLISH_STATE_RUNNING = "running"
+PUBLISH_STATE_DONE = "done"
+PUBLISH_STATE_FAILED = "failed"
+
+# instance data needed by integration, the rest is either not JSON
+# serializable or valid only in 3DEqualizer
+INSTANCE_KEYS = (
+    "productName",
+    "productType",
+    "productBaseType",
+    "family",
+    "families",
+    "folderPath",
+    "task",
+    "variant",
+    "label",
+    "version",
+    "frameStart",
+    "frameEnd",
+    "handleStart",
+    "handleEnd",
+    "fps",
+    "comment",
+)
+# environment defining context of the publish
+SESSION_ENV_KEYS = (
+    "AYON_PROJECT_NAME",
+    "AYON_FOLDER_PATH",
+    "AYON_TASK_NAME",
+    "AYON_WORKDIR",
+)
+# plugins added to the publish process
+PROGRESS_PLUGIN_PATH = os.path.join(
+    EQUALIZER_HOST_DIR, "plugins", "background_publish")
+REPRESENTATION_KEYS = (
+    "name",
+    "ext",
+    "files",
+    "stagingDir",
+    "outputName",
+    "tags",
+)
+
+log = logging.getLogger(__name__)
+
+
+def get_instance_data(instance: pyblish.api.Instance) -> dict[str, Any]:
+    """Get data of the instance needed to integrate it.
+
+    Args:
+        instance (pyblish.api.Instance): Extracted instance.
+
+    Returns:
+        dict[str, Any]: JSON serializable data of the instance.
+
+    """
+    data = {
+        key: instance.data[key]
+        for key in INSTANCE_KEYS
+        if key in instance.data
+    }
+    data["representations"] = [
+        {key: repre[key] for key in REPRESENTATION_KEYS if key in repre}
+        for repre in instance.data.get("representations", [])
+    ]
+    # files are integrated only once, worker can remove them
+    data["stagingDir_persistent"] = False
+    return data
+
+
+def write_publish_metadata(
+        context: pyblish.api.Context,
+        instances: list[pyblish.api.Instance],
+        path: str,
+) -> None:
+    """Write instances to JSON file read by farm publishing.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+        instances (list[pyblish.api.Instance]): Extracted instances.
+        path (str): Path to the JSON file.
+
+    """
+    metadata = {
+        "user": context.data.get("user"),
+        "comment": context.data.get("comment", ""),
+        "version": context.data.get("version"),
+        "job": {},
+        "session": {
+            key: value
+            for key, value in os.environ.items()
+            if key in SESSION_ENV_KEYS
+        },
+        "instances": [get_instance_data(instance) for instance in instances],
+    }
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(metadata, stream, indent=4)
+
+
+class BackgroundPublish:
+    """Integration running in separate process.
+
+    Args:
+        metadata_path (str): Path to JSON file with the instances.
+        on_done (Optional[Callable[[BackgroundPublish], None]]): Called
+            when the process finished.
+        on_progress (Optional[Callable[[BackgroundPublish], None]]):
+            Called when the process reported progress.
+        remove_dir (bool): Remove directory of the metadata file when
+            the publish ends. It must be created only for the publish.
+
+    """
+
+    def __init__(
+            self,
+            metadata_path: str,
+            on_done: Optional[Callable[[BackgroundPublish], None]] = None,
+            on_progress: Optional[Callable[[BackgroundPublish], None]] = None,
+            *,
+            remove_dir: bool = False,
+    ) -> None:
+        """Initialize publish."""
+        self.metadata_path = metadata_path
+        base_path = os.path.splitext(metadata_path)[0]
+        self.log_path = f"{base_path}.log"
+        self.progress_path = f"{base_path}.progress.json"
+        self.state = PUBLISH_STATE_RUNNING
+        self.returncode: Optional[int] = None
+        self.progress: dict[str, Any] = {}
+        self.remove_dir = remove_dir
+        self._on_done = on_done
+        self._on_progress = on_progress
+        self._progress_stamp: Optional[tuple[int, int]] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    def __repr__(self) -> str:
+        """Return representation of the publish."""
+        return f"<BackgroundPublish {self.metadata_path!r} {self.state}>"
+
+    @property
+    def finished(self) -> bool:
+        """Whether the process ended."""
+        return self.state != PUBLISH_STATE_RUNNING
+
+    @property
+    def errors(self) -> list[dict]:
+        """Errors reported by the process, with plugin and message."""
+        return self.progress.get("errors", [])
+
+    def start(self) -> None:
+        """Start publish process of AYON launcher.
+
+        Output of the process is written to `log_path`.
+        """
+        env = os.environ.copy()
+        env.pop("PYTHONHOME", None)
+        env["AYON_TDE4_PUBLISH_PROGRESS"] = self.progress_path
+        env["PYBLISH_PLUGINPATH"] = os.pathsep.join(
+            path
+            for path in (PROGRESS_PLUGIN_PATH, env.get("PYBLISH_PLUGINPATH"))
+            if path
+        )
+        args = [
+            os.environ["AYON_EXECUTABLE"],
+            "addon", "core", "publish", self.metadata_path,
+        ]
+        with open(self.log_path, "wb") as stream:
+            self._process = subprocess.Popen(
+                args, env=env, stdout=stream, stderr=subprocess.STDOUT)
+        log.info("Integrating in background, log: %s", self.log_path)
+
+    def poll(self) -> bool:
+        """Check state and progress of the process.
+
+        Returns:
+            bool: Whether the process is still running.
+
+        """
+        if self.finished or self._process is None:
+            return False
+        returncode = self._process.poll()
+        # read after the process state, so the final progress is read
+        # for finished process
+        if self._read_progress() and self._on_progress is not None:
+            self._on_progress(self)
+        if returncode is None:
+            return True
+
+        self.returncode = returncode
+        if returncode == 0 and not self.errors:
+            self.state = PUBLISH_STATE_DONE
+            log.info("Background publish finished: %s", self.metadata_path)
+        else:
+            self.state = PUBLISH_STATE_FAILED
+            log.error(
+                "Background publish failed with code %s, see %s",
+                returncode, self.log_path)
+            for error in self.errors:
+                log.error("%s: %s", error["plugin"], error["message"])
+        if self._on_done is not None:
+            self._on_done(self)
+        if self.remove_dir:
+            if self.state == PUBLISH_STATE_DONE:
+                self.remove_files()
+            else:
+                atexit.register(self.remove_files)
+        return False
+
+    def _read_progress(self) -> bool:
+        """Read progress file if it changed since the last poll.
+
+        Returns:
+            bool: Whether the progress changed.
+
+        """
+        try:
+            stat = os.stat(self.progress_path)
+        except OSError:
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._progress_stamp:
+            return False
+        try:
+            with open(self.progress_path, encoding="utf-8") as stream:
+                progress = json.load(stream)
+        except (OSError, ValueError):
+            return False
+        self._progress_stamp = stamp
+        if progress == self.progress:
+            return False
+        if progress.get("plugin") != self.progress.get("plugin"):
+            log.info("Background publish: %s", progress.get("plugin"))
+        self.progress = progress
+        return True
+
+    def get_report(self) -> str:
+        """Get message describing result of the publish for the artist."""
+        if self.state == PUBLISH_STATE_RUNNING:
+            return f"Integrating: {self.progress.get('plugin', '')}"
+        if self.state == PUBLISH_STATE_DONE:
+            return "Published files were integrated."
+        lines = ["Integration of published files failed."]
+        lines.extend(
+            f"{error['plugin']}: {error['message']}" for error in self.errors)
+        lines.append(f"See log: {self.log_path}")
+        return "\n".join(lines)
+
+    def remove_files(self) -> None:
+        """Remove directory of the metadata file."""
+        shutil.rmtree(
+            os.path.dirname(self.metadata_path), ignore_errors=True)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get state of the publish, e.g. for tools in other process."""
+        return {
+            "metadata_path": self.metadata_path,
+            "log_path": self.log_path,
+            "state": self.state,
+            "returncode": self.returncode,
+            "progress": self.progress,
+        }
@@ -0,0 +1,353 @@
+"""Local command server running inside 3DEqualizer.
+
+Server listens on a localhost TCP socket and is polled from
+the heartbeat, so all commands are executed on the main thread where
+`tde4` can be used. If there is no connection or data, poll returns
+immediately.
+
+Clients usually send a request only after they received the answer to
+the previous one. To not make each of such calls wait for the next
+heartbeat tick, poll keeps waiting shortly for further requests of
+active clients until its time budget is used.
+
+Protocol is line based JSON-RPC 2.0. First line sent by a client must
+be the token the server was created with, connections sending anything
+else are closed. Each following line is a request::
+
+    {"jsonrpc": "2.0", "id": 1, "method": "tde4.getCameraList",
+     "params": []}
+
+and the server answers with a line containing either `result` or
+`error` with the same `id`. A line can contain a batch, a list of
+requests, answered by a list of responses in a single line, so many
+values can be queried in one round-trip.
+
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import secrets
+import select
+import socket
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+# don't block 3DEqualizer by too many requests in a single poll
+MAX_REQUESTS_PER_POLL = 1000
+# time in milliseconds a poll can spend processing requests
+POLL_BUDGET = 50
+# time in milliseconds to wait for the next request of an active client
+REQUEST_WAIT = 5
+
+log = logging.getLogger(__name__)
+
+
+class CommandError(Exception):
+    """Error returned to the client."""
+
+    def __init__(self, code: int, message: str) -> None:
+        """Initialize error."""
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class _Client:
+    """Connected client with its buffers."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.socket = sock
+        self.authenticated = False
+        self.incoming = b""
+        self.outgoing = b""
+
+
+class CommandServer:
+    """Non-blocking JSON-RPC server polled from the main thread.
+
+    Args:
+        token (Optional[str]): Token clients have to send first. Random
+            token is generated if not passed.
+        host (str): Address to listen on.
+        port (int): Port to listen on, zero picks a free port.
+        encoder (Optional[type[json.JSONEncoder]]): Encoder used for
+            results.
+        budget (int): Time in milliseconds a single poll can spend
+            processing requests.
+
+    """
+
+    def __init__(
+            self,
+            token: Optional[str] = None,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            encoder: Optional[type[json.JSONEncoder]] = None,
+            budget: int = POLL_BUDGET,
+    ) -> None:
+        """Initialize server."""
+        self.token = token or secrets.token_hex(16)
+        self.encoder = encoder
+        self.budget = budget
+        self._handlers: dict[str, Callable[..., Any]] = {}
+        self._namespaces: dict[str, ModuleType] = {}
+        self._clients: list[_Client] = []
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind((host, port))
+        self._socket.listen()
+        self._socket.setblocking(False)  # noqa: FBT003
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the server listens on."""
+        return self._socket.getsockname()[:2]
+
+    def register(self, name: str, handler: Callable[..., Any]) -> None:
+        """Register command.
+
+        Args:
+            name (str): Name of the command.
+            handler (Callable[..., Any]): Function called with params of
+                the request, positional for list and keyword for dict.
+
+        """
+        self._handlers[name] = handler
+
+    def register_namespace(self, prefix: str, namespace: ModuleType) -> None:
+        """Expose all public functions of a module.
+
+        Args:
+            prefix (str): Prefix of the commands, e.g. `tde4` makes
+                `tde4.getCameraList` call `namespace.getCameraList`.
+            namespace (ModuleType): Module with the functions.
+
+        """
+        self._namespaces[prefix] = namespace
+
+    def close(self) -> None:
+        """Close all connections and stop listening."""
+        for client in self._clients:
+            client.socket.close()
+        self._clients = []
+        self._socket.close()
+
+    def poll(self) -> bool:
+        """Accept connections and process received requests.
+
+        Requests are processed until no client sends another one within
+        `REQUEST_WAIT` or the time budget is used.
+
+        Returns:
+            bool: Whether there are connected clients.
+
+        """
+        deadline = time.perf_counter() + self.budget / 1000.0
+        self._accept()
+        requests = 0
+        while self._clients and requests < MAX_REQUESTS_PER_POLL:
+            processed = 0
+            for client in tuple(self._clients):
+                try:
+                    processed += self._process_client(
+                        client, MAX_REQUESTS_PER_POLL - requests - processed)
+                except OSError:  # noqa: PERF203
+                    self._disconnect(client)
+            requests += processed
+            remaining = deadline - time.perf_counter()
+            # idle clients don't make 3DEqualizer wait
+            if not processed or remaining <= 0:
+                break
+            if not self._wait(min(remaining, REQUEST_WAIT / 1000.0)):
+                break
+        return bool(self._clients)
+
+    def _wait(self, timeout: float) -> bool:
+        """Wait until some client sent data.
+
+        Returns:
+            bool: Whether there are data to read.
+
+        """
+        sockets = [client.socket for client in self._clients]
+        try:
+            readable, _, _ = select.select(sockets, [], [], timeout)
+        except (OSError, ValueError):
+            return False
+        return bool(readable)
+
+    def dispatch(self, request: Any) -> Optional[dict]:  # noqa: ANN401
+        """Execute single request and return response.
+
+        Args:
+            request (Any): Decoded request.
+
+        Returns:
+            Optional[dict]: Response, None for notifications.
+
+        """
+        request_id = None
+        try:
+            if not isinstance(request, dict) or not isinstance(
+                    request.get("method"), str):
+                raise CommandError(INVALID_REQUEST, "Invalid request")  # noqa: TRY301
+            request_id = request.get("id")
+            result = self.call(request["method"], request.get("params"))
+        except CommandError as exc:
+            return self._error(request_id, exc.code, exc.message)
+        except Exception as exc:
+            log.warning(
+                "Command %s failed", request.get("method"), exc_info=True)
+            return self._error(request_id, INTERNAL_ERROR, str(exc))
+
+        if "id" not in request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def call(
+            self,
+            method: str,
+            params: Union[list, dict, None] = None,
+    ) -> Any:  # noqa: ANN401
+        """Call registered command.
+
+        Args:
+            method (str): Name of the command.
+            params (Union[list, dict, None]): Positional or keyword
+                arguments of the command.
+
+        Returns:
+            Any: Result of the command.
+
+        Raises:
+            CommandError: When the command doesn't exist.
+
+        """
+        handler = self._get_handler(method)
+        params = params or []
+        if isinstance(params, dict):
+            return handler(**params)
+        return handler(*params)
+
+    def _get_handler(self, method: str) -> Callable[..., Any]:
+        handler = self._handlers.get(method)
+        if handler is not None:
+            return handler
+        prefix, _, name = method.partition(".")
+        namespace = self._namespaces.get(prefix)
+        if namespace is not None and name and not name.startswith("_"):
+            handler = getattr(namespace, name, None)
+            if callable(handler):
+                return handler
+        raise CommandError(METHOD_NOT_FOUND, f"Unknown method {method}")
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> dict:  # noqa: ANN401
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _ = self._socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)  # noqa: FBT003
+            self._clients.append(_Client(sock))
+
+    def _disconnect(self, client: _Client) -> None:
+        with contextlib.suppress(OSError):
+            client.socket.close()
+        self._clients.remove(client)
+
+    def _process_client(self, client: _Client, max_requests: int) -> int:
+        """Read, execute and answer requests of the client.
+
+        Returns:
+            int: Number of processed requests.
+
+        """
+        while True:
+            try:
+                data = client.socket.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                self._disconnect(client)
+                return 0
+            client.incoming += data
+
+        processed = 0
+        while b"\n" in client.incoming and processed < max_requests:
+            line, client.incoming = client.incoming.split(b"\n", 1)
+            if not client.authenticated:
+                if not secrets.compare_digest(
+                        line.strip(), self.token.encode()):
+                    log.warning("Rejected connection with invalid token")
+                    self._disconnect(client)
+                    return processed
+                client.authenticated = True
+                continue
+
+            processed += 1
+            client.outgoing += self._process_line(line)
+
+        if client.outgoing:
+            try:
+                sent = client.socket.send(client.outgoing)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            client.outgoing = client.outgoing[sent:]
+        return processed
+
+    def _process_line(self, line: bytes) -> bytes:
+        """Execute request or batch and return encoded response."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._encode(
+                self._error(None, PARSE_ERROR, "Parse error"))
+
+        if not isinstance(request, list):
+            return self._encode(self.dispatch(request))
+
+        if not request:
+            return self._encode(
+                self._error(None, INVALID_REQUEST, "Empty batch"))
+        responses = [
+            response
+            for response in map(self.dispatch, request)
+            if response is not None
+        ]
+        if not responses:
+            return b""
+        # encode one by one, so a result which can't be encoded
+        # doesn't break the whole batch
+        return b"[" + b",".join(
+            self._encode(response).rstrip(b"\n") for response in responses
+        ) + b"]\n"
+
+    def _encode(self, response: Optional[dict]) -> bytes:
+        """Encode single response to a line."""
+        if response is None:
+            return b""
+        try:
+            encoded = json.dumps(response, cls=self.encoder)
+        except (TypeError, ValueError) as exc:
+            encoded = json.dumps(self._error(
+                response.get("id"), INTERNAL_ERROR,
+                f"Result can't be encoded: {exc}"))
+        return encoded.encode() + b"\n"
@@ -0,0 +1,223 @@
+"""Exports done by export scripts shipped with 3DEqualizer.
+
+Export scripts need `vl_sdv` and other modules existing only in
+3DEqualizer and extractors patch `tde4` UI functions to silence them.
+Neither works in AYON tools running in separate process, where `tde4`
+is only a proxy and every call of the script would be a round-trip to
+3DEqualizer.
+
+Extractors therefore call the exports by name through
+`EqualizerHost.run_export`, which is forwarded to 3DEqualizer by
+the proxy host, so the whole export always runs inside 3DEqualizer.
+Arguments and results must be JSON serializable.
+
+"""
+from __future__ import annotations
+
+from typing import Any, Callable
+from unittest.mock import patch
+
+import tde4
+
+from .exporters import get_exporter_code, get_exporter_module
+from .pipeline import maintained_model_selection
+
+EQUALIZER_7 = 7
+EQUALIZER_8 = 8
+
+# model selection of the Maya export script
+MAYA_MODELS_NONE = 1
+MAYA_MODELS_SELECTED = 2
+MAYA_MODELS_ALL = 3
+
+
+def export_nuke_script(
+        exporter_path: str,
+        camera_id: str,
+        file_path: str,
+        offset: int,
+) -> None:
+    """Export Nuke script of a camera with `export_nuke.py`.
+
+    Export script is bound to its UI, so it is executed the same way as
+    if artist ran it and the requesters are patched to not wait for
+    the artist.
+
+    Args:
+        exporter_path (str): Path to `export_nuke.py`.
+        camera_id (str): Camera to export.
+        file_path (str): Path of the exported script.
+        offset (int): Start frame of the export.
+
+    """
+    # this is required because of the * import in extract_nuke script
+    from vl_sdv import VL_APPLY_ZXY, mat3d, rot3d  # noqa: F401
+
+    # these patched methods are used to silence 3DEqualizer UI:
+    def patched_getWidgetValue(_, key: str) -> str:  # noqa: N802, ANN001
+        """Return value for given key in widget."""
+        if key == "file_browser":
+            return file_path
+        return offset if key == "startframe_field" else ""
+
+    # Export script exports the current camera, so it is switched
+    # only for the export without changing the camera in the UI.
+    def patched_getCurrentCamera() -> str:  # noqa: N802
+        return camera_id
+
+    # This is simulating artist clicking on "OK" button
+    # in the export dialog.
+    def patched_postCustomRequester(*args, **kwargs) -> int:  # noqa: N802, ANN002, ANN003, ARG001
+        return 1
+
+    # This is silencing success/error message after the script
+    # is exported.
+    def patched_postQuestionRequester(*args, **kwargs) -> None:  # noqa: N802, ANN002, ANN003, ARG001
+        return None
+
+    with patch("tde4.getWidgetValue", patched_getWidgetValue), \
+             patch("tde4.getCurrentCamera", patched_getCurrentCamera), \
+             patch("tde4.postCustomRequester", patched_postCustomRequester), \
+             patch("tde4.postQuestionRequester", patched_postQuestionRequester):  # noqa: E501
+        exec(get_exporter_code(exporter_path), {"tde4": tde4})  # noqa: S102
+
+
+def export_lens_distortion_nuke(
+        exporter_path: str,
+        camera_id: str,
+        file_path: str,
+        offset: int,
+        fov_mode: str,
+) -> None:
+    """Export Nuke lens distortion node of a camera.
+
+    Args:
+        exporter_path (str): Path to
+            `export_nuke_LD_3DE4_Lens_Distortion_Node.py`.
+        camera_id (str): Camera to export.
+        file_path (str): Path of the exported script.
+        offset (int): Start frame of the export.
+        fov_mode (str): Value of FOV mode option menu.
+
+    """
+    # these patched methods are used to silence 3DEqualizer UI:
+    def patched_getWidgetValue(_, key: str) -> str:    # noqa: N802, ANN001
+        """Return value for given key in widget."""
+        return fov_mode if key == "option_menu_fov_mode" else ""
+
+    exporter = get_exporter_module(exporter_path)
+    with patch("tde4.getWidgetValue", patched_getWidgetValue):
+        exporter.exportNukeDewarpNode(camera_id, offset, file_path)
+
+
+def export_maya_script(  # noqa: PLR0913
+        exporter_path: str,
+        *,
+        version: int,
+        file_path: str,
+        point_group: str,
+        camera_ids: list[str],
+        model_selection: str,
+        options: dict[str, Any],
+) -> dict[str, Any]:
+    """Export Maya script with `export_maya.py`.
+
+    Instead of invoking the script from the UI, function doing the export
+    is called directly with the values the UI would pass.
+
+    Args:
+        exporter_path (str): Path to `export_maya.py`.
+        version (int): Major version of 3DEqualizer.
+        file_path (str): Path of the exported script without extension.
+        point_group (str): Camera point group.
+        camera_ids (list[str]): Cameras to export.
+        model_selection (str): `__all__`, `__none__` or id of a model
+            of the point group to export.
+        options (dict[str, Any]): `overscan_width`, `overscan_height`,
+            `export_uv_textures`, `scale_factor`, `offset`,
+            `hide_reference_frame`, `scene_name`, `point_sets` and
+            `export_2p5d`.
+
+    Returns:
+        dict[str, Any]: `status` of the export, 1 on success, and
+            `warning` of the export script.
+
+    """
+    exporter = get_exporter_module(exporter_path)
+    warning = None
+    with maintained_model_selection():
+        # We are passing it to existing function that is expecting
+        # this value to be an index of selection type.
+        if model_selection == "__all__":
+            models = MAYA_MODELS_ALL
+        elif model_selection == "__none__":
+            models = MAYA_MODELS_NONE
+        else:
+            # take model from instance and set its selection flag on
+            # turn off all others
+            models = MAYA_MODELS_SELECTED
+            for pg in tde4.getPGroupList():
+                model_list = tde4.get3DModelList(pg, 0)
+                if model_selection in model_list:
+                    tde4.set3DModelSelectionFlag(pg, model_selection, 1)
+                    break
+
+                # clear all other model selections
+                for model in model_list:
+                    tde4.set3DModelSelectionFlag(pg, model, 0)
+
+        args = (
+            point_group,
+            camera_ids,
+            models,
+            options["overscan_width"],
+            options["overscan_height"],
+            1 if options["export_uv_textures"] else 0,
+            options["scale_factor"],
+            options["offset"],
+            1 if options["hide_reference_frame"] else 0,
+        )
+        if version == EQUALIZER_7:
+            status = exporter._maya_export_mel_file(  # noqa: SLF001
+                f"{file_path}.mel", *args)
+        elif version == EQUALIZER_8:
+            exporter.script_version = "4.7"
+            status, warning = exporter._maya_export_python_file(  # noqa: SLF001
+                file_path,
+                *args,
+                options["scene_name"],
+                1 if options["point_sets"] else 0,
+                1 if options["export_2p5d"] else 0,
+            )
+        else:
+            status = 0
+            warning = f"Unsupported 3DEqualizer version {version}"
+    return {"status": status, "warning": warning}
+
+
+EXPORTS: dict[str, Callable[..., Any]] = {
+    "nuke_script": export_nuke_script,
+    "lens_distortion_nuke": export_lens_distortion_nuke,
+    "maya_script": export_maya_script,
+}
+
+
+def run_export(name: str, kwargs: dict[str, Any]) -> Any:  # noqa: ANN401
+    """Run export registered in `EXPORTS`.
+
+    Args:
+        name (str): Name of the export.
+        kwargs (dict[str, Any]): Arguments of the export function.
+
+    Returns:
+        Any: Result of the export.
+
+    Raises:
+        ValueError: When there is no export of the name.
+
+    """
+    export = EXPORTS.get(name)
+    if export is None:
+        msg = f"Unknown export {name}"
+        raise ValueError(msg)
+    return export(**kwargs)
@@ -0,0 +1,127 @@
+"""Cache of export scripts shipped with 3DEqualizer.
+
+Extractors use built-in export scripts to stay compatible with
+3DEqualizer. The scripts are large and importing or compiling them for
+every instance of every publish takes noticeable time, so they are
+loaded once per session and reused until the file changes.
+
+Cache is keyed by path of the script and validated by its modification
+time and size, so updated scripts are loaded again without restarting
+3DEqualizer.
+
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import TYPE_CHECKING, NamedTuple, Union
+
+from ayon_core.lib import import_filepath
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import CodeType, ModuleType
+
+
+class _ExporterEntry(NamedTuple):
+    """Loaded script with the state of its file."""
+
+    stamp: tuple[int, int]
+    value: Union[ModuleType, CodeType]
+    digest: str
+
+
+_modules: dict[str, _ExporterEntry] = {}
+_codes: dict[str, _ExporterEntry] = {}
+
+
+def _get_stamp(path: str) -> tuple[int, int]:
+    """Return modification time and size of the file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_digest(source: bytes) -> str:
+    return hashlib.sha1(source).hexdigest()  # noqa: S324
+
+
+def _normalize(path: Union[str, Path]) -> str:
+    return os.path.normcase(os.path.abspath(os.fspath(path)))
+
+
+def get_exporter_module(path: Union[str, Path]) -> ModuleType:
+    """Import export script as a module.
+
+    Module is shared by all callers, don't store state in it.
+
+    Args:
+        path (Union[str, Path]): Path to the script.
+
+    Returns:
+        ModuleType: Imported script.
+
+    """
+    path = _normalize(path)
+    stamp = _get_stamp(path)
+    entry = _modules.get(path)
+    if entry is None or entry.stamp != stamp:
+        with open(path, "rb") as stream:
+            digest = _get_digest(stream.read())
+        entry = _ExporterEntry(stamp, import_filepath(path), digest)
+        _modules[path] = entry
+    return entry.value
+
+
+def get_exporter_code(path: Union[str, Path]) -> CodeType:
+    """Compile export script to be executed with `exec`.
+
+    Scripts doing the export when executed, e.g. `export_nuke.py`, can't
+    be imported once. Their compiled code is cached instead and executed
+    with fresh globals every time.
+
+    Args:
+        path (Union[str, Path]): Path to the script.
+
+    Returns:
+        CodeType: Compiled script.
+
+    """
+    path = _normalize(path)
+    stamp = _get_stamp(path)
+    entry = _codes.get(path)
+    if entry is None or entry.stamp != stamp:
+        with open(path, "rb") as stream:
+            source = stream.read()
+        entry = _ExporterEntry(
+            stamp, compile(source, path, "exec"), _get_digest(source))
+        _codes[path] = entry
+    return entry.value
+
+
+def get_exporter_digest(path: Union[str, Path]) -> str:
+    """Get hash of export script content.
+
+    Uses the hash computed when the script was loaded if the file
+    didn't change since.
+
+    Args:
+        path (Union[str, Path]): Path to the script.
+
+    Returns:
+        str: Hex digest of the script.
+
+    """
+    path = _normalize(path)
+    stamp = _get_stamp(path)
+    for cache in (_modules, _codes):
+        entry = cache.get(path)
+        if entry is not None and entry.stamp == stamp:
+            return entry.digest
+    with open(path, "rb") as stream:
+        return _get_digest(stream.read())
+
+
+def clear_exporter_cache() -> None:
+    """Drop all loaded export scripts."""
+    _modules.clear()
+    _codes.clear()
@@ -0,0 +1,177 @@
+"""Local cache of extracted files.
+
+Exports of 3DEqualizer scripts take long on big projects and publishing
+again after changing only a comment or a version produces the same
+files. Extractors compute a fingerprint of everything the export
+depends on and reuse files stored under the same fingerprint instead of
+exporting again.
+
+Fingerprint is keyed on the saved project file, projects with unsaved
+changes aren't cached, see `ExtractCacheMixin`.
+
+Each entry is a directory named by the fingerprint. Size of the cache
+is limited, the least recently used entries are removed first.
+
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+EXTRACT_CACHE_SIZE = 1024  # MB
+
+log = logging.getLogger(__name__)
+
+
+def get_extract_cache_dir() -> str:
+    """Return directory of the extract cache."""
+    return os.path.join(
+        tempfile.gettempdir(), "ayon_equalizer", "extract_cache")
+
+
+def get_fingerprint(inputs: dict[str, Any]) -> str:
+    """Get fingerprint of export inputs.
+
+    Args:
+        inputs (dict[str, Any]): JSON serializable inputs, values which
+            aren't are converted to string.
+
+    Returns:
+        str: Hex digest of the inputs.
+
+    """
+    data = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()  # noqa: S324
+
+
+def _get_entry_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for name in os.listdir(path)
+    )
+
+
+class ExtractCache:
+    """Size bounded cache of extracted files.
+
+    Args:
+        root (str): Directory of the cache.
+        max_size (int): Maximum size of the cache in bytes.
+
+    """
+
+    def __init__(self, root: str, max_size: int) -> None:
+        """Initialize cache."""
+        self.root = root
+        self.max_size = max_size
+
+    def restore(self, fingerprint: str, staging_dir: str) -> bool:
+        """Copy cached files to staging directory.
+
+        Args:
+            fingerprint (str): Fingerprint of the export.
+            staging_dir (str): Directory to copy the files to.
+
+        Returns:
+            bool: Whether the files were found in the cache.
+
+        """
+        entry = os.path.join(self.root, fingerprint)
+        try:
+            names = os.listdir(entry)
+            for name in names:
+                shutil.copy2(os.path.join(entry, name), staging_dir)
+        except OSError:
+            return False
+        # mark entry as recently used
+        with contextlib.suppress(OSError):
+            os.utime(entry)
+        log.debug("Restored %s from extract cache", ", ".join(names))
+        return True
+
+    def store(self, fingerprint: str, paths: Iterable[str]) -> None:
+        """Store extracted files.
+
+        Failure to store the files is only logged, so it doesn't break
+        the publish.
+
+        Args:
+            fingerprint (str): Fingerprint of the export.
+            paths (Iterable[str]): Extracted files.
+
+        """
+        entry = os.path.join(self.root, fingerprint)
+        if os.path.isdir(entry):
+            return
+        tmp_entry = None
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            # files are copied to temporary directory first, so incomplete
+            # entry is never restored
+            tmp_entry = tempfile.mkdtemp(dir=self.root, prefix=".tmp_")
+            for path in paths:
+                shutil.copy2(path, tmp_entry)
+            os.rename(tmp_entry, entry)
+        except OSError:
+            log.warning(
+                "Cannot store files in extract cache %s",
+                self.root, exc_info=True)
+            if tmp_entry is not None:
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries over the size limit."""
+        entries = []
+        total_size = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            # skip files being stored
+            if name.startswith(".tmp_"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                size = _get_entry_size(path)
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            entries.append((mtime, size, path))
+            total_size += size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+
+def get_extract_cache() -> Optional[ExtractCache]:
+    """Get extract cache if enabled in settings.
+
+    Returns:
+        Optional[ExtractCache]: Cache or None if it's disabled.
+
+    """
+    if os.getenv("AYON_TDE4_EXTRACT_CACHE") != "1":
+        return None
+    try:
+        max_size = int(
+            os.getenv("AYON_TDE4_EXTRACT_CACHE_SIZE") or EXTRACT_CACHE_SIZE)
+    except ValueError:
+        log.warning("AYON_TDE4_EXTRACT_CACHE_SIZE is not a valid integer")
+        max_size = EXTRACT_CACHE_SIZE
+    return ExtractCache(get_extract_cache_dir(), max_size * 1024 * 1024)
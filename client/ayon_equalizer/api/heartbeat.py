@@ -0,0 +1,344 @@
+"""Heartbeat passing control from 3DEqualizer to Qt.
+
+3DEqualizer doesn't run Qt event loop, so AYON tools are kept alive by
+a timer callback registered in 3DEqualizer that periodically processes
+Qt events.
+
+In adaptive mode the timer runs with the configured interval only while
+some AYON window is visible. When there is nothing to process, the
+interval is doubled on every tick up to the idle interval, so the
+integration doesn't take time from tracking and solving.
+
+Optional time budget limits how long a single tick can process events,
+so a heavy repaint of AYON tool doesn't block 3DEqualizer UI. Events
+not processed within the budget stay queued and are processed on the
+next tick, which is scheduled with the fast interval.
+
+With statistics enabled, duration, jitter and number of processed
+events of recent ticks are collected in `HeartbeatStats` and optionally
+appended to a JSON lines log.
+
+Other work that has to be done on the main thread, like advancing
+scheduled tasks, is registered with `Heartbeat.add_callback` and run
+after Qt events on every tick.
+
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import logging
+import time
+from collections import deque
+from typing import Callable, NamedTuple, Optional
+
+import tde4
+
+try:
+    from qtpy import QtCore, QtWidgets
+except Exception:  # noqa: BLE001
+    # Qt binding isn't needed when AYON tools run in separate process
+    QtCore = QtWidgets = None
+
+HEARTBEAT_MODE_FIXED = "fixed"
+HEARTBEAT_MODE_ADAPTIVE = "adaptive"
+HEARTBEAT_MODES = (HEARTBEAT_MODE_FIXED, HEARTBEAT_MODE_ADAPTIVE)
+HEARTBEAT_IDLE_INTERVAL = 500
+# upper bounds of tick duration histogram buckets in milliseconds
+HEARTBEAT_HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+log = logging.getLogger(__name__)
+
+
+class HeartbeatSample(NamedTuple):
+    """Measurement of a single heartbeat tick.
+
+    Times are in milliseconds. Jitter is the difference between
+    the real time since the previous tick and the interval the timer
+    was registered with, it is zero for the first tick.
+    """
+
+    timestamp: float
+    interval: int
+    duration: float
+    jitter: float
+    events: int
+
+
+class HeartbeatStats:
+    """Rolling statistics of heartbeat ticks.
+
+    Args:
+        size (int): Number of recent ticks to keep.
+        log_path (Optional[str]): Path to JSON lines file every sample
+            is appended to. Samples are written in batches and the rest
+            when 3DEqualizer exits.
+
+    """
+
+    def __init__(self, size: int = 1000, log_path: Optional[str] = None):
+        """Initialize statistics."""
+        self.samples: deque[HeartbeatSample] = deque(maxlen=size)
+        self.log_path = log_path
+        self._log_buffer: list[str] = []
+        if log_path:
+            atexit.register(self.flush)
+
+    def add(self, sample: HeartbeatSample) -> None:
+        """Add sample of a tick."""
+        self.samples.append(sample)
+        if not self.log_path:
+            return
+        self._log_buffer.append(json.dumps(sample._asdict()))
+        # write in batches, so the file isn't opened on every tick
+        if len(self._log_buffer) >= 50:  # noqa: PLR2004
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered samples to the log file."""
+        if not self._log_buffer:
+            return
+        lines, self._log_buffer = self._log_buffer, []
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as stream:
+                stream.write("\n".join(lines) + "\n")
+        except OSError:
+            log.warning(
+                "Cannot write heartbeat statistics to %s",
+                self.log_path, exc_info=True)
+            self.log_path = None
+
+    def reset(self) -> None:
+        """Drop collected samples."""
+        self.flush()
+        self.samples.clear()
+
+    def histogram(self) -> list[tuple[Optional[int], int]]:
+        """Return histogram of tick durations.
+
+        Returns:
+            list[tuple[Optional[int], int]]: Upper bound in milliseconds
+                and number of ticks for each bucket. Upper bound of
+                the last bucket is None.
+
+        """
+        counts = [0] * (len(HEARTBEAT_HISTOGRAM_BOUNDS) + 1)
+        for sample in self.samples:
+            counts[bisect.bisect_left(
+                HEARTBEAT_HISTOGRAM_BOUNDS, sample.duration)] += 1
+        bounds = (*HEARTBEAT_HISTOGRAM_BOUNDS, None)
+        return list(zip(bounds, counts))
+
+    def summary(self) -> dict:
+        """Return summary of collected samples.
+
+        Returns:
+            dict: Number of ticks, mean, 95th percentile and maximum of
+                duration, mean and maximum of absolute jitter, processed
+                events, share of main thread time taken by ticks and
+                histogram of durations.
+
+        """
+        samples = list(self.samples)
+        if not samples:
+            return {"ticks": 0}
+
+        count = len(samples)
+        durations = sorted(sample.duration for sample in samples)
+        jitters = [abs(sample.jitter) for sample in samples]
+        events = sum(sample.events for sample in samples)
+        elapsed = samples[-1].timestamp - samples[0].timestamp
+        return {
+            "ticks": count,
+            "duration_mean": sum(durations) / count,
+            "duration_p95": durations[int(0.95 * (count - 1))],
+            "duration_max": durations[-1],
+            "jitter_mean": sum(jitters) / count,
+            "jitter_max": max(jitters),
+            "events": events,
+            "events_mean": events / count,
+            "load": sum(durations) / elapsed if elapsed > 0 else 0.0,
+            "histogram": self.histogram(),
+        }
+
+
+class Heartbeat:
+    """Timer callback processing Qt events.
+
+    Args:
+        callback_name (str): Name of the callback function as it
+            is passed to `tde4.setTimerCallbackFunction`.
+        interval (int): Interval in milliseconds.
+        idle_interval (int): Longest interval in milliseconds used
+            in adaptive mode when no AYON window is visible.
+        mode (str): One of `HEARTBEAT_MODES`.
+        budget (int): Maximum time in milliseconds spent processing
+            events in one tick. Zero means no limit.
+        stats (Optional[HeartbeatStats]): Statistics to collect samples
+            of ticks into.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+            self,
+            callback_name: str,
+            interval: int = 100,
+            *,
+            idle_interval: int = HEARTBEAT_IDLE_INTERVAL,
+            mode: str = HEARTBEAT_MODE_FIXED,
+            budget: int = 0,
+            stats: Optional[HeartbeatStats] = None,
+    ) -> None:
+        """Initialize heartbeat."""
+        self.callback_name = callback_name
+        self.interval = interval
+        self.idle_interval = max(idle_interval, interval)
+        self.mode = mode
+        self.budget = max(budget, 0)
+        self.current_interval = interval
+        self.stats = stats
+        self._event_counter: Optional[_EventCounter] = None
+        self._last_tick: Optional[float] = None
+        self._callbacks: list[Callable[[], bool]] = []
+
+    def add_callback(self, callback: Callable[[], bool]) -> None:
+        """Add callback called on every tick after Qt events.
+
+        Args:
+            callback (Callable[[], bool]): Function returning whether it
+                has more work to do, which keeps the fast interval in
+                adaptive mode.
+
+        """
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[], bool]) -> None:
+        """Remove callback added by `add_callback`."""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def start(self) -> None:
+        """Register the timer callback with current interval."""
+        tde4.setTimerCallbackFunction(
+            self.callback_name, self.current_interval)
+
+    def wake(self) -> None:
+        """Switch back to the fast interval.
+
+        Should be called when a tool is shown, so it doesn't wait for
+        the idle interval to be painted.
+        """
+        self._set_interval(self.interval)
+
+    def tick(self) -> None:
+        """Process Qt events and run callbacks.
+
+        Called from the timer callback. Without Qt application only
+        the callbacks are run.
+        """
+        if self.stats is None:
+            self._tick()
+            return
+
+        start = time.perf_counter()
+        interval = self.current_interval
+        jitter = 0.0
+        if self._last_tick is not None:
+            jitter = (start - self._last_tick) * 1000.0 - interval
+        self._last_tick = start
+
+        app = _get_application()
+        events = 0
+        if app is None:
+            self._tick()
+        else:
+            if self._event_counter is None:
+                self._event_counter = _EventCounter()
+            self._event_counter.count = 0
+            app.installEventFilter(self._event_counter)
+            try:
+                self._tick()
+            finally:
+                app.removeEventFilter(self._event_counter)
+            events = self._event_counter.count
+
+        self.stats.add(HeartbeatSample(
+            timestamp=start * 1000.0,
+            interval=interval,
+            duration=(time.perf_counter() - start) * 1000.0,
+            jitter=jitter,
+            events=events,
+        ))
+
+    def _tick(self) -> None:
+        """Process Qt events and adapt the interval."""
+        app = _get_application()
+        busy = app is not None and self._process_events(app)
+        for callback in tuple(self._callbacks):
+            try:
+                busy = bool(callback()) or busy
+            except Exception:  # noqa: PERF203
+                log.exception("Heartbeat callback %s failed", callback)
+        if self.mode != HEARTBEAT_MODE_ADAPTIVE:
+            return
+
+        if busy or (app is not None and self._is_active(app)):
+            self._set_interval(self.interval)
+        else:
+            self._set_interval(
+                min(self.current_interval * 2, self.idle_interval))
+
+    def _process_events(self, app: QtWidgets.QApplication) -> bool:
+        """Process Qt events within the time budget.
+
+        Returns:
+            bool: Whether the whole budget was used, so there are
+                probably more events waiting.
+
+        """
+        if not self.budget:
+            app.processEvents(QtCore.QEventLoop.AllEvents)
+            return False
+
+        start = time.perf_counter()
+        app.processEvents(QtCore.QEventLoop.AllEvents, self.budget)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        return elapsed >= self.budget
+
+    @staticmethod
+    def _is_active(app: QtWidgets.QApplication) -> bool:
+        """Return whether there is something for Qt to process."""
+        if any(widget.isVisible() for widget in app.topLevelWidgets()):
+            return True
+        # not available in Qt 6
+        has_pending_events = getattr(app, "hasPendingEvents", None)
+        return bool(has_pending_events and has_pending_events())
+
+    def _set_interval(self, interval: int) -> None:
+        """Re-register the timer callback if the interval changed."""
+        if interval == self.current_interval:
+            return
+        self.current_interval = interval
+        self.start()
+
+
+def _get_application() -> Optional[QtWidgets.QApplication]:
+    """Return Qt application if there is any."""
+    if QtWidgets is None:
+        return None
+    return QtWidgets.QApplication.instance()
+
+
+if QtCore is not None:
+    class _EventCounter(QtCore.QObject):
+        """Event filter counting events processed by the application."""
+
+        count = 0
+
+        def eventFilter(  # noqa: N802
+                self, _obj: QtCore.QObject, _event: QtCore.QEvent) -> bool:
+            """Count the event and let it through."""
+            self.count += 1
+            return False
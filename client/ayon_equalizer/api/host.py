@@ -7,10 +7,19 @@ Note:
 """
 from __future__ import annotations
 
+import atexit
+import base64
+import contextlib
+import copy
 import dataclasses
+import hashlib
 import json
 import os
 import re
+import subprocess
+import tempfile
+import zlib
+from functools import partial
 from typing import TYPE_CHECKING, Optional, Union
 
 import pyblish.api
@@ -21,15 +30,42 @@ from ayon_core.pipeline import (
     register_creator_plugin_path,
     register_loader_plugin_path,
 )
-from qtpy import QtCore, QtWidgets
+
+try:
+    from qtpy import QtCore, QtWidgets
+except Exception:  # noqa: BLE001
+    # Qt binding isn't needed when AYON tools run in separate process
+    QtCore = QtWidgets = None
 
 from ayon_equalizer import EQUALIZER_HOST_DIR
+from ayon_equalizer.api.async_loop import AsyncLoop
+from ayon_equalizer.api.background_publish import (
+    PUBLISH_STATE_FAILED,
+    BackgroundPublish,
+)
+from ayon_equalizer.api.command_server import CommandServer
+from ayon_equalizer.api.export import run_export
+from ayon_equalizer.api.heartbeat import (
+    HEARTBEAT_IDLE_INTERVAL,
+    HEARTBEAT_MODE_FIXED,
+    HEARTBEAT_MODES,
+    Heartbeat,
+    HeartbeatStats,
+)
+from ayon_equalizer.api.lib import get_outdated_representation_ids
 from ayon_equalizer.api.pipeline import Container
+from ayon_equalizer.api.scene import invalidate_scene_enumeration
+from ayon_equalizer.api.scene_query import SceneQuery
+from ayon_equalizer.api.scheduler import Task, TaskScheduler
+from ayon_equalizer.remote.client import get_command_server_info_dir
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    import asyncio
+    from collections.abc import Awaitable, Callable, Generator, Iterable
     from typing import Any
 
+    from ayon_equalizer.api.async_loop import DoneCallback
+
 
 AYON_METADATA_GUARD = "AYON_CONTEXT::{}::AYON_CONTEXT_END"
 AYON_METADATA_REGEX = re.compile(
@@ -40,17 +76,85 @@ PUBLISH_PATH = os.path.join(PLUGINS_DIR, "publish")
 LOAD_PATH = os.path.join(PLUGINS_DIR, "load")
 CREATE_PATH = os.path.join(PLUGINS_DIR, "create")
 INVENTORY_PATH = os.path.join(PLUGINS_DIR, "inventory")
+REMOTE_TOOL_SCRIPT = os.path.join(
+    EQUALIZER_HOST_DIR, "remote", "run_tool.py")
+
+# AYON tools run in 3DEqualizer or in separate process
+TOOLS_MODE_HOST = "host"
+TOOLS_MODE_PROCESS = "process"
+TOOLS_MODES = (TOOLS_MODE_HOST, TOOLS_MODE_PROCESS)
+
+# host methods available to tools running in separate process
+REMOTE_HOST_METHODS = (
+    "workfile_has_unsaved_changes",
+    "workfile_has_only_ayon_changes",
+    "save_workfile",
+    "open_workfile",
+    "get_current_workfile",
+    "get_container",
+    "remove_container",
+    "get_ayon_data",
+    "update_ayon_data",
+    "get_context_data",
+    "get_publish_instances",
+    "get_publish_instance",
+    "add_publish_instance",
+    "update_publish_instance",
+    "patch_publish_instance",
+    "write_create_instances",
+    "remove_create_instance",
+    "defer_metadata_write",
+    "run_export",
+    "launch_background_publish",
+    "get_background_publishes",
+)
 
 EQUALIZER_CONTEXT_KEY = "context"
 EQUALIZER_INSTANCES_KEY = "publish_instances"
 EQUALIZER_CONTAINERS_KEY = "containers"
+EQUALIZER_SCHEMA_VERSION_KEY = "schema_version"
+
+# Version of the AYON data layout. Data without version are from before
+# the versioning was introduced. Older data are migrated when they are
+# read, see `EqualizerHost._migrate_ayon_data`.
+AYON_METADATA_SCHEMA_VERSION = 1
+
+# Storage formats of the AYON data in project notes. Format used for
+# writing is selected in settings, reading accepts all of them.
+AYON_METADATA_FORMAT_JSON = "json"
+AYON_METADATA_FORMAT_COMPACT = "compact"
+AYON_METADATA_FORMAT_ZLIB = "zlib"
+AYON_METADATA_FORMATS = (
+    AYON_METADATA_FORMAT_JSON,
+    AYON_METADATA_FORMAT_COMPACT,
+    AYON_METADATA_FORMAT_ZLIB,
+)
+# Compressed payload is base64 encoded zlib stream of compact json
+# prefixed with this marker and format version.
+AYON_METADATA_ZLIB_PREFIX = "zlib:1:"
+
+# Where AYON data are stored. With sidecar storage, project notes contain
+# only a pointer to a file next to the workfile together with its
+# checksum, the file is written when the workfile is saved. Changes done
+# since then are stored in the notes, so they are kept also when the
+# project is saved from 3DEqualizer menu.
+AYON_METADATA_STORAGE_NOTES = "notes"
+AYON_METADATA_STORAGE_SIDECAR = "sidecar"
+AYON_METADATA_STORAGES = (
+    AYON_METADATA_STORAGE_NOTES,
+    AYON_METADATA_STORAGE_SIDECAR,
+)
+AYON_METADATA_SIDECAR_PREFIX = "sidecar:1:"
+AYON_METADATA_SIDECAR_EXT = ".ayon.json"
 
 
 class AYONJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder for dataclasses."""
+    """Custom JSON encoder for dataclasses and containers."""
 
     def default(self, obj: object) -> Union[dict, object]:
-        """Encode dataclasses as dict."""
+        """Encode dataclasses and containers as dict."""
+        if isinstance(obj, Container):
+            return obj.to_dict()
         if dataclasses.is_dataclass(obj):
             # type: obj: dataclasses.dataclass
             return dataclasses.asdict(obj)
@@ -59,6 +163,121 @@ class AYONJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def encode_ayon_data(
+        data: dict,
+        metadata_format: str = AYON_METADATA_FORMAT_JSON) -> tuple[str, str]:
+    """Encode AYON data to be stored in project notes.
+
+    Args:
+        data (dict): AYON data.
+        metadata_format (str): One of `AYON_METADATA_FORMATS`.
+
+    Returns:
+        tuple[str, str]: Payload to put between the guards and json
+            string it was created from.
+
+    """
+    if metadata_format == AYON_METADATA_FORMAT_JSON:
+        json_str = json.dumps(data, indent=4, cls=AYONJSONEncoder)
+        return json_str, json_str
+
+    json_str = json.dumps(
+        data, separators=(",", ":"), cls=AYONJSONEncoder)
+    if metadata_format == AYON_METADATA_FORMAT_ZLIB:
+        compressed = base64.b64encode(
+            zlib.compress(json_str.encode("utf-8"))).decode("ascii")
+        return f"{AYON_METADATA_ZLIB_PREFIX}{compressed}", json_str
+    return json_str, json_str
+
+
+def decode_ayon_data(payload: str) -> dict:
+    """Decode AYON data stored in project notes in any of the formats.
+
+    Args:
+        payload (str): Content between the guards.
+
+    Returns:
+        dict: AYON data.
+
+    Raises:
+        ValueError: If the payload cannot be decoded.
+
+    """
+    payload = payload.strip()
+    if payload.startswith(AYON_METADATA_ZLIB_PREFIX):
+        try:
+            payload = zlib.decompress(base64.b64decode(
+                payload[len(AYON_METADATA_ZLIB_PREFIX):])).decode("utf-8")
+        except zlib.error as exc:
+            msg = "AYON data is not valid compressed payload"
+            raise ValueError(msg) from exc
+    return json.loads(payload)
+
+
+def _remove_file(path: str) -> None:
+    with contextlib.suppress(OSError):
+        os.remove(path)
+
+
+def get_sidecar_path(workfile_path: str) -> str:
+    """Return path to sidecar file with AYON data of the workfile.
+
+    Args:
+        workfile_path (str): Path to the workfile.
+
+    Returns:
+        str: Path to the sidecar file.
+
+    """
+    return f"{os.path.splitext(workfile_path)[0]}{AYON_METADATA_SIDECAR_EXT}"
+
+
+def write_sidecar_file(path: str, data: dict) -> str:
+    """Write AYON data to the sidecar file.
+
+    File is written to a temporary file first and then moved over
+    the original one, so it is never left half written.
+
+    Args:
+        path (str): Path to the sidecar file.
+        data (dict): AYON data.
+
+    Returns:
+        str: Checksum of the written content.
+
+    """
+    content = json.dumps(
+        data, separators=(",", ":"), cls=AYONJSONEncoder).encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or None, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            stream.write(content)
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return hashlib.sha256(content).hexdigest()
+
+
+def read_sidecar_file(path: str) -> tuple[dict, str]:
+    """Read AYON data from the sidecar file.
+
+    Args:
+        path (str): Path to the sidecar file.
+
+    Returns:
+        tuple[dict, str]: AYON data and checksum of the file content.
+
+    """
+    with open(path, "rb") as stream:
+        content = stream.read()
+    return json.loads(content), hashlib.sha256(content).hexdigest()
+
+
 class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
     """3DEqualizer host implementation."""
 
@@ -77,18 +296,82 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
     def __init__(self):
         """Initialize the host."""
         self._qapp = None
+        # Parsed AYON data and the project notes they were parsed from.
+        # Notes are compared on every read, so changes done outside
+        # of the host (undo, project load from 3DE menu, etc.) are
+        # detected and the cache is re-parsed.
+        self._ayon_data: Optional[dict] = None
+        self._ayon_notes: Optional[str] = None
+        # Content of the AYON block in the notes, used to keep the cache
+        # when only the text around the block was changed.
+        self._ayon_payload: Optional[str] = None
+        # Offsets of the payload in `_ayon_notes`, so it can be replaced
+        # without searching the notes again.
+        self._ayon_span: Optional[tuple[int, int]] = None
+        # Sidecar file the notes point to which couldn't be read, AYON
+        # data must not be written not to lose the pointer.
+        self._sidecar_error: Optional[str] = None
+        # Nesting level of `metadata_transaction` and whether there are
+        # pending changes to be written when the outermost one ends.
+        self._transaction_depth = 0
+        self._transaction_dirty = False
+        # Project whose changes are written on the next heartbeat tick
+        # and whether there are such changes, see `defer_metadata_write`.
+        self._deferred_project: Optional[str] = None
+        self._deferred_dirty = False
+        # Path and modification time of the project file when AYON data
+        # were written to notes of a project without unsaved changes,
+        # see `workfile_has_only_ayon_changes`.
+        self._ayon_modified_project: Optional[tuple[str, int]] = None
+        self.metadata_format = AYON_METADATA_FORMAT_JSON
+        self.metadata_storage = AYON_METADATA_STORAGE_NOTES
+        self._heartbeat: Optional[Heartbeat] = None
+        self._scheduler = TaskScheduler()
+        self._async_loop: Optional[AsyncLoop] = None
+        self.tools_mode = TOOLS_MODE_HOST
+        self._command_server: Optional[CommandServer] = None
+        self._tool_processes: dict[str, subprocess.Popen] = {}
+        self._background_publishes: list[BackgroundPublish] = []
+        self._message_boxes: list[QtWidgets.QMessageBox] = []
         super().__init__()
 
     def workfile_has_unsaved_changes(self) -> bool:
         """Return the state of the current workfile.
 
         3DEqualizer returns state as 1 or zero, so we need to invert it.
+        AYON data changes waiting for the deferred write are considered
+        unsaved changes too.
 
         Returns:
             bool: True if the current workfile has unsaved changes.
 
         """
-        return not bool(tde4.isProjectUpToDate())
+        return self._deferred_dirty or not bool(tde4.isProjectUpToDate())
+
+    def workfile_has_only_ayon_changes(self) -> bool:
+        """Return whether AYON data are the only unsaved changes.
+
+        Writing AYON data to project notes marks the project as modified
+        in 3DEqualizer, so its state is recorded before the first write.
+        3DEqualizer has only one modified flag, changes done by the artist
+        after that write can't be told apart from AYON data.
+
+        Returns:
+            bool: True if the project was up to date before AYON data
+                were written and wasn't saved, loaded or changed outside
+                of AYON notes since.
+
+        """
+        if self._ayon_modified_project is None:
+            return False
+        project_path, mtime = self._ayon_modified_project
+        if tde4.getProjectPath() != project_path \
+                or tde4.getProjectNotes() != self._ayon_notes:
+            return False
+        try:
+            return os.stat(project_path).st_mtime_ns == mtime
+        except OSError:
+            return False
 
     def get_workfile_extensions(self) -> list[str]:
         """Return the workfile extensions for 3DEqualizer."""
@@ -100,10 +383,23 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         Arguments:
             dst_path (str): Destination path to save the workfile.
 
+        Raises:
+            RuntimeError: If there is no path to save to or 3DEqualizer
+                failed to save the project.
+
         """
         if not dst_path:
             dst_path = tde4.getProjectPath()
-        result = tde4.saveProject(dst_path, True)  # noqa: FBT003
+        if not dst_path:
+            err_msg = "Workfile has no path to be saved to."
+            raise RuntimeError(err_msg)
+
+        self._flush_deferred_metadata()
+        if self.metadata_storage == AYON_METADATA_STORAGE_SIDECAR:
+            result = self._save_with_sidecar(dst_path)
+        else:
+            result = tde4.saveProject(dst_path, True)  # noqa: FBT003
+        self._invalidate_ayon_data()
         if not bool(result):
             err_msg = f"Failed to save workfile {dst_path}."
             raise RuntimeError(err_msg)
@@ -111,52 +407,161 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         return dst_path
 
     def open_workfile(self, filepath: str) -> str:
-        """Open a workfile in 3DEqualizer."""
+        """Open a workfile in 3DEqualizer.
+
+        Artist is notified about outdated containers of the workfile.
+        """
+        self._flush_deferred_metadata()
         result = tde4.loadProject(filepath, True)  # noqa: FBT003
+        self._invalidate_ayon_data()
+        invalidate_scene_enumeration()
         if not bool(result):
             err_msg = f"Failed to open workfile {filepath}."
             raise RuntimeError(err_msg)
 
+        self._check_outdated_containers()
         return filepath
 
+    def _check_outdated_containers(self) -> None:
+        """Check versions of loaded containers without blocking.
+
+        Versions are queried from AYON server in worker thread, so opening
+        the workfile doesn't wait for the server. Needs the heartbeat to
+        get the result.
+        """
+        project_name = os.getenv("AYON_PROJECT_NAME")
+        if self._heartbeat is None or not project_name:
+            return
+        representation_ids = {
+            container["representation"]
+            for container in self.get_containers()
+            if container.get("representation")
+        }
+        if not representation_ids:
+            return
+        self.run_in_executor(
+            get_outdated_representation_ids,
+            project_name,
+            representation_ids,
+            on_done=partial(
+                self._on_outdated_checked, tde4.getProjectPath()),
+        )
+
+    def _on_outdated_checked(
+            self,
+            project_path: str,
+            outdated: Optional[set[str]],
+            error: Optional[BaseException],
+    ) -> None:
+        """Notify artist about outdated containers."""
+        if error is not None:
+            self.log.warning(
+                "Cannot check versions of loaded containers: %s", error)
+            return
+        # another workfile could be opened in the meantime
+        if not outdated or tde4.getProjectPath() != project_path:
+            return
+        namespaces = [
+            container["namespace"]
+            for container in self.get_containers()
+            if container.get("representation") in outdated
+        ]
+        if not namespaces:
+            return
+        message = (
+            "Newer versions of loaded containers are available, "
+            "update them in Scene Inventory:\n" + "\n".join(namespaces))
+        self.log.warning(message)
+        self._show_message("AYON Scene Inventory", message, error=False)
+
     def get_current_workfile(self) -> str:
         """Return the current workfile path."""
         return tde4.getProjectPath()
 
     def get_containers(self) -> Generator[Container, Any, Optional[list]]:
         """Get containers from the current workfile."""
-        # sourcery skip: use-named-expression
-        data = self.get_ayon_data() or {}
-        for container in data.get(EQUALIZER_CONTAINERS_KEY, []):
-            # convert dict to dataclass
-            _container = Container(**container)
-            # check if the container is valid
-            if _container.name and _container.namespace:
-                yield dataclasses.asdict(_container)
+        # iterate over a snapshot, containers can be added while
+        # the generator is consumed
+        # containers are validated when they are read from the notes
+        # or added, so they can be passed as they are
+        for container in list(self._get_containers_by_key().values()):
+            yield dict(container)
+
+    def get_container(
+            self, name: str, namespace: str) -> Optional[dict]:
+        """Get a container by its name and namespace.
+
+        Args:
+            name (str): Container name.
+            namespace (str): Container namespace.
+
+        Returns:
+            Optional[dict]: Container data or None if not found.
+
+        """
+        container = self._get_containers_by_key().get((name, namespace))
+        return copy.deepcopy(container)
 
     def add_container(self, container: Container) -> None:
         """Add a container to the current workfile.
 
+        Existing container with the same name and namespace is replaced
+        to avoid duplicates.
+
         Args:
             container (Container): Container to add.
 
         """
-        data = self.get_ayon_data()
+        self.add_containers([container])
 
-        containers = [
-            _container for _container in self.get_containers()
-            # Remove existing container with the same name and namespace to
-            # avoid duplicates.
-            if not (
-                container.name == _container["name"]
-                and container.namespace == _container["namespace"]
-            )
-        ]
-        data[EQUALIZER_CONTAINERS_KEY] = [
-            *containers, dataclasses.asdict(container)
-        ]
+    def add_containers(self, containers: Iterable[Container]) -> None:
+        """Add or replace multiple containers with a single write.
+
+        Args:
+            containers (Iterable[Container]): Containers to add.
+
+        """
+        containers_by_key = self._get_containers_by_key()
+        for container in containers:
+            if not container.name or not container.namespace:
+                self.log.warning(
+                    "Container without name or namespace "
+                    "can't be added: %s", container)
+                continue
+            key = (container.name, container.namespace)
+            # re-insert to keep the last added container at the end
+            containers_by_key.pop(key, None)
+            containers_by_key[key] = container.to_dict()
+        self._ayon_data_changed()
+
+    def remove_container(self, name: str, namespace: str) -> None:
+        """Remove a container from the current workfile.
+
+        Args:
+            name (str): Container name.
+            namespace (str): Container namespace.
 
-        self.update_ayon_data(data)
+        """
+        if self._get_containers_by_key().pop((name, namespace), None):
+            self._ayon_data_changed()
+
+    def _record_project_state(self) -> None:
+        """Remember whether the project is saved before AYON notes change.
+
+        See `workfile_has_only_ayon_changes`.
+        """
+        if not tde4.isProjectUpToDate():
+            # modified by the previous write or by the artist
+            if not self.workfile_has_only_ayon_changes():
+                self._ayon_modified_project = None
+            return
+        self._ayon_modified_project = None
+        project_path = tde4.getProjectPath()
+        if not project_path:
+            return
+        with contextlib.suppress(OSError):
+            self._ayon_modified_project = (
+                project_path, os.stat(project_path).st_mtime_ns)
 
     def _create_ayon_data(self) -> None:
         """Create AYON data in the current project."""
@@ -166,6 +571,250 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         # this is really necessary otherwise the data is not saved
         tde4.updateGUI()
 
+    def _invalidate_ayon_data(self) -> None:
+        """Drop cached AYON data so next read parses project notes."""
+        self._ayon_data = None
+        self._ayon_notes = None
+        self._ayon_payload = None
+        self._ayon_span = None
+        self._sidecar_error = None
+        self._deferred_project = None
+        self._deferred_dirty = False
+
+    def _read_ayon_data(self) -> dict:
+        """Return cached AYON data, parse project notes only if changed.
+
+        Cache is validated by comparing current project notes with the
+        ones it was parsed from, which is a lot cheaper than running regex
+        and json decoder over the notes. Returned dict is the cache itself,
+        any change done to it in place must be followed by
+        `_ayon_data_changed`.
+
+        Returns:
+            dict: Context data.
+
+        """
+        if self._transaction_depth and self._ayon_data is not None:
+            # pending changes are not in the notes yet
+            return self._ayon_data
+
+        if (self._deferred_project is not None
+                and tde4.getProjectPath() != self._deferred_project):
+            # project was switched before the deferred write
+            self._discard_deferred_changes()
+
+        notes = tde4.getProjectNotes()
+        if self._ayon_data is not None and notes == self._ayon_notes:
+            return self._ayon_data
+
+        # sourcery skip: use-named-expression
+        m = re.search(AYON_METADATA_REGEX, notes)
+        payload = m["context"] if m else None
+        if self._ayon_data is not None and payload == self._ayon_payload:
+            # only text around AYON data changed
+            self._ayon_notes = notes
+            self._ayon_span = m.span("context")
+            return self._ayon_data
+
+        self._sidecar_error = None
+        if self._deferred_project is not None:
+            # notes were replaced, changes belong to different data
+            self._discard_deferred_changes()
+        if not m:
+            self._record_project_state()
+            self._create_ayon_data()
+            notes = tde4.getProjectNotes()
+            m = re.search(AYON_METADATA_REGEX, notes)
+            payload = m["context"] if m else ""
+            context = {}
+        else:
+            try:
+                if payload.strip().startswith(AYON_METADATA_SIDECAR_PREFIX):
+                    context = self._load_sidecar(payload)
+                else:
+                    context = decode_ayon_data(payload)
+            except ValueError:
+                # AYON data invalid, placeholder is already there and
+                # it will be overwritten on next update.
+                self.log.debug("AYON data is not valid json")
+                context = {}
+
+        context = self._migrate_ayon_data(context)
+        self._ayon_data = self._index_ayon_data(context)
+        self._ayon_notes = notes
+        self._ayon_payload = payload
+        self._ayon_span = m.span("context") if m else None
+        return self._ayon_data
+
+    def _load_sidecar(self, payload: str) -> dict:
+        """Load AYON data from the sidecar file the payload points to.
+
+        If the file can't be read, e.g. the workfile was copied without
+        it, the data are reported as empty, but writing them is refused
+        until another project is opened, so the pointer is kept.
+
+        Args:
+            payload (str): Pointer to the sidecar file from project notes.
+
+        Returns:
+            dict: AYON data.
+
+        """
+        pointer = json.loads(
+            payload.strip()[len(AYON_METADATA_SIDECAR_PREFIX):])
+        sidecar_path = os.path.join(
+            os.path.dirname(tde4.getProjectPath()), pointer["file"])
+        try:
+            data, checksum = read_sidecar_file(sidecar_path)
+        except (OSError, ValueError):
+            self.log.exception(
+                "Cannot read AYON data from %s, they won't be changed "
+                "until the file is restored and the workfile reopened.",
+                sidecar_path)
+            self._sidecar_error = sidecar_path
+            return {}
+        if checksum != pointer.get("checksum"):
+            self.log.warning(
+                "AYON data in %s were modified outside of the workfile.",
+                sidecar_path)
+        return data
+
+    def _save_with_sidecar(self, workfile_path: str) -> bool:
+        """Save the workfile with AYON data in sidecar file.
+
+        Project notes are pointed to the sidecar file and the project is
+        saved. Sidecar file is written next to the workfile only if
+        the project was saved, otherwise the previous notes are restored.
+
+        Args:
+            workfile_path (str): Path the workfile is saved to.
+
+        Returns:
+            bool: Whether the project was saved.
+
+        """
+        self._read_ayon_data()
+        if self._sidecar_error:
+            self.log.error(
+                "Saving workfile without AYON data, %s can't be read.",
+                self._sidecar_error)
+            return bool(tde4.saveProject(workfile_path, True))  # noqa: FBT003
+
+        sidecar_path = get_sidecar_path(workfile_path)
+        pending_path = f"{sidecar_path}.pending"
+        checksum = write_sidecar_file(
+            pending_path, self._get_storable_ayon_data())
+        pointer = json.dumps({
+            "file": os.path.basename(sidecar_path),
+            "checksum": checksum,
+        })
+        previous_payload = self._ayon_payload
+        self._set_ayon_payload(f"{AYON_METADATA_SIDECAR_PREFIX}{pointer}")
+        result = False
+        try:
+            result = bool(tde4.saveProject(workfile_path, True))  # noqa: FBT003
+        finally:
+            if result:
+                os.replace(pending_path, sidecar_path)
+            else:
+                _remove_file(pending_path)
+                self._set_ayon_payload(previous_payload)
+        return result
+
+    def _migrate_ayon_data(self, data: dict) -> dict:
+        """Migrate AYON data to the current schema version.
+
+        Migration runs once per parse of the notes, migrated data are
+        stored with the next write. Readers can then rely on containers
+        and instances being valid and complete.
+
+        Args:
+            data (dict): AYON data as stored in project notes.
+
+        Returns:
+            dict: Migrated data.
+
+        """
+        version = data.get(EQUALIZER_SCHEMA_VERSION_KEY, 0)
+        if version > AYON_METADATA_SCHEMA_VERSION:
+            self.log.warning(
+                "AYON data schema version %s is newer than supported %s.",
+                version, AYON_METADATA_SCHEMA_VERSION)
+            return data
+
+        if version < 1:
+            # normalize containers to all fields of `Container` and
+            # drop the ones without name or namespace
+            containers = []
+            for container in data.get(EQUALIZER_CONTAINERS_KEY, []):
+                if not container.get("name") or not container.get(
+                        "namespace"):
+                    self.log.debug("Dropping invalid container %s", container)
+                    continue
+                containers.append(Container.from_dict(container).to_dict())
+            data[EQUALIZER_CONTAINERS_KEY] = containers
+
+            instances = []
+            for instance in data.get(EQUALIZER_INSTANCES_KEY, []):
+                if not instance.get("instance_id") or not instance.get(
+                        "creator_identifier"):
+                    self.log.debug("Dropping invalid instance %s", instance)
+                    continue
+                instances.append(instance)
+            data[EQUALIZER_INSTANCES_KEY] = instances
+
+        data[EQUALIZER_SCHEMA_VERSION_KEY] = AYON_METADATA_SCHEMA_VERSION
+        return data
+
+    @staticmethod
+    def _index_ayon_data(data: dict) -> dict:
+        """Convert stored lists in AYON data to in-memory mappings.
+
+        Publish instances and containers are stored in project notes
+        as lists, but kept in memory as ordered mappings by instance id
+        and by container name and namespace, so they can be looked up,
+        updated and removed without scanning the lists.
+
+        Args:
+            data (dict): AYON data as stored in project notes.
+
+        Returns:
+            dict: The same data dict with indexed instances.
+
+        """
+        instances = data.get(EQUALIZER_INSTANCES_KEY)
+        if isinstance(instances, list):
+            data[EQUALIZER_INSTANCES_KEY] = {
+                instance["instance_id"]: instance for instance in instances
+            }
+        containers = data.get(EQUALIZER_CONTAINERS_KEY)
+        if isinstance(containers, list):
+            data[EQUALIZER_CONTAINERS_KEY] = {
+                (container["name"], container["namespace"]): container
+                for container in containers
+            }
+        return data
+
+    def _get_storable_ayon_data(self) -> dict:
+        """Return AYON data in the form stored in project notes."""
+        data = (self._ayon_data or {}).copy()
+        if EQUALIZER_INSTANCES_KEY in data:
+            data[EQUALIZER_INSTANCES_KEY] = list(
+                data[EQUALIZER_INSTANCES_KEY].values())
+        if EQUALIZER_CONTAINERS_KEY in data:
+            data[EQUALIZER_CONTAINERS_KEY] = list(
+                data[EQUALIZER_CONTAINERS_KEY].values())
+        return data
+
+    def _get_instances_by_id(self) -> dict[str, dict]:
+        """Return cached mapping of publish instances by their id."""
+        return self._read_ayon_data().setdefault(EQUALIZER_INSTANCES_KEY, {})
+
+    def _get_containers_by_key(self) -> dict[tuple[str, str], dict]:
+        """Return cached mapping of containers by name and namespace."""
+        return self._read_ayon_data().setdefault(
+            EQUALIZER_CONTAINERS_KEY, {})
+
     def get_ayon_data(self) -> dict:
         """Get AYON context data from the current project.
 
@@ -173,25 +822,16 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         place to store metadata, so we store context data in
         the project notes encoded as JSON and wrapped in a
         special guard string `AYON_CONTEXT::...::AYON_CONTEXT_END`.
+        JSON can be optionally compressed, see `decode_ayon_data`.
+
+        Parsed data are cached, see `_read_ayon_data`.
 
         Returns:
             dict: Context data.
 
         """
-        # sourcery skip: use-named-expression
-        m = re.search(AYON_METADATA_REGEX, tde4.getProjectNotes())
-        if not m:
-            self._create_ayon_data()
-            return {}
-        try:
-            context = json.loads(m["context"]) if m else {}
-        except ValueError:
-            self.log.debug("AYON data is not valid json")
-            # AYON data not found or invalid, create empty placeholder
-            self._create_ayon_data()
-            return {}
-
-        return context
+        self._read_ayon_data()
+        return copy.deepcopy(self._get_storable_ayon_data())
 
     def update_ayon_data(self, data: dict) -> None:
         """Update AYON context data in the current project.
@@ -200,31 +840,178 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         project notes. If the context data is not found, create
         a placeholder there. See `get_context_data` for more info.
 
+        Inside `metadata_transaction` the change is only kept in memory
+        and written when the transaction ends.
+
         Args:
             data (dict): Context data.
 
         """
-        original_data = self.get_ayon_data()
-
-        updated_data = original_data.copy()
+        updated_data = self._read_ayon_data().copy()
         updated_data.update(data)
-        update_str = json.dumps(
-            updated_data or {}, indent=4, cls=AYONJSONEncoder)
+        self._ayon_data = self._index_ayon_data(updated_data)
+        self._ayon_data_changed()
 
-        tde4.setProjectNotes(
-            re.sub(
-                AYON_METADATA_REGEX,
-                AYON_METADATA_GUARD.format(update_str),
-                tde4.getProjectNotes(),
-            )
-        )
+    def _ayon_data_changed(self) -> None:
+        """Persist changes done to cached AYON data.
+
+        Write them right away or mark them to be written at the end
+        of `metadata_transaction`.
+        """
+        if self._transaction_depth:
+            self._transaction_dirty = True
+            return
+        if self._deferred_project is not None:
+            self._deferred_dirty = True
+            return
+        self._write_ayon_data()
+
+    def _write_ayon_data(self) -> None:
+        """Write cached AYON data to the project notes."""
+        # deferred changes are written together with the rest
+        self._deferred_project = None
+        self._deferred_dirty = False
+        if self._sidecar_error:
+            # data weren't read, pointer to them must be kept
+            err_msg = (
+                f"AYON data can't be changed, {self._sidecar_error} "
+                "can't be read.")
+            raise RuntimeError(err_msg)
+
+        # with sidecar storage, data are moved to the sidecar file when
+        # the workfile is saved, see `save_workfile`
+        payload, json_str = encode_ayon_data(
+            self._get_storable_ayon_data(), self.metadata_format)
+        self._set_ayon_payload(payload)
+        # keep cache in sync with what was written, decoding the payload
+        # is much cheaper than searching the notes again and it also
+        # detaches the cache from objects passed by the caller.
+        self._ayon_data = self._index_ayon_data(json.loads(json_str))
+
+    def _set_ayon_payload(self, payload: str) -> None:
+        """Replace content of the AYON block in project notes.
+
+        Payload is spliced into the notes at the position remembered from
+        the last read or write. Notes are searched again only if they
+        were changed outside of the host.
+
+        Args:
+            payload (str): New content between the guards.
+
+        """
+        self._record_project_state()
+        notes = tde4.getProjectNotes()
+        if notes != self._ayon_notes or self._ayon_span is None:
+            m = re.search(AYON_METADATA_REGEX, notes)
+            if not m:
+                self._create_ayon_data()
+                notes = tde4.getProjectNotes()
+                m = re.search(AYON_METADATA_REGEX, notes)
+            self._ayon_span = m.span("context")
+
+        start, end = self._ayon_span
+        updated_notes = f"{notes[:start]}{payload}{notes[end:]}"
+        tde4.setProjectNotes(updated_notes)
         tde4.updateGUI()
+        self._ayon_notes = tde4.getProjectNotes()
+        self._ayon_payload = payload
+        # 3DEqualizer might have altered the notes while storing them
+        self._ayon_span = (
+            (start, start + len(payload))
+            if self._ayon_notes == updated_notes else None
+        )
+
+    @contextlib.contextmanager
+    def metadata_transaction(self) -> Generator[EqualizerHost, None, None]:
+        """Batch changes of AYON data into a single write.
+
+        All changes done inside the context are accumulated in memory,
+        project notes are written and GUI refreshed only once when the
+        outermost transaction ends. Nested transactions join the outer
+        one. If an exception is raised, changes done inside the failed
+        transaction are discarded.
+
+        Changes not written yet when the transaction starts, pending
+        changes of the outer transaction or deferred changes, are copied
+        to be restored on failure. Otherwise the cache is dropped and
+        parsed from the notes again.
+
+        Example:
+            >>> with host.metadata_transaction():
+            ...     for instance_id in instance_ids:
+            ...         host.remove_create_instance(instance_id)
+
+        Yields:
+            EqualizerHost: The host itself.
+
+        """
+        transaction_dirty = self._transaction_dirty
+        snapshot = None
+        if transaction_dirty or self._deferred_dirty:
+            snapshot = copy.deepcopy(self._ayon_data)
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if snapshot is not None:
+                self._ayon_data = snapshot
+                self._transaction_dirty = transaction_dirty
+            else:
+                self._transaction_dirty = False
+                self._invalidate_ayon_data()
+            raise
+
+        self._transaction_depth -= 1
+        if not self._transaction_depth and self._transaction_dirty:
+            self._transaction_dirty = False
+            self._write_ayon_data()
+
+    def defer_metadata_write(self) -> None:
+        """Postpone writing of AYON data to the next heartbeat tick.
+
+        Changes done by independent calls in a row, e.g. update of every
+        container from the scene inventory, are then written only once.
+        Changes are dropped if another project is opened before they are
+        written. Without the heartbeat changes are written immediately.
+        """
+        if self._deferred_project is not None or self._heartbeat is None:
+            return
+        # validate cache, so the changes are applied to current data
+        self._read_ayon_data()
+        self._deferred_project = tde4.getProjectPath()
+
+    def _discard_deferred_changes(self) -> None:
+        """Drop changes of a project which is not open anymore."""
+        if self._deferred_dirty:
+            self.log.warning(
+                "Project %s was changed before AYON data were written, "
+                "discarding the changes.", self._deferred_project)
+        self._invalidate_ayon_data()
+
+    def _flush_deferred_metadata(self) -> bool:
+        """Write changes postponed by `defer_metadata_write`.
+
+        Changes are validated against the current project first. Inside
+        transaction they are left to be written when it ends.
+
+        Returns:
+            bool: Always False, there is no more work for the heartbeat.
+
+        """
+        if self._deferred_project is None or self._transaction_depth:
+            return False
+        self._read_ayon_data()
+        if self._deferred_dirty:
+            self._write_ayon_data()
+        self._deferred_project = None
+        return False
 
     def get_context_data(self) -> dict:
         """Get context data from the current project."""
-        data = self.get_ayon_data()
+        data = self._read_ayon_data()
 
-        return data.get(EQUALIZER_CONTEXT_KEY, {})
+        return copy.deepcopy(data.get(EQUALIZER_CONTEXT_KEY, {}))
 
     def update_context_data(self, data: dict, changes: dict) -> None:
         """Update context data in the current project.
@@ -239,15 +1026,25 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         """
         if not data:
             return
-        ayon_data = self.get_ayon_data()
-        ayon_data[EQUALIZER_CONTEXT_KEY] = data
-        self.update_ayon_data(ayon_data)
+        self.update_ayon_data({EQUALIZER_CONTEXT_KEY: data})
 
 
     def get_publish_instances(self) -> list[dict]:
         """Get publish instances from the current project."""
-        data = self.get_ayon_data()
-        return data.get(EQUALIZER_INSTANCES_KEY, [])
+        return copy.deepcopy(list(self._get_instances_by_id().values()))
+
+    def get_publish_instance(self, instance_id: str) -> Optional[dict]:
+        """Get a publish instance by its id.
+
+        Args:
+            instance_id (str): Publish instance id.
+
+        Returns:
+            Optional[dict]: Publish instance data or None if not found.
+
+        """
+        instance_data = self._get_instances_by_id().get(instance_id)
+        return copy.deepcopy(instance_data)
 
     def add_publish_instance(self, instance_data: dict) -> None:
         """Add a publish instance to the current project.
@@ -256,12 +1053,9 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
             instance_data (dict): Publish instance to add.
 
         """
-        data = self.get_ayon_data()
-        publish_instances = self.get_publish_instances()
-        publish_instances.append(instance_data)
-        data[EQUALIZER_INSTANCES_KEY] = publish_instances
-
-        self.update_ayon_data(data)
+        self._get_instances_by_id()[instance_data["instance_id"]] = (
+            instance_data)
+        self._ayon_data_changed()
 
     def update_publish_instance(
             self,
@@ -270,27 +1064,65 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
     ) -> None:
         """Update a publish instance in the current project.
 
+        Instance keeps its position, if it doesn't exist, it is added.
+
         Args:
             instance_id (str): Publish instance id to update.
             data (dict): Data to update.
 
         """
-        ayon_data = self.get_ayon_data()
-        publish_instances = self.get_publish_instances()
-        for idx, publish_instance in enumerate(publish_instances):
-            if publish_instance["instance_id"] == instance_id:
-                publish_instances[idx] = data
-                break
-        ayon_data[EQUALIZER_INSTANCES_KEY] = publish_instances
+        self._get_instances_by_id()[instance_id] = data
+        self._ayon_data_changed()
+
+    def patch_publish_instance(
+            self,
+            instance_id: str,
+            changed: dict,
+            removed_keys: Iterable[str] = (),
+            data: Optional[dict] = None,
+    ) -> bool:
+        """Apply changed keys to a stored publish instance.
 
-        self.update_ayon_data(ayon_data)
+        AYON data are written only if some value actually differs from
+        the stored one.
+
+        Args:
+            instance_id (str): Publish instance id to update.
+            changed (dict): New values of changed keys.
+            removed_keys (Iterable[str]): Keys to remove.
+            data (Optional[dict]): Complete data of the instance, stored
+                if the instance is not stored yet.
+
+        Returns:
+            bool: False if the instance is not stored and data weren't
+                passed, True otherwise.
+
+        """
+        instance_data = self._get_instances_by_id().get(instance_id)
+        if instance_data is None:
+            if data is None:
+                return False
+            self.update_publish_instance(instance_id, data)
+            return True
+
+        modified = False
+        for key, value in changed.items():
+            if key not in instance_data or instance_data[key] != value:
+                instance_data[key] = value
+                modified = True
+        for key in removed_keys:
+            if key in instance_data:
+                del instance_data[key]
+                modified = True
+
+        if modified:
+            self._ayon_data_changed()
+        return True
 
     def write_create_instances(
             self, instances: list[dict]) -> None:
         """Write publish instances to the current project."""
-        ayon_data = self.get_ayon_data()
-        ayon_data[EQUALIZER_INSTANCES_KEY] = instances
-        self.update_ayon_data(ayon_data)
+        self.update_ayon_data({EQUALIZER_INSTANCES_KEY: instances})
 
     def remove_create_instance(self, instance_id: str) -> None:
         """Remove a publish instance from the current project.
@@ -299,21 +1131,21 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
             instance_id (str): Publish instance id to remove.
 
         """
-        data = self.get_ayon_data()
-        publish_instances = self.get_publish_instances()
-        publish_instances = [
-            publish_instance
-            for publish_instance in publish_instances
-            if publish_instance["instance_id"] != instance_id
-        ]
-        data[EQUALIZER_INSTANCES_KEY] = publish_instances
-
-        self.update_ayon_data(data)
+        if self._get_instances_by_id().pop(instance_id, None) is not None:
+            self._ayon_data_changed()
 
 
     def install(self) -> None:
         """Install the host."""
-        if not QtCore.QCoreApplication.instance():
+        tools_mode = os.getenv("AYON_TDE4_TOOLS_MODE", TOOLS_MODE_HOST)
+        if tools_mode not in TOOLS_MODES:
+            self.log.warning(
+                "AYON_TDE4_TOOLS_MODE %s is not supported, "
+                "using %s", tools_mode, TOOLS_MODE_HOST)
+            tools_mode = TOOLS_MODE_HOST
+        self.tools_mode = tools_mode
+
+        if QtCore is not None and not QtCore.QCoreApplication.instance():
             app = QtWidgets.QApplication([])
             self._qapp = app
             self._qapp.setQuitOnLastWindowClosed(False)
@@ -324,6 +1156,42 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         register_loader_plugin_path(LOAD_PATH)
         register_creator_plugin_path(CREATE_PATH)
 
+        metadata_format = os.getenv(
+            "AYON_TDE4_METADATA_FORMAT", AYON_METADATA_FORMAT_JSON)
+        if metadata_format not in AYON_METADATA_FORMATS:
+            self.log.warning(
+                "AYON_TDE4_METADATA_FORMAT %s is not supported, "
+                "using %s", metadata_format, AYON_METADATA_FORMAT_JSON)
+            metadata_format = AYON_METADATA_FORMAT_JSON
+        self.metadata_format = metadata_format
+
+        metadata_storage = os.getenv(
+            "AYON_TDE4_METADATA_STORAGE", AYON_METADATA_STORAGE_NOTES)
+        if metadata_storage not in AYON_METADATA_STORAGES:
+            self.log.warning(
+                "AYON_TDE4_METADATA_STORAGE %s is not supported, "
+                "using %s", metadata_storage, AYON_METADATA_STORAGE_NOTES)
+            metadata_storage = AYON_METADATA_STORAGE_NOTES
+        self.metadata_storage = metadata_storage
+
+        self._install_heartbeat()
+
+        if os.getenv("AYON_TDE4_COMMAND_SERVER") == "1":
+            try:
+                port = int(os.getenv("AYON_TDE4_COMMAND_SERVER_PORT") or 0)
+            except ValueError:
+                self.log.warning(
+                    "AYON_TDE4_COMMAND_SERVER_PORT is not a valid integer")
+                port = 0
+            try:
+                self.start_command_server(port)
+            except OSError:
+                self.log.warning(
+                    "Cannot start command server on port %s",
+                    port, exc_info=True)
+
+    def _install_heartbeat(self) -> None:
+        """Create heartbeat from settings and register it in 3DEqualizer."""
         try:
             heartbeat_interval = int(
                 os.getenv("AYON_TDE4_HEARTBEAT_INTERVAL")) or 100
@@ -332,20 +1200,450 @@ class EqualizerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
                 "AYON_TDE4_HEARTBEAT_INTERVAL is not a valid integer")
             heartbeat_interval = 100
 
-        tde4.setTimerCallbackFunction(
-            "EqualizerHost._timer", heartbeat_interval)
+        try:
+            heartbeat_idle_interval = int(
+                os.getenv("AYON_TDE4_HEARTBEAT_IDLE_INTERVAL")
+            ) or HEARTBEAT_IDLE_INTERVAL
+        except (ValueError, TypeError):
+            heartbeat_idle_interval = HEARTBEAT_IDLE_INTERVAL
+
+        heartbeat_mode = os.getenv(
+            "AYON_TDE4_HEARTBEAT_MODE", HEARTBEAT_MODE_FIXED)
+        if heartbeat_mode not in HEARTBEAT_MODES:
+            self.log.warning(
+                "AYON_TDE4_HEARTBEAT_MODE %s is not supported, "
+                "using %s", heartbeat_mode, HEARTBEAT_MODE_FIXED)
+            heartbeat_mode = HEARTBEAT_MODE_FIXED
+
+        try:
+            self._scheduler.budget = int(
+                os.getenv("AYON_TDE4_TASK_BUDGET") or 20)
+        except ValueError:
+            self.log.warning(
+                "AYON_TDE4_TASK_BUDGET is not a valid integer")
+
+        try:
+            heartbeat_budget = int(
+                os.getenv("AYON_TDE4_HEARTBEAT_BUDGET") or 0)
+        except ValueError:
+            self.log.warning(
+                "AYON_TDE4_HEARTBEAT_BUDGET is not a valid integer")
+            heartbeat_budget = 0
+
+        heartbeat_stats = None
+        if os.getenv("AYON_TDE4_HEARTBEAT_STATS") == "1":
+            heartbeat_stats = HeartbeatStats(
+                log_path=os.getenv("AYON_TDE4_HEARTBEAT_STATS_LOG"))
+
+        self._heartbeat = Heartbeat(
+            "EqualizerHost._timer",
+            interval=heartbeat_interval,
+            idle_interval=heartbeat_idle_interval,
+            mode=heartbeat_mode,
+            budget=heartbeat_budget,
+            stats=heartbeat_stats,
+        )
+        self._heartbeat.add_callback(self._scheduler.step)
+        self._heartbeat.add_callback(self._flush_deferred_metadata)
+        if self._async_loop is not None:
+            self._heartbeat.add_callback(self._async_loop.step)
+        if self._command_server is not None:
+            self._heartbeat.add_callback(self._command_server.poll)
+        self._heartbeat.add_callback(self._poll_tool_processes)
+        self._heartbeat.add_callback(self._poll_background_publishes)
+        self._heartbeat.start()
 
     @staticmethod
     def _timer() -> None:
         """Timer callback function."""
-        QtWidgets.QApplication.instance().processEvents(
-            QtCore.QEventLoop.AllEvents)
+        EqualizerHost.get_host()._heartbeat.tick()  # noqa: SLF001
+
+    def wake_heartbeat(self) -> None:
+        """Switch heartbeat to the fast interval.
+
+        Call this when showing a tool so it doesn't have to wait for
+        the idle interval in adaptive heartbeat mode.
+        """
+        if self._heartbeat is not None:
+            self._heartbeat.wake()
+
+    def run_task(
+            self,
+            generator: Generator[Optional[float], None, Any],
+            label: str = "",
+            on_progress: Optional[Callable[[Task], None]] = None,
+            on_done: Optional[Callable[[Task], None]] = None,
+    ) -> Task:
+        """Run long operation incrementally on the main thread.
+
+        Generator is advanced from the heartbeat, each tick runs tasks
+        only for a limited time so 3DEqualizer UI stays responsive. See
+        `ayon_equalizer.api.scheduler` for details. Without the heartbeat
+        the task is run to the end before returning.
+
+        Args:
+            generator (Generator): Generator doing the work and yielding
+                its progress from 0 to 1 or None.
+            label (str): Label of the task used in logs.
+            on_progress (Optional[Callable[[Task], None]]): Called every
+                time the task yields.
+            on_done (Optional[Callable[[Task], None]]): Called when
+                the task is finished, failed or cancelled.
+
+        Returns:
+            Task: Submitted task, can be used to cancel it.
+
+        """
+        if self._heartbeat is None:
+            task = Task(generator, label, on_progress, on_done)
+            task.run()
+            return task
+        task = self._scheduler.submit(
+            generator, label, on_progress, on_done)
+        self.wake_heartbeat()
+        return task
+
+    def get_tasks(self) -> list[Task]:
+        """Get unfinished tasks submitted by `run_task`."""
+        return self._scheduler.tasks
+
+    def get_async_loop(self) -> AsyncLoop:
+        """Get asyncio loop stepped from the heartbeat.
+
+        Loop is created on the first call.
+
+        Returns:
+            AsyncLoop: Loop of the host.
+
+        """
+        if self._async_loop is None:
+            self._async_loop = AsyncLoop()
+            if self._heartbeat is not None:
+                self._heartbeat.add_callback(self._async_loop.step)
+        return self._async_loop
+
+    def run_async(
+            self,
+            awaitable: Awaitable,
+            on_done: Optional[DoneCallback] = None,
+    ) -> asyncio.Future:
+        """Run coroutine without blocking 3DEqualizer.
+
+        Args:
+            awaitable (Awaitable): Coroutine or future to run.
+            on_done (Optional[DoneCallback]): Called on the main thread
+                with the result and the exception, one of them is None.
+
+        Returns:
+            asyncio.Future: Future of the result.
+
+        """
+        future = self.get_async_loop().run(awaitable, on_done)
+        self.wake_heartbeat()
+        return future
+
+    def run_in_executor(
+            self,
+            func: Callable[..., Any],
+            *args: Any,  # noqa: ANN401
+            on_done: Optional[DoneCallback] = None,
+    ) -> asyncio.Future:
+        """Run blocking function, e.g. server request, in worker thread.
+
+        Function must not use `tde4`, apply its result to the scene in
+        `on_done` callback, which is called on the main thread.
+
+        Args:
+            func (Callable[..., Any]): Function to run.
+            *args (Any): Arguments of the function.
+            on_done (Optional[DoneCallback]): Called on the main thread
+                with the result and the exception, one of them is None.
+
+        Returns:
+            asyncio.Future: Future of the result.
+
+        """
+        future = self.get_async_loop().run_in_executor(
+            func, *args, on_done=on_done)
+        self.wake_heartbeat()
+        return future
+
+    def get_heartbeat_stats(self) -> Optional[dict]:
+        """Get statistics of recent heartbeat ticks.
+
+        Statistics are collected only if enabled in settings.
+
+        Returns:
+            Optional[dict]: Summary of collected ticks, see
+                `HeartbeatStats.summary`, or None if statistics are
+                not collected.
+
+        """
+        if self._heartbeat is None or self._heartbeat.stats is None:
+            return None
+        return self._heartbeat.stats.summary()
+
+    def reset_heartbeat_stats(self) -> None:
+        """Drop collected heartbeat statistics."""
+        if self._heartbeat is not None and self._heartbeat.stats is not None:
+            self._heartbeat.stats.reset()
+
+    def start_command_server(self, port: int = 0) -> CommandServer:
+        """Start server used by AYON tools and pipeline scripts.
+
+        Server is started only once and polled from the heartbeat. It
+        exposes `tde4` module as `tde4.*` commands, methods of the host
+        listed in `REMOTE_HOST_METHODS` as `host.*` commands and batch
+        scene queries as `scene.*` commands.
+
+        Address and token of the server are written to a file in
+        `get_command_server_info_dir`, so scripts running outside of
+        3DEqualizer can connect to it.
+
+        Args:
+            port (int): Port to listen on, free port is used for zero.
+
+        Returns:
+            CommandServer: Running server.
+
+        """
+        if self._command_server is not None:
+            return self._command_server
+
+        server = CommandServer(port=port, encoder=AYONJSONEncoder)
+        server.register_namespace("tde4", tde4)
+        SceneQuery(tde4).register(server)
+        for method in REMOTE_HOST_METHODS:
+            server.register(f"host.{method}", getattr(self, method))
+        server.register(
+            "host.get_containers", lambda: list(self.get_containers()))
+        server.register(
+            "host.add_containers",
+            lambda containers: self.add_containers(
+                Container.from_dict(container) for container in containers
+            ))
+        server.register(
+            "host.update_context_data",
+            lambda data: self.update_context_data(data, {}))
+        server.register(
+            "host.transaction",
+            lambda calls: self._run_remote_transaction(server, calls))
+        server.register("host.get_environment", self._get_environment)
+        server.register("host.update_environment", self._update_environment)
+        if self._heartbeat is not None:
+            self._heartbeat.add_callback(server.poll)
+        self._command_server = server
+        self._write_command_server_info()
+        return server
+
+    def _run_remote_transaction(
+            self,
+            server: CommandServer,
+            calls: list[list],
+    ) -> list[Any]:
+        """Run commands sent together by `EqualizerProxyHost`.
+
+        Commands are executed in a single `metadata_transaction`, so AYON
+        data are written once and not at all if any of them fails.
+
+        Args:
+            server (CommandServer): Server the commands are registered in.
+            calls (list[list]): Names and parameters of the commands.
+
+        Returns:
+            list[Any]: Results of the commands.
+
+        """
+        with self.metadata_transaction():
+            return [server.call(method, params) for method, params in calls]
+
+    def _write_command_server_info(self) -> None:
+        """Write address and token of the command server to a file."""
+        info_dir = get_command_server_info_dir()
+        path = os.path.join(info_dir, f"{os.getpid()}.json")
+        host, port = self._command_server.address
+        info = {
+            "host": host,
+            "port": port,
+            "token": self._command_server.token,
+            "pid": os.getpid(),
+        }
+        try:
+            os.makedirs(info_dir, exist_ok=True)
+            # token must be readable only by the user
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as stream:
+                json.dump(info, stream)
+        except OSError:
+            self.log.warning(
+                "Cannot write command server info to %s",
+                path, exc_info=True)
+            return
+        atexit.register(_remove_file, path)
+
+    def launch_tool(self, tool_name: str, **options: Any) -> None:  # noqa: ANN401
+        """Launch AYON tool in separate process.
+
+        Tool process is started by AYON launcher and talks to
+        3DEqualizer through the command server.
+
+        Args:
+            tool_name (str): Name of the tool as used by
+                `host_tools.show_tool_by_name`, e.g. "publisher".
+            **options (Any): Keyword arguments passed to the tool.
+
+        """
+        process = self._tool_processes.get(tool_name)
+        if process is not None and process.poll() is None:
+            self.log.info("%s is already running", tool_name)
+            return
+
+        server = self.start_command_server()
+        host, port = server.address
+        env = os.environ.copy()
+        env.pop("PYTHONHOME", None)
+        env["AYON_TDE4_SERVER"] = f"{host}:{port}"
+        env["AYON_TDE4_SERVER_TOKEN"] = server.token
+        env["AYON_TDE4_TOOL"] = tool_name
+        env["AYON_TDE4_TOOL_OPTIONS"] = json.dumps(options)
+        self._tool_processes[tool_name] = subprocess.Popen(
+            [os.environ["AYON_EXECUTABLE"], "run", REMOTE_TOOL_SCRIPT],
+            env=env,
+        )
+
+    def _poll_tool_processes(self) -> bool:
+        """Forget finished tool processes.
+
+        Returns:
+            bool: Always False, waiting for tools doesn't need fast
+                heartbeat.
+
+        """
+        for tool_name, process in tuple(self._tool_processes.items()):
+            if process.poll() is not None:
+                del self._tool_processes[tool_name]
+        return False
+
+    def run_export(self, name: str, kwargs: dict[str, Any]) -> Any:  # noqa: ANN401
+        """Run export script of 3DEqualizer.
+
+        Extractors use this instead of calling the export directly, so it
+        runs in 3DEqualizer even when publishing from a tool in separate
+        process. See `ayon_equalizer.api.export` for details.
+
+        Args:
+            name (str): Name of the export in `EXPORTS`.
+            kwargs (dict[str, Any]): Arguments of the export.
+
+        Returns:
+            Any: Result of the export.
+
+        """
+        return run_export(name, kwargs)
+
+    def launch_background_publish(
+            self,
+            metadata_path: str,
+            remove_dir: bool = False,  # noqa: FBT001, FBT002
+    ) -> dict:
+        """Integrate extracted instances in separate process.
+
+        Process is polled from the heartbeat, see
+        `ayon_equalizer.api.background_publish` for details. Artist is
+        notified when the integration ends.
+
+        Args:
+            metadata_path (str): Path to JSON file written by
+                `write_publish_metadata`.
+            remove_dir (bool): Remove directory of the metadata file
+                when the publish ends.
+
+        Returns:
+            dict: State of the publish, see `BackgroundPublish.to_dict`.
+
+        """
+        publish = BackgroundPublish(
+            metadata_path,
+            on_done=self._on_background_publish_done,
+            remove_dir=remove_dir,
+        )
+        publish.start()
+        self._background_publishes.append(publish)
+        return publish.to_dict()
+
+    def get_background_publishes(self) -> list[dict]:
+        """Get state of background publishes started in this session.
+
+        Returns:
+            list[dict]: State of each publish, the oldest first.
+
+        """
+        return [publish.to_dict() for publish in self._background_publishes]
+
+    def _poll_background_publishes(self) -> bool:
+        """Update state of running background publishes.
+
+        Returns:
+            bool: Always False, integration takes seconds at least, so
+                it doesn't need fast heartbeat.
+
+        """
+        for publish in self._background_publishes:
+            publish.poll()
+        return False
+
+    def _on_background_publish_done(self, publish: BackgroundPublish) -> None:
+        """Tell the artist the publisher can't report the result."""
+        self._show_message(
+            "AYON Publish",
+            publish.get_report(),
+            error=publish.state == PUBLISH_STATE_FAILED,
+        )
+
+    def _show_message(self, title: str, message: str, *, error: bool) -> None:
+        """Show message without blocking 3DEqualizer.
+
+        Without Qt only errors are shown, in a 3DEqualizer requester.
+        """
+        if self._qapp is None:
+            if error:
+                tde4.postQuestionRequester(title, message, "Ok")
+            return
+        icon = QtWidgets.QMessageBox.Warning \
+            if error else QtWidgets.QMessageBox.Information
+        box = QtWidgets.QMessageBox(
+            icon, title, message, parent=self.get_main_window())
+        box.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        box.setModal(False)
+        # keep reference until closed, box may not have parent
+        self._message_boxes.append(box)
+        box.finished.connect(lambda _: self._message_boxes.remove(box))
+        box.show()
+        self.wake_heartbeat()
+
+    @staticmethod
+    def _get_environment(keys: list[str]) -> dict[str, Optional[str]]:
+        """Return values of AYON environment variables."""
+        return {
+            key: os.getenv(key)
+            for key in keys
+            if key.startswith("AYON_")
+        }
+
+    @staticmethod
+    def _update_environment(env: dict[str, str]) -> None:
+        """Set AYON environment variables, e.g. after context change."""
+        for key, value in env.items():
+            if key.startswith("AYON_"):
+                os.environ[key] = value
 
     @classmethod
     def get_host(cls) -> EqualizerHost:
         """Get the host instance."""
         return cls._instance
 
-    def get_main_window(self) -> QtWidgets.QWidget:
+    def get_main_window(self) -> Optional[QtWidgets.QWidget]:
         """Get the main window of the host application."""
+        if self._qapp is None:
+            return None
         return self._qapp.activeWindow()
@@ -1,4 +1,13 @@
 """Library functions for the AYON Equalizer API."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import ayon_api
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 
 def maya_valid_name(name: str) -> str:
     """Make a given name Maya valid and return it.
@@ -38,3 +47,59 @@ def maya_valid_name(name: str) -> str:
         name = name.replace("__", "_")
 
     return name.removesuffix("_")
+
+
+def get_outdated_representation_ids(
+        project_name: str,
+        representation_ids: Iterable[str],
+) -> set[str]:
+    """Get representations whose version is not the latest one.
+
+    Hero versions are never outdated. Function only queries AYON server,
+    so it can be run in a worker thread, see
+    `EqualizerHost.run_in_executor`.
+
+    Arguments:
+        project_name (str): Project name.
+        representation_ids (Iterable[str]): Representation ids.
+
+    Returns:
+        set[str]: Ids of outdated representations.
+
+    """
+    version_id_by_repre_id = {
+        repre_entity["id"]: repre_entity["versionId"]
+        for repre_entity in ayon_api.get_representations(
+            project_name,
+            representation_ids=set(representation_ids),
+            fields={"id", "versionId"},
+        )
+    }
+    if not version_id_by_repre_id:
+        return set()
+
+    version_entities = {
+        version_entity["id"]: version_entity
+        for version_entity in ayon_api.get_versions(
+            project_name,
+            version_ids=set(version_id_by_repre_id.values()),
+            fields={"id", "productId", "version"},
+        )
+    }
+    last_versions = ayon_api.get_last_versions(
+        project_name,
+        {version["productId"] for version in version_entities.values()},
+        fields={"id", "productId", "version"},
+    )
+
+    outdated = set()
+    for repre_id, version_id in version_id_by_repre_id.items():
+        version_entity = version_entities.get(version_id)
+        # hero versions have negative version number
+        if version_entity is None or version_entity["version"] < 0:
+            continue
+        last_version = last_versions.get(version_entity["productId"])
+        if (last_version is not None
+                and last_version["version"] > version_entity["version"]):
+            outdated.add(repre_id)
+    return outdated
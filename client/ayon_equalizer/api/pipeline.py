@@ -1,23 +1,91 @@
 """Pipeline API module."""
+from __future__ import annotations
+
 import contextlib
-from dataclasses import dataclass
+from typing import Optional
 
 import tde4
 from ayon_core.pipeline import AYON_CONTAINER_ID
 
 
-@dataclass
 class Container:
-    """Container data class."""
-
-    name: str = None
-    id: str = AYON_CONTAINER_ID
-    namespace: str = ""
-    loader: str = None
-    representation: str = None
-    objectName: str = None  # noqa: N815
-    timestamp: int = 0
-    version: str = None
+    """Container data class.
+
+    Containers are created and converted to dict for every loaded
+    product, so this is a plain class with `__slots__` instead of
+    a dataclass to keep it small and its conversion to dict cheap.
+    """
+
+    # order of the slots defines order of keys in the dict
+    __slots__ = (  # noqa: RUF023
+        "name",
+        "id",
+        "namespace",
+        "loader",
+        "representation",
+        "objectName",
+        "timestamp",
+        "version",
+    )
+
+    def __init__(  # noqa: PLR0913, PLR0917
+            self,
+            name: Optional[str] = None,
+            id: str = AYON_CONTAINER_ID,  # noqa: A002
+            namespace: str = "",
+            loader: Optional[str] = None,
+            representation: Optional[str] = None,
+            objectName: Optional[str] = None,  # noqa: N803
+            timestamp: int = 0,
+            version: Optional[str] = None,
+    ) -> None:
+        """Initialize container."""
+        self.name = name
+        self.id = id
+        self.namespace = namespace
+        self.loader = loader
+        self.representation = representation
+        self.objectName = objectName
+        self.timestamp = timestamp
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Container:
+        """Create container from dict, ignoring unknown keys.
+
+        Args:
+            data (dict): Container data.
+
+        Returns:
+            Container: Container instance.
+
+        """
+        return cls(**{
+            key: value for key, value in data.items()
+            if key in cls.__slots__
+        })
+
+    def to_dict(self) -> dict:
+        """Convert container to dict without copying values.
+
+        Returns:
+            dict: Container data.
+
+        """
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    # containers are mutable, same as non-frozen dataclass
+    __hash__ = None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Container):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
 
 
 @contextlib.contextmanager
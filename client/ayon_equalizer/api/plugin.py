@@ -7,18 +7,33 @@ Note:
 """
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import os
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Optional
 
+import tde4
 from ayon_core.lib import BoolDef, EnumDef, NumberDef
 from ayon_core.pipeline import (
     CreatedInstance,
     Creator,
     OptionalPyblishPluginMixin,
+    registered_host,
 )
 
+from .exporters import get_exporter_digest
+from .extract_cache import get_extract_cache, get_fingerprint
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    import pyblish.api
+
     from .host import EqualizerHost
 
+# key in `collection_shared_data` with instances grouped by creator
+SHARED_INSTANCES_KEY = "equalizer_cached_instances"
+
 
 class EqualizerCreator(Creator):
     """Base class for creating instances in 3DEqualizer."""
@@ -43,6 +58,37 @@ class EqualizerCreator(Creator):
 
         """
         self.log.debug("EqualizerCreator.create")
+        host: EqualizerHost = self.host
+        with host.metadata_transaction():
+            return self._create_instance(product_name, instance_data)
+
+    def create_instances(
+        self,
+        instances: list[tuple[str, dict]],
+    ) -> list[CreatedInstance]:
+        """Create multiple instances with a single write to the host.
+
+        Args:
+            instances (list[tuple[str, dict]]): Product names and data
+                of the instances to create.
+
+        Returns:
+            list[CreatedInstance]: Created instances.
+
+        """
+        host: EqualizerHost = self.host
+        with host.metadata_transaction():
+            return [
+                self._create_instance(product_name, instance_data)
+                for product_name, instance_data in instances
+            ]
+
+    def _create_instance(
+        self,
+        product_name: str,
+        instance_data: dict,
+    ) -> CreatedInstance:
+        """Create instance, add it to context and store it in the host."""
         product_type = instance_data.get("productType")
         if not product_type:
             product_type = self.product_base_type
@@ -67,47 +113,145 @@ class EqualizerCreator(Creator):
             list[openpype.pipeline.CreatedInstance]: List of instances.
 
         """
-        host: EqualizerHost = self.host
-        for instance_data in host.get_publish_instances():
-            if instance_data["creator_identifier"] != self.identifier:
-                continue
+        instances_by_creator = self.get_cached_instances()
+        for instance_data in instances_by_creator.get(self.identifier, []):
             created_instance = CreatedInstance.from_existing(
                 instance_data, self
             )
             self._add_instance_to_context(created_instance)
 
+    def get_cached_instances(self) -> dict[str, list[dict]]:
+        """Get publish instances grouped by creator identifier.
+
+        Instances are read from the host only once per reset of create
+        context and shared by all creators through
+        `collection_shared_data`.
+
+        Returns:
+            dict[str, list[dict]]: Instances data by creator identifier.
+
+        """
+        shared_data = self.collection_shared_data
+        instances_by_creator = shared_data.get(SHARED_INSTANCES_KEY)
+        if instances_by_creator is None:
+            host: EqualizerHost = self.host
+            instances_by_creator = defaultdict(list)
+            for instance_data in host.get_publish_instances():
+                instances_by_creator[
+                    instance_data["creator_identifier"]
+                ].append(instance_data)
+            shared_data[SHARED_INSTANCES_KEY] = instances_by_creator
+        return instances_by_creator
+
     def update_instances(self, update_list: list[dict]) -> None:
-        """Update instances in the host application."""
-        host: EqualizerHost = self.host
+        """Update instances in the host application.
 
-        current_instances = host.get_publish_instances()
-        cur_instances_by_id = {}
-        for instance_data in current_instances:
-            # sourcery skip: use-named-expression
-            instance_id = instance_data.get("instance_id")
-            if instance_id:
-                cur_instances_by_id[instance_id] = instance_data
-
-        for instance, changes in update_list:
-            instance_data = changes.new_value
-            cur_instance_data = cur_instances_by_id.get(instance.id)
-            if cur_instance_data is None:
-                current_instances.append(instance_data)
-                continue
-            for key in set(cur_instance_data) - set(instance_data):
-                cur_instance_data.pop(key)
-            cur_instance_data.update(instance_data)
-        host.write_create_instances(current_instances)
+        Only changed keys of changed instances are applied, host writes
+        the data only if anything actually differs.
+        """
+        host: EqualizerHost = self.host
+        with host.metadata_transaction():
+            for instance, changes in update_list:
+                if not changes.changed:
+                    continue
+                instance_data = changes.new_value
+                changed = {}
+                removed_keys = []
+                for key in changes.changed_keys:
+                    if key in instance_data:
+                        changed[key] = instance_data[key]
+                    else:
+                        removed_keys.append(key)
+                host.patch_publish_instance(
+                    instance.id, changed, removed_keys, instance_data)
 
     def remove_instances(self, instances: list[CreatedInstance]) -> None:
         """Remove instances from the host application."""
         host: EqualizerHost = self.host
-        for instance in instances:
-            self._remove_instance_from_context(instance)
-            host.remove_create_instance(instance.id)
+        with host.metadata_transaction():
+            for instance in instances:
+                self._remove_instance_from_context(instance)
+                host.remove_create_instance(instance.id)
+
+
+class ExtractCacheMixin:
+    """Reuse files of previous export with the same inputs.
+
+    Fingerprint of the export is computed from the saved project, export
+    script and inputs passed by the extractor. Cache isn't used for
+    projects with unsaved changes, as their state can't be fingerprinted.
+
+    AYON writes its data to project notes, which marks the project as
+    modified after every create or load. Such project is still cached
+    if it was up to date before the write, see
+    `EqualizerHost.workfile_has_only_ayon_changes`.
+    """
+
+    def get_export_fingerprint(
+            self,
+            instance: pyblish.api.Instance,
+            exporter_path: Path,
+            inputs: dict[str, Any],
+    ) -> Optional[str]:
+        """Get fingerprint of the export.
+
+        Args:
+            instance (pyblish.api.Instance): Extracted instance.
+            exporter_path (Path): Export script of 3DEqualizer.
+            inputs (dict[str, Any]): Cameras, ranges, attribute values
+                and anything else the export depends on.
+
+        Returns:
+            Optional[str]: Fingerprint or None if cache can't be used.
+
+        """
+        if get_extract_cache() is None:
+            return None
+        project_path = tde4.getProjectPath()
+        if not project_path:
+            self.log.debug("Project is not saved, extract cache is skipped")
+            return None
+        if not tde4.isProjectUpToDate() \
+                and not registered_host().workfile_has_only_ayon_changes():
+            self.log.debug(
+                "Project has unsaved changes, extract cache is skipped")
+            return None
+        try:
+            project_mtime = os.stat(project_path).st_mtime_ns
+            exporter_digest = get_exporter_digest(exporter_path)
+        except OSError:
+            return None
+        return get_fingerprint({
+            "plugin": type(self).__name__,
+            "tde4_version": instance.context.data.get("tde4_version"),
+            "project": project_path,
+            "project_mtime": project_mtime,
+            "exporter": exporter_digest,
+            "inputs": inputs,
+        })
+
+    def restore_export(
+            self, fingerprint: Optional[str], staging_dir: str) -> bool:
+        """Copy files of previous export to staging directory.
+
+        Returns:
+            bool: Whether the files were restored.
+
+        """
+        cache = get_extract_cache()
+        if fingerprint is None or cache is None:
+            return False
+        return cache.restore(fingerprint, staging_dir)
+
+    def store_export(
+            self, fingerprint: Optional[str], paths: Iterable[str]) -> None:
+        """Store exported files for the next publish."""
+        cache = get_extract_cache()
+        if fingerprint is not None and cache is not None:
+            cache.store(fingerprint, paths)
 
 
-class ExtractScriptBase(OptionalPyblishPluginMixin):
+class ExtractScriptBase(ExtractCacheMixin, OptionalPyblishPluginMixin):
     """Base class for extract script plugins."""
 
     hide_reference_frame = False
@@ -0,0 +1,200 @@
+"""Cached enumeration of cameras, point groups and models in the scene.
+
+Publisher asks creators for attribute definitions repeatedly and each
+of them needs names of all cameras and models. Querying them one by one
+from 3DEqualizer is slow on big projects, so they are cached here.
+
+Cache is validated by comparing lists of camera, point group and model
+ids, which needs only few calls. Renaming doesn't change the ids, so
+code changing names should call `invalidate_scene_enumeration`.
+
+Publish plugins need more data of the same objects. `get_scene_snapshot`
+reads them once at the start of publishing into immutable structures
+shared by all plugins through the publish context.
+
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+import tde4
+
+
+class CameraInfo(NamedTuple):
+    """Camera in the scene."""
+
+    id: str
+    name: str
+    enabled: bool
+
+
+class ModelInfo(NamedTuple):
+    """3D model in the scene."""
+
+    point_group: str
+    id: str
+    name: str
+
+
+class SceneEnumeration(NamedTuple):
+    """Cameras, point groups and models in the scene."""
+
+    cameras: tuple[CameraInfo, ...]
+    point_groups: tuple[str, ...]
+    models: tuple[ModelInfo, ...]
+
+
+class CameraSnapshot(NamedTuple):
+    """Camera data needed by publish plugins."""
+
+    id: str
+    name: str
+    enabled: bool
+    type: str
+    path: str
+    fps: float
+    fov: tuple[float, ...]
+    frame_offset: int
+    calculation_range: tuple[int, int]
+    playback_range: tuple[int, int]
+
+
+class PointGroupSnapshot(NamedTuple):
+    """Point group with its models."""
+
+    id: str
+    name: str
+    type: str
+    models: tuple[ModelInfo, ...]
+
+
+class SceneSnapshot(NamedTuple):
+    """Scene data read once for the whole publishing."""
+
+    cameras: tuple[CameraSnapshot, ...]
+    point_groups: tuple[PointGroupSnapshot, ...]
+    current_camera: Optional[str]
+
+    def get_camera(self, camera_id: str) -> Optional[CameraSnapshot]:
+        """Get camera by its id."""
+        return next(
+            (camera for camera in self.cameras if camera.id == camera_id),
+            None)
+
+    @property
+    def camera_point_group(self) -> Optional[PointGroupSnapshot]:
+        """The first point group of CAMERA type."""
+        return next(
+            (pg for pg in self.point_groups if pg.type == "CAMERA"), None)
+
+
+_cache: dict[str, Optional[tuple]] = {
+    "probe": None,
+    "enumeration": None,
+}
+
+
+def _get_scene_probe() -> tuple:
+    """Return ids of cameras, point groups and models in the scene."""
+    point_groups = tuple(tde4.getPGroupList())
+    return (
+        tuple(tde4.getCameraList()),
+        point_groups,
+        tuple(
+            tuple(tde4.get3DModelList(point_group, 0))
+            for point_group in point_groups
+        ),
+    )
+
+
+def get_scene_enumeration() -> SceneEnumeration:
+    """Get cameras, point groups and models in the scene.
+
+    Returns:
+        SceneEnumeration: Cached scene enumeration, rebuilt only if
+            cameras, point groups or models were added or removed.
+
+    """
+    probe = _get_scene_probe()
+    if _cache["enumeration"] is not None and probe == _cache["probe"]:
+        return _cache["enumeration"]
+
+    camera_ids, point_groups, model_ids = probe
+    enumeration = SceneEnumeration(
+        cameras=tuple(
+            CameraInfo(
+                id=camera,
+                name=tde4.getCameraName(camera),
+                enabled=bool(tde4.getCameraEnabledFlag(camera)),
+            )
+            for camera in camera_ids
+        ),
+        point_groups=point_groups,
+        models=tuple(
+            ModelInfo(
+                point_group=point_group,
+                id=model,
+                name=tde4.get3DModelName(point_group, model),
+            )
+            for point_group, models in zip(point_groups, model_ids)
+            for model in models
+        ),
+    )
+    _cache["probe"] = probe
+    _cache["enumeration"] = enumeration
+    return enumeration
+
+
+def invalidate_scene_enumeration() -> None:
+    """Invalidate cached scene enumeration."""
+    _cache["probe"] = None
+    _cache["enumeration"] = None
+
+
+def get_scene_snapshot() -> SceneSnapshot:
+    """Read cameras, point groups and models of the scene.
+
+    Names are always read again, as the scene could be changed in any
+    way before publishing, and the refreshed enumeration is cached for
+    creators.
+
+    Returns:
+        SceneSnapshot: Current state of the scene.
+
+    """
+    invalidate_scene_enumeration()
+    enumeration = get_scene_enumeration()
+
+    cameras = tuple(
+        CameraSnapshot(
+            id=camera.id,
+            name=camera.name,
+            enabled=camera.enabled,
+            type=tde4.getCameraType(camera.id),
+            path=tde4.getCameraPath(camera.id),
+            fps=tde4.getCameraFPS(camera.id),
+            fov=tuple(tde4.getCameraFOV(camera.id)),
+            frame_offset=tde4.getCameraFrameOffset(camera.id),
+            calculation_range=tuple(
+                tde4.getCameraCalculationRange(camera.id)),
+            playback_range=tuple(tde4.getCameraPlaybackRange(camera.id)),
+        )
+        for camera in enumeration.cameras
+    )
+    point_groups = tuple(
+        PointGroupSnapshot(
+            id=point_group,
+            name=tde4.getPGroupName(point_group),
+            type=tde4.getPGroupType(point_group),
+            models=tuple(
+                model for model in enumeration.models
+                if model.point_group == point_group
+            ),
+        )
+        for point_group in enumeration.point_groups
+    )
+    return SceneSnapshot(
+        cameras=cameras,
+        point_groups=point_groups,
+        current_camera=tde4.getCurrentCamera(),
+    )
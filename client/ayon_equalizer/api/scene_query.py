@@ -0,0 +1,216 @@
+"""Batch queries of scene data for the command server.
+
+Pipeline scripts outside of 3DEqualizer would need thousands of single
+value `tde4` calls to get data of all cameras. Queries here collect
+requested fields of all cameras, point groups or models at once, so
+they can be returned in a single response.
+
+Queries don't import `tde4`, module to read the data from is passed as
+backend, so they can be tested with a stand-in object.
+
+Example of a request::
+
+    {"jsonrpc": "2.0", "id": 1, "method": "scene.query", "params": [{
+        "cameras": {"fields": ["name", "playback_range", "fps", "path"]},
+        "point_groups": {},
+    }]}
+
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import ModuleType
+
+    from ayon_equalizer.api.command_server import CommandServer
+
+# field name and `tde4` function returning its value
+CAMERA_FIELDS = {
+    "name": "getCameraName",
+    "enabled": "getCameraEnabledFlag",
+    "type": "getCameraType",
+    "path": "getCameraPath",
+    "fps": "getCameraFPS",
+    "fov": "getCameraFOV",
+    "frames": "getCameraNoFrames",
+    "frame_offset": "getCameraFrameOffset",
+    "calculation_range": "getCameraCalculationRange",
+    "playback_range": "getCameraPlaybackRange",
+}
+POINT_GROUP_FIELDS = {
+    "name": "getPGroupName",
+    "type": "getPGroupType",
+    "selected": "getPGroupSelectionFlag",
+}
+MODEL_FIELDS = {
+    "name": "get3DModelName",
+}
+
+
+def _get_fields(
+        fields: Optional[Iterable[str]],
+        available: dict[str, str]) -> list[str]:
+    """Validate requested fields, all fields are returned for None."""
+    if fields is None:
+        return list(available)
+    fields = list(fields)
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        msg = f"Unknown fields: {', '.join(unknown)}"
+        raise ValueError(msg)
+    return fields
+
+
+class SceneQuery:
+    """Batch queries of cameras, point groups and models.
+
+    Args:
+        backend (ModuleType): `tde4` module or an object with the same
+            functions.
+
+    """
+
+    def __init__(self, backend: ModuleType) -> None:
+        """Initialize queries."""
+        self.backend = backend
+
+    def register(self, server: CommandServer) -> None:
+        """Register queries as `scene.*` commands of the server."""
+        server.register("scene.cameras", self.cameras)
+        server.register("scene.point_groups", self.point_groups)
+        server.register("scene.models", self.models)
+        server.register("scene.project", self.project)
+        server.register("scene.query", self.query)
+
+    def cameras(
+            self,
+            fields: Optional[list[str]] = None,
+            ids: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Get data of cameras.
+
+        Args:
+            fields (Optional[list[str]]): Fields from `CAMERA_FIELDS`,
+                all of them if not set.
+            ids (Optional[list[str]]): Ids of cameras, all cameras if
+                not set.
+
+        Returns:
+            list[dict[str, Any]]: Id and requested fields of cameras.
+
+        """
+        fields = _get_fields(fields, CAMERA_FIELDS)
+        if ids is None:
+            ids = self.backend.getCameraList()
+        return [
+            self._get_data(camera, fields, CAMERA_FIELDS, camera)
+            for camera in ids
+        ]
+
+    def point_groups(
+            self,
+            fields: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Get data of point groups.
+
+        Args:
+            fields (Optional[list[str]]): Fields from
+                `POINT_GROUP_FIELDS`, all of them if not set.
+
+        Returns:
+            list[dict[str, Any]]: Id and requested fields of point
+                groups.
+
+        """
+        fields = _get_fields(fields, POINT_GROUP_FIELDS)
+        return [
+            self._get_data(point_group, fields, POINT_GROUP_FIELDS,
+                           point_group)
+            for point_group in self.backend.getPGroupList()
+        ]
+
+    def models(
+            self,
+            fields: Optional[list[str]] = None,
+            point_group: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Get data of 3D models.
+
+        Args:
+            fields (Optional[list[str]]): Fields from `MODEL_FIELDS`,
+                all of them if not set.
+            point_group (Optional[str]): Id of point group, models of
+                all point groups if not set.
+
+        Returns:
+            list[dict[str, Any]]: Id, point group and requested fields
+                of models.
+
+        """
+        fields = _get_fields(fields, MODEL_FIELDS)
+        point_groups = (
+            [point_group] if point_group is not None
+            else self.backend.getPGroupList()
+        )
+        result = []
+        for pg in point_groups:
+            for model in self.backend.get3DModelList(pg, 0):
+                data = self._get_data(model, fields, MODEL_FIELDS, pg, model)
+                data["point_group"] = pg
+                result.append(data)
+        return result
+
+    def project(self) -> dict[str, Any]:
+        """Get data of the current project.
+
+        Returns:
+            dict[str, Any]: Path, up to date state and current camera.
+
+        """
+        return {
+            "path": self.backend.getProjectPath(),
+            "up_to_date": bool(self.backend.isProjectUpToDate()),
+            "current_camera": self.backend.getCurrentCamera(),
+        }
+
+    def query(self, spec: dict[str, Optional[dict]]) -> dict[str, Any]:
+        """Run multiple queries at once.
+
+        Args:
+            spec (dict[str, Optional[dict]]): Name of query (`cameras`,
+                `point_groups`, `models` or `project`) and its keyword
+                arguments.
+
+        Returns:
+            dict[str, Any]: Result of each query.
+
+        """
+        queries = {
+            "cameras": self.cameras,
+            "point_groups": self.point_groups,
+            "models": self.models,
+            "project": self.project,
+        }
+        unknown = [name for name in spec if name not in queries]
+        if unknown:
+            msg = f"Unknown queries: {', '.join(unknown)}"
+            raise ValueError(msg)
+        return {
+            name: queries[name](**(kwargs or {}))
+            for name, kwargs in spec.items()
+        }
+
+    def _get_data(
+            self,
+            item_id: str,
+            fields: list[str],
+            available: dict[str, str],
+            *args: str,
+    ) -> dict[str, Any]:
+        """Call `tde4` function of each field with `args`."""
+        data = {"id": item_id}
+        for field in fields:
+            data[field] = getattr(self.backend, available[field])(*args)
+        return data
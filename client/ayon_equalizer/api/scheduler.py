@@ -0,0 +1,211 @@
+"""Cooperative scheduler of long running tasks on the main thread.
+
+`tde4` can be called only from the main thread, so long operations like
+loading many plates or updating all containers freeze 3DEqualizer until
+they are done. Such operations can be written as generators yielding
+after each small step and submitted to the scheduler. The scheduler is
+advanced from the heartbeat and runs the tasks only for limited time on
+each tick, so the UI keeps painting in between.
+
+Example:
+    >>> def load_plates(paths):
+    ...     for i, path in enumerate(paths):
+    ...         load_plate(path)
+    ...         yield (i + 1) / len(paths)
+    >>> host.run_task(load_plates(paths), label="Load plates")
+
+Tasks yield their progress as a float from 0 to 1 (or None if unknown)
+and can return a result that is stored in `Task.result`.
+
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+TASK_STATE_PENDING = "pending"
+TASK_STATE_RUNNING = "running"
+TASK_STATE_DONE = "done"
+TASK_STATE_FAILED = "failed"
+TASK_STATE_CANCELLED = "cancelled"
+
+log = logging.getLogger(__name__)
+
+
+class Task:
+    """Task submitted to `TaskScheduler`.
+
+    Args:
+        generator (Generator): Generator doing the work.
+        label (str): Label of the task used in logs.
+        on_progress (Optional[Callable[[Task], None]]): Called every
+            time the task yields. Task fails if the callback raises.
+        on_done (Optional[Callable[[Task], None]]): Called when the task
+            is finished, failed or cancelled. Errors of the callback are
+            only logged.
+
+    """
+
+    def __init__(
+            self,
+            generator: Generator[Optional[float], None, Any],
+            label: str = "",
+            on_progress: Optional[Callable[[Task], None]] = None,
+            on_done: Optional[Callable[[Task], None]] = None,
+    ) -> None:
+        """Initialize task."""
+        self.label = label or getattr(generator, "__name__", "task")
+        self.state = TASK_STATE_PENDING
+        self.progress: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._generator = generator
+        self._on_progress = on_progress
+        self._on_done = on_done
+
+    def __repr__(self) -> str:
+        """Return representation of the task."""
+        return f"<Task {self.label!r} {self.state}>"
+
+    @property
+    def finished(self) -> bool:
+        """Whether the task is done, failed or cancelled."""
+        return self.state in (
+            TASK_STATE_DONE, TASK_STATE_FAILED, TASK_STATE_CANCELLED)
+
+    def cancel(self) -> None:
+        """Cancel the task.
+
+        Generator is closed, so its `finally` blocks are executed.
+        """
+        if self.finished:
+            return
+        try:
+            self._generator.close()
+        except Exception as exc:  # noqa: BLE001
+            self.error = exc
+        self._finish(TASK_STATE_CANCELLED)
+
+    def run(self) -> None:
+        """Run remaining steps of the task right away.
+
+        Used where there is no heartbeat to advance the task.
+        """
+        while not self.finished:
+            self.step()
+
+    def step(self) -> None:
+        """Advance the task by one step."""
+        self.state = TASK_STATE_RUNNING
+        try:
+            self.progress = next(self._generator)
+        except StopIteration as exc:
+            self.result = exc.value
+            self.progress = 1.0
+            self._finish(TASK_STATE_DONE)
+            return
+        except Exception as exc:
+            log.exception("Task %s failed", self.label)
+            self.error = exc
+            self._finish(TASK_STATE_FAILED)
+            return
+
+        if self._on_progress is None:
+            return
+        try:
+            self._on_progress(self)
+        except Exception as exc:
+            # task can't report progress, stop it instead of leaving it
+            # running without anyone knowing
+            log.exception("Progress callback of task %s failed", self.label)
+            self.error = exc
+            try:
+                self._generator.close()
+            except Exception:
+                log.exception("Closing task %s failed", self.label)
+            self._finish(TASK_STATE_FAILED)
+
+    def _finish(self, state: str) -> None:
+        self.state = state
+        if self._on_done is None:
+            return
+        try:
+            self._on_done(self)
+        except Exception:
+            log.exception("Done callback of task %s failed", self.label)
+
+
+class TaskScheduler:
+    """Round-robin scheduler of generator based tasks.
+
+    Args:
+        budget (int): Time in milliseconds the tasks can run in one
+            call of `step`.
+
+    """
+
+    def __init__(self, budget: int = 20) -> None:
+        """Initialize scheduler."""
+        self.budget = budget
+        self._tasks: deque[Task] = deque()
+
+    @property
+    def tasks(self) -> list[Task]:
+        """Unfinished tasks."""
+        return [task for task in self._tasks if not task.finished]
+
+    def submit(
+            self,
+            generator: Generator[Optional[float], None, Any],
+            label: str = "",
+            on_progress: Optional[Callable[[Task], None]] = None,
+            on_done: Optional[Callable[[Task], None]] = None,
+    ) -> Task:
+        """Submit a task.
+
+        Args:
+            generator (Generator): Generator doing the work.
+            label (str): Label of the task used in logs.
+            on_progress (Optional[Callable[[Task], None]]): Called every
+                time the task yields.
+            on_done (Optional[Callable[[Task], None]]): Called when
+                the task is finished, failed or cancelled.
+
+        Returns:
+            Task: Submitted task.
+
+        """
+        task = Task(generator, label, on_progress, on_done)
+        self._tasks.append(task)
+        return task
+
+    def cancel_all(self) -> None:
+        """Cancel all unfinished tasks."""
+        while self._tasks:
+            self._tasks.popleft().cancel()
+
+    def step(self) -> bool:
+        """Advance tasks until the time budget is used.
+
+        At least one step of one task is done even if it takes longer
+        than the budget.
+
+        Returns:
+            bool: Whether there are unfinished tasks.
+
+        """
+        deadline = time.perf_counter() + self.budget / 1000.0
+        while self._tasks:
+            task = self._tasks.popleft()
+            if not task.finished:
+                task.step()
+            if not task.finished:
+                self._tasks.append(task)
+            if time.perf_counter() >= deadline:
+                break
+        return bool(self._tasks)
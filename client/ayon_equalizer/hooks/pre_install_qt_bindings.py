@@ -4,8 +4,8 @@ If 3dequalizer doesn't have PySide2 module installed, it will try to install
 it.
 
 Note:
-    This needs to be changed in the future so the UI is decoupled from the
-    host application.
+    Installation is skipped when AYON tools are set to run in separate
+    process, UI is decoupled from the host application in that mode.
 
 """
 from __future__ import annotations
@@ -64,6 +64,12 @@ class InstallQtBinding(PreLaunchHook):
               to smaller methods.
 
         """
+        if self.launch_context.env.get("AYON_TDE4_TOOLS_MODE") == "process":
+            self.log.debug(
+                "AYON tools run in separate process, "
+                "Qt binding is not needed in 3dequalizer.")
+            return
+
         platform = system().lower()
         executable = Path(self.launch_context.executable.executable_path)
         expected_executable = "3de4"
@@ -0,0 +1 @@
+"""Pyblish plugins run by background publish process."""
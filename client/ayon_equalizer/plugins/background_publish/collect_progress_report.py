@@ -0,0 +1,75 @@
+"""Report progress of background publish to 3DEqualizer.
+
+Discovered only by the publish process started by `BackgroundPublish`,
+which adds this directory to `PYBLISH_PLUGINPATH` and passes path of
+the progress file in `AYON_TDE4_PUBLISH_PROGRESS`. 3DEqualizer reads
+the file when polling the process.
+
+"""
+import json
+import os
+from typing import ClassVar
+
+import pyblish.api
+
+
+class ProgressReport:
+    """Write processed plugins and errors to JSON file.
+
+    Args:
+        path (str): Path to the progress file.
+
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize report."""
+        self.path = path
+        self.processed = 0
+        self.errors: list[dict] = []
+
+    def on_plugin_processed(self, result: dict) -> None:
+        """Add result of a plugin and write the file."""
+        plugin = result["plugin"]
+        label = getattr(plugin, "label", None) or plugin.__name__
+        self.processed += 1
+        error = result.get("error")
+        if error is not None:
+            instance = result.get("instance")
+            self.errors.append({
+                "plugin": label,
+                "instance": str(instance) if instance is not None else "",
+                "message": str(error),
+            })
+        self.write({
+            "plugin": label,
+            "processed": self.processed,
+            "errors": self.errors,
+        })
+
+    def write(self, progress: dict) -> None:
+        """Replace the file, so it is never read half written."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as stream:
+                json.dump(progress, stream)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # progress is only informative, don't fail the publish
+            return
+
+
+class CollectProgressReport(pyblish.api.ContextPlugin):
+    """Start reporting progress of the publish to 3DEqualizer."""
+
+    order = pyblish.api.CollectorOrder - 0.5
+    targets: ClassVar[list] = ["farm"]
+    label = "Report Progress to 3DEqualizer"
+
+    def process(self, context: pyblish.api.Context) -> None:
+        """Register callback writing the progress file."""
+        path = os.getenv("AYON_TDE4_PUBLISH_PROGRESS")
+        if not path:
+            return
+        report = ProgressReport(path)
+        pyblish.api.register_callback(
+            "pluginProcessed", report.on_plugin_processed)
@@ -1,8 +1,21 @@
 """Create Matchmove product."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import ayon_api
 import tde4
-from ayon_core.lib import EnumDef
+from ayon_core.lib import BoolDef, EnumDef
 
 from ayon_equalizer.api import EqualizerCreator
+from ayon_equalizer.api.lib import maya_valid_name
+from ayon_equalizer.api.scene import (
+    get_scene_enumeration,
+    invalidate_scene_enumeration,
+)
+
+if TYPE_CHECKING:
+    from ayon_core.pipeline import CreatedInstance
 
 
 class CreateMatchMove(EqualizerCreator):
@@ -14,34 +27,125 @@ class CreateMatchMove(EqualizerCreator):
     product_type = product_base_type
     icon = "camera"
 
+    def create(
+        self,
+        product_name: str,
+        instance_data: dict,
+        pre_create_data: dict,
+    ) -> CreatedInstance | list[CreatedInstance]:
+        """Create matchmove instance or one instance per camera.
+
+        Args:
+            product_name (str): Name of the product to create.
+            instance_data (dict): Data of the instance to create.
+            pre_create_data (dict): Data from the pre-create step.
+
+        Returns:
+            CreatedInstance | list[CreatedInstance]: Created instance(s).
+
+        """
+        if not pre_create_data.get("per_camera"):
+            return super().create(
+                product_name, instance_data, pre_create_data)
+
+        cameras = [
+            camera.id for camera in get_scene_enumeration().cameras
+            if camera.enabled
+        ]
+        return self.create_for_cameras(cameras, instance_data)
+
+    def create_for_cameras(
+        self,
+        cameras: list[str],
+        instance_data: dict,
+    ) -> list[CreatedInstance]:
+        """Create one matchmove instance per camera.
+
+        Camera name is appended to the variant of each instance and
+        the instance is set to publish only that camera. All instances
+        are stored in the host with a single write.
+
+        Args:
+            cameras (list[str]): Camera ids.
+            instance_data (dict): Data shared by all instances, must
+                contain `folderPath`, `task` and `variant`.
+
+        Returns:
+            list[CreatedInstance]: Created instances.
+
+        """
+        project_name = self.create_context.get_current_project_name()
+        folder_entity = ayon_api.get_folder_by_path(
+            project_name, instance_data["folderPath"])
+        task_entity = None
+        if instance_data.get("task"):
+            task_entity = ayon_api.get_task_by_name(
+                project_name, folder_entity["id"], instance_data["task"])
+
+        instances = []
+        for camera in cameras:
+            variant = maya_valid_name(
+                f"{instance_data['variant']}_{tde4.getCameraName(camera)}")
+            product_name = self.get_product_name(
+                project_name,
+                folder_entity,
+                task_entity,
+                variant,
+                host_name=self.create_context.host_name,
+            )
+            camera_instance_data = dict(instance_data)
+            camera_instance_data["variant"] = variant
+            camera_instance_data["creator_attributes"] = {
+                "camera_selection": camera,
+            }
+            instances.append((product_name, camera_instance_data))
+
+        return self.create_instances(instances)
+
+    def collect_instances(self) -> None:
+        """Collect instances and drop cached scene enumeration.
+
+        Scene could be changed since the last reset of the publisher,
+        e.g. cameras or models could be renamed.
+        """
+        invalidate_scene_enumeration()
+        super().collect_instances()
+
+    def get_pre_create_attr_defs(self) -> list:
+        """Return pre-create attribute definitions."""
+        return [
+            BoolDef("per_camera",
+                    label="One instance per camera",
+                    default=False,
+                    tooltip=(
+                        "Create separate instance for each enabled "
+                        "camera, camera name is appended to the variant"
+                    )),
+        ]
+
     def get_instance_attr_defs(self) -> list:
         """Return instance attribute definitions."""
+        scene = get_scene_enumeration()
         camera_enum = [
             {"value": "__all__", "label": "All Cameras"},
             {"value": "__current__", "label": "Current Camera"},
             {"value": "__ref__", "label": "Reference Cameras"},
             {"value": "__seq__", "label": "Sequence Cameras"},
         ]
-        camera_list = tde4.getCameraList()
         camera_enum.extend(
-            {"label": tde4.getCameraName(camera), "value": camera}
-            for camera in camera_list
-            if tde4.getCameraEnabledFlag(camera)
+            {"label": camera.name, "value": camera.id}
+            for camera in scene.cameras
+            if camera.enabled
         )
         # try to get list of models
         model_enum = [
             {"value": "__none__", "label": "No 3D Models At All"},
             {"value": "__all__", "label": "All 3D Models"},
         ]
-        point_groups = tde4.getPGroupList()
-        for point_group in point_groups:
-            model_list = tde4.get3DModelList(point_group, 0)
-            model_enum.extend(
-                {
-                    "label": tde4.get3DModelName(point_group, model),
-                    "value": model,
-                } for model in model_list
-            )
+        model_enum.extend(
+            {"label": model.name, "value": model.id}
+            for model in scene.models
+        )
         return [
             EnumDef("camera_selection",
                     items=camera_enum,
@@ -1,16 +1,30 @@
-"""Loader for models."""
+"""Loader for models.
+
+Importing big OBJ file takes a while, so it runs as a task of the host
+scheduler. When more models are loaded or updated at once, each import
+is done on a separate heartbeat tick and 3DEqualizer UI is refreshed in
+between.
+"""
 from __future__ import annotations
 
 import os
 import re
+from functools import partial
 from time import time_ns
-from typing import ClassVar, Optional
+from typing import TYPE_CHECKING, ClassVar, Optional
 
 import tde4
-from ayon_core.pipeline import get_representation_path, load
+from ayon_core.pipeline import get_representation_path, load, registered_host
 from ayon_core.pipeline.load import LoadError
 
-from ayon_equalizer.api import Container, EqualizerHost
+from ayon_equalizer.api import Container
+from ayon_equalizer.api.scene import invalidate_scene_enumeration
+from ayon_equalizer.api.scheduler import TASK_STATE_FAILED
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from ayon_equalizer.api.scheduler import Task
 
 
 class LoadModel(load.LoaderPlugin):
@@ -44,7 +58,8 @@ class LoadModel(load.LoaderPlugin):
             options (dict, optional): the options to be used to load the model.
 
         Raises:
-            LoadError: if no or more than one point groups are selected.
+            LoadError: if no or more than one point groups are selected
+                or the import failed right away.
 
         """
         selected_point_group_ids = tuple(
@@ -75,14 +90,6 @@ class LoadModel(load.LoaderPlugin):
         model_id = tde4.create3DModel(point_group_id)
         if name:
             tde4.set3DModelName(point_group_id, model_id, name)
-        tde4.importOBJ3DModel(point_group_id, model_id, file_path)
-        # hardcoded for now until putting orientation and spatial unit
-        # data against a published model
-        tde4.set3DModelRotationScale3D(
-            point_group_id,
-            model_id,
-            [[100.0, 0.0, 0.0], [0.0, 0.0, -100.0], [0.0, 100.0, 0.0]],
-        )
         model_name = tde4.get3DModelName(point_group_id, model_id)
 
         container = Container(
@@ -94,8 +101,22 @@ class LoadModel(load.LoaderPlugin):
             version=str(version_entity["version"]),
             timestamp=time_ns(),
         )
-        EqualizerHost.get_host().add_container(container)
-        tde4.updateGUI()
+        host = registered_host()
+        # loaders are called for each item in a row, write them at once
+        host.defer_metadata_write()
+        host.add_container(container)
+        invalidate_scene_enumeration()
+
+        task = host.run_task(
+            self._import_model(
+                point_group_id, model_id, file_path, set_rotation=True),
+            label=f"Load model {model_name}",
+            on_done=partial(
+                self._on_load_done, point_group_id, model_id, container),
+        )
+        if task.state == TASK_STATE_FAILED:
+            msg = f"Failed to import {file_path}"
+            raise LoadError(msg) from task.error
 
     def update(self, container: dict, context: dict) -> None:
         """Update loaded models.
@@ -124,18 +145,79 @@ class LoadModel(load.LoaderPlugin):
         file_path = get_representation_path(repre_entity)
         file_path = self.format_path(file_path, repre_entity)
 
-        tde4.importOBJ3DModel(point_group_id, model_id, file_path)
-
+        previous = Container.from_dict(container)
         container["representation"] = repre_entity["id"]
         container["version"] = str(version_entity["version"])
 
-        EqualizerHost.get_host().add_container(Container(**container))
-        tde4.updateGUI()
+        host = registered_host()
+        # "Update all" updates containers one by one, write them at once
+        host.defer_metadata_write()
+        host.add_container(Container.from_dict(container))
+
+        task = host.run_task(
+            self._import_model(point_group_id, model_id, file_path),
+            label=f"Update model {container['namespace']}",
+            on_done=partial(self._on_update_done, previous),
+        )
+        if task.state == TASK_STATE_FAILED:
+            msg = f"Failed to import {file_path}"
+            raise LoadError(msg) from task.error
 
     def switch(self, container: dict, context: dict) -> None:
         """Switch loaded models."""
         self.update(container, context)
 
+    @staticmethod
+    def _import_model(
+            point_group_id: str,
+            model_id: str,
+            file_path: str,
+            *,
+            set_rotation: bool = False,
+    ) -> Generator[Optional[float], None, None]:
+        """Import OBJ file into the model.
+
+        Import is the long step, the rest is done on the next step,
+        so other imports don't run in the same heartbeat tick.
+        """
+        tde4.importOBJ3DModel(point_group_id, model_id, file_path)
+        yield 0.9
+        if set_rotation:
+            # hardcoded for now until putting orientation and spatial unit
+            # data against a published model
+            tde4.set3DModelRotationScale3D(
+                point_group_id,
+                model_id,
+                [[100.0, 0.0, 0.0], [0.0, 0.0, -100.0], [0.0, 100.0, 0.0]],
+            )
+        tde4.updateGUI()
+
+    def _on_load_done(
+            self,
+            point_group_id: str,
+            model_id: str,
+            container: Container,
+            task: Task,
+    ) -> None:
+        """Remove model and its container if the import failed."""
+        if task.state != TASK_STATE_FAILED:
+            return
+        self.log.error(
+            "Loading of %s failed: %s", container.namespace, task.error)
+        tde4.delete3DModel(point_group_id, model_id)
+        registered_host().remove_container(
+            container.name, container.namespace)
+        invalidate_scene_enumeration()
+        tde4.updateGUI()
+
+    def _on_update_done(self, previous: Container, task: Task) -> None:
+        """Restore version of the container if the import failed."""
+        if task.state != TASK_STATE_FAILED:
+            return
+        self.log.error(
+            "Update of %s failed: %s", previous.namespace, task.error)
+        registered_host().add_container(previous)
+
     @staticmethod
     def format_path(path: str, representation: dict) -> str:
         """Format file path correctly for single image or sequence."""
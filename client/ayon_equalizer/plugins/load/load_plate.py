@@ -22,9 +22,10 @@ from typing import ClassVar, Optional
 
 import tde4
 from ayon_core.lib.transcoding import IMAGE_EXTENSIONS
-from ayon_core.pipeline import get_representation_path, load
+from ayon_core.pipeline import get_representation_path, load, registered_host
 
-from ayon_equalizer.api import Container, EqualizerHost
+from ayon_equalizer.api import Container
+from ayon_equalizer.api.scene import invalidate_scene_enumeration
 
 
 class LoadPlate(load.LoaderPlugin):
@@ -91,7 +92,11 @@ class LoadPlate(load.LoaderPlugin):
             version=str(version_entity["version"]),
             timestamp=time.time_ns()
         )
-        EqualizerHost.get_host().add_container(container)
+        host = registered_host()
+        # loaders are called for each item in a row, write them at once
+        host.defer_metadata_write()
+        host.add_container(container)
+        invalidate_scene_enumeration()
         tde4.updateGUI()
 
     def update(self, container: dict, context: dict) -> None:
@@ -135,7 +140,10 @@ class LoadPlate(load.LoaderPlugin):
         container["representation"] = repre_entity["id"]
         container["version"] = str(version_entity["version"])
 
-        EqualizerHost.get_host().add_container(Container(**container))
+        host = registered_host()
+        # "Update all" updates containers one by one, write them at once
+        host.defer_metadata_write()
+        host.add_container(Container.from_dict(container))
         tde4.updateGUI()
 
     def switch(self, container: dict, context: dict) -> None:
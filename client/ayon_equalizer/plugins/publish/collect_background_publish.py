@@ -0,0 +1,28 @@
+"""Mark instances to be integrated in background process."""
+import os
+from typing import ClassVar
+
+import pyblish.api
+
+
+class CollectBackgroundPublish(pyblish.api.InstancePlugin):
+    """Mark instances to be integrated in background process.
+
+    Instances are marked as processed on farm, so integrators skip
+    them, and `IntegrateBackgroundPublish` hands them off to
+    a separate process.
+    """
+
+    order = pyblish.api.CollectorOrder + 0.49
+    hosts: ClassVar[list] = ["equalizer"]
+    families: ClassVar[list] = ["matchmove", "lensDistortion"]
+    label = "Collect Background Publish"
+
+    def process(self, instance: pyblish.api.Instance) -> None:
+        """Process the collector."""
+        if os.getenv("AYON_TDE4_BACKGROUND_PUBLISH") != "1":
+            return
+        instance.data["farm"] = True
+        instance.data["backgroundPublish"] = True
+        # extracted files are removed by the background process
+        instance.data["stagingDir_persistent"] = True
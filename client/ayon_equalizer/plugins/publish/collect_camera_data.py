@@ -2,7 +2,6 @@
 from typing import ClassVar
 
 import pyblish.api
-import tde4
 
 
 class CollectCameraData(pyblish.api.InstancePlugin):
@@ -31,46 +30,33 @@ class CollectCameraData(pyblish.api.InstancePlugin):
             self.log.warning("No camera defined")
             return
 
+        scene = instance.context.data["sceneSnapshot"]
         if camera_sel == "__all__":
-            cameras = tde4.getCameraList()
-        elif camera_sel == "__current__":
-            cameras = [tde4.getCurrentCamera()]
+            cameras = scene.cameras
         elif camera_sel in ["__ref__", "__seq__"]:
-            cameras = [
-                c for c in tde4.getCameraList()
-                if tde4.getCameraType(c) == "REF_FRAME"
-            ]
+            cameras = [c for c in scene.cameras if c.type == "REF_FRAME"]
         else:
-            if camera_sel not in tde4.getCameraList():
+            if camera_sel == "__current__":
+                camera_sel = scene.current_camera
+            camera = scene.get_camera(camera_sel)
+            if camera is None:
+                # instance without cameras is reported by
+                # ValidateInstanceCameraData
                 self.log.warning("Invalid camera found")
                 return
-            cameras = [camera_sel]
-
-        data = []
-
-        for camera in cameras:
-            camera_name = tde4.getCameraName(camera)
-            enabled = tde4.getCameraEnabledFlag(camera)
-            # calculation range
-            c_range_start, c_range_end = tde4.getCameraCalculationRange(
-                camera)
-            p_range_start, p_range_end = tde4.getCameraPlaybackRange(camera)
-            fov = tde4.getCameraFOV(camera)
-            fps = tde4.getCameraFPS(camera)
-            # focal length is time based, so lets skip it for now
-            # focal_length = tde4.getCameraFocalLength(camera, frame)
-            path = tde4.getCameraPath(camera)
-
-            camera_data = {
-                "name": camera_name,
-                "id": camera,
-                "enabled": enabled,
-                "calculation_range": (c_range_start, c_range_end),
-                "playback_range": (p_range_start, p_range_end),
-                "fov": fov,
-                "fps": fps,
-                # "focal_length": focal_length,
-                "path": path
+            cameras = [camera]
+
+        # focal length is time based, so lets skip it for now
+        instance.data["cameras"] = [
+            {
+                "name": camera.name,
+                "id": camera.id,
+                "enabled": camera.enabled,
+                "calculation_range": camera.calculation_range,
+                "playback_range": camera.playback_range,
+                "fov": camera.fov,
+                "fps": camera.fps,
+                "path": camera.path,
             }
-            data.append(camera_data)
-        instance.data["cameras"] = data
+            for camera in cameras
+        ]
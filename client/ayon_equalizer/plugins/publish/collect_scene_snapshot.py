@@ -0,0 +1,22 @@
+"""Collect snapshot of the scene shared by other publish plugins."""
+from typing import ClassVar
+
+import pyblish.api
+
+from ayon_equalizer.api.scene import get_scene_snapshot
+
+
+class CollectSceneSnapshot(pyblish.api.ContextPlugin):
+    """Read cameras, point groups and models of the scene once.
+
+    Other plugins read the scene from `sceneSnapshot` in context data
+    instead of querying 3DEqualizer again.
+    """
+
+    order = pyblish.api.CollectorOrder - 0.4
+    hosts: ClassVar[list] = ["equalizer"]
+    label = "Collect Scene Snapshot"
+
+    def process(self, context: pyblish.api.Context) -> None:
+        """Collect the snapshot."""
+        context.data["sceneSnapshot"] = get_scene_snapshot()
@@ -1,12 +1,14 @@
 """Extract Nuke Lens Distortion data from 3DEqualizer."""
 from pathlib import Path
 from typing import ClassVar
-from unittest.mock import patch
 
 import pyblish.api
-import tde4
-from ayon_core.lib import EnumDef, import_filepath
-from ayon_core.pipeline import OptionalPyblishPluginMixin, publish
+from ayon_core.lib import EnumDef
+from ayon_core.pipeline import (
+    OptionalPyblishPluginMixin,
+    publish,
+    registered_host,
+)
 
 
 class ExtractLensDistortionNuke(publish.Extractor,
@@ -32,24 +34,23 @@ class ExtractLensDistortionNuke(publish.Extractor,
         if not self.is_active(instance.data):
             return
 
-        cam = tde4.getCurrentCamera()
-        offset = tde4.getCameraFrameOffset(cam) - 1
+        scene = instance.context.data["sceneSnapshot"]
+        cam = scene.current_camera
+        offset = scene.get_camera(cam).frame_offset - 1
         staging_dir = self.staging_dir(instance)
         file_path = Path(staging_dir) / "nuke_ld_export.nk"
         attr_data = self.get_attr_values_from_data(instance.data)
 
-        # these patched methods are used to silence 3DEqualizer UI:
-        def patched_getWidgetValue(_, key: str) -> str:    # noqa: N802, ANN001
-            """Return value for given key in widget."""
-            return attr_data["fovMode"] if key == "option_menu_fov_mode" else ""  # noqa: E501
-
         # import export script from 3DEqualizer
         exporter_path = instance.context.data["tde4_path"] / "sys_data" / "py_scripts" / "export_nuke_LD_3DE4_Lens_Distortion_Node.py"  # noqa: E501
-        self.log.debug("Importing %s", exporter_path.as_posix())
-        exporter = import_filepath(exporter_path.as_posix())
-        with patch("tde4.getWidgetValue", patched_getWidgetValue):
-                exporter.exportNukeDewarpNode(
-                    cam, offset, file_path.as_posix())
+        self.log.debug("Exporting with %s", exporter_path.as_posix())
+        registered_host().run_export("lens_distortion_nuke", {
+            "exporter_path": exporter_path.as_posix(),
+            "camera_id": cam,
+            "file_path": file_path.as_posix(),
+            "offset": offset,
+            "fov_mode": attr_data["fovMode"],
+        })
 
         # create representation data
         if "representations" not in instance.data:
@@ -4,19 +4,17 @@ from pathlib import Path
 from typing import ClassVar
 
 import pyblish.api
-import tde4
-from ayon_core.lib import import_filepath
 from ayon_core.pipeline import (
     KnownPublishError,
     OptionalPyblishPluginMixin,
     publish,
+    registered_host,
 )
 
-from ayon_equalizer.api import ExtractScriptBase, maintained_model_selection
+from ayon_equalizer.api import ExtractScriptBase
+from ayon_equalizer.api.export import EQUALIZER_7
 from ayon_equalizer.api.lib import maya_valid_name
 
-EQUALIZER_7 = 7
-EQUALIZER_8 = 8
 
 class ExtractMatchmoveScriptMaya(publish.Extractor,
                                  ExtractScriptBase,
@@ -33,9 +31,7 @@ class ExtractMatchmoveScriptMaya(publish.Extractor,
 
     order = pyblish.api.ExtractorOrder
 
-    # intentionally ignoring complexity warning (PLR0915 and PLR0912) because
-    # of the nature of the export scripts in 3DEqualizer.
-    def process(self, instance: pyblish.api.Instance) -> None:  # noqa: C901,PLR0915,PLR0912
+    def process(self, instance: pyblish.api.Instance) -> None:
         """Extract Maya script from 3DEqualizer.
 
         This method is using export script shipped with 3DEqualizer to
@@ -52,23 +48,18 @@ class ExtractMatchmoveScriptMaya(publish.Extractor,
 
         # import maya export script from 3DEqualizer
         exporter_path = instance.context.data["tde4_path"] / "sys_data" / "py_scripts" / "export_maya.py"  # noqa: E501
-        self.log.debug("Importing %s", exporter_path.as_posix())
-        exporter = import_filepath(exporter_path.as_posix())
 
         # get camera point group
-        point_group = None
-        point_groups = tde4.getPGroupList()
-        for pg in point_groups:
-            if tde4.getPGroupType(pg) == "CAMERA":
-                point_group = pg
-                break
-        else:
+        scene = instance.context.data["sceneSnapshot"]
+        camera_point_group = scene.camera_point_group
+        if camera_point_group is None:
             # this should never happen as it should be handled by validator
             error_msg = "No camera point group found."
             raise KnownPublishError(error_msg)
+        point_group = camera_point_group.id
 
         # Here we subtract 1 because 3DE is computing the offset with an offset
-        offset = tde4.getCameraFrameOffset(tde4.getCurrentCamera()) - 1
+        offset = scene.get_camera(scene.current_camera).frame_offset - 1
         overscan_width = attr_data["overscan_percent_width"] / 100.0
         overscan_height = attr_data["overscan_percent_height"] / 100.0
 
@@ -84,99 +75,71 @@ class ExtractMatchmoveScriptMaya(publish.Extractor,
         }
         scale_factor = unit_scales[attr_data["units"]]
         model_selection_enum = instance.data["creator_attributes"]["model_selection"]  # noqa: E501
+        file_path = Path(staging_dir) / "maya_export"
+
+        # reuse files of previous publish if nothing changed since
+        fingerprint = self.get_export_fingerprint(instance, exporter_path, {
+            "name": instance.data["name"],
+            "point_group": point_group,
+            "cameras": instance.data["cameras"],
+            "offset": offset,
+            "model_selection": model_selection_enum,
+            "attributes": attr_data,
+        })
+        ext = "mel" \
+            if instance.context.data["tde4_version"].major == EQUALIZER_7 \
+            else "py"
+        if self.restore_export(fingerprint, staging_dir):
+            self.log.debug("Reusing previous export of %s", file_path.name)
+            instance.data.setdefault("representations", []).append({
+                "name": ext,
+                "ext": ext,
+                "files": f"{file_path.name}.{ext}",
+                "stagingDir": staging_dir,
+            })
+            return
 
-        with maintained_model_selection():
-            # handle model selection
-            # We are passing it to existing function that is expecting
-            # this value to be an index of selection type.
-            # 1 - No models
-            # 2 - Selected models
-            # 3 - All models
-            if model_selection_enum == "__all__":
-                model_selection = 3
-            elif model_selection_enum == "__none__":
-                model_selection = 1
-            else:
-                # take model from instance and set its selection flag on
-                # turn off all others
-                model_selection = 2
-                point_groups = tde4.getPGroupList()
-                for point_group in point_groups:
-                    model_list = tde4.get3DModelList(point_group, 0)
-                    if model_selection_enum in model_list:
-                        model_selection = 2
-                        tde4.set3DModelSelectionFlag(
-                            point_group, instance.data["model_selection"], 1)
-                        break
-
-                    # clear all other model selections
-                    for model in model_list:
-                        tde4.set3DModelSelectionFlag(point_group, model, 0)
-
-            file_path = Path(staging_dir) / "maya_export"
-            if instance.context.data.get("tde4_version"):
-                self.log.debug("Exporting to: %s", file_path.as_posix())
-
-            # create representation data
-            if "representations" not in instance.data:
-                instance.data["representations"] = []
-
-            if instance.context.data["tde4_version"].major == EQUALIZER_7:
-                status = exporter._maya_export_mel_file(  # noqa: SLF001
-                    f"{file_path.as_posix()}.mel",
-                    point_group,
-                    [
-                        c["id"] for c in instance.data["cameras"]
-                        if c["enabled"]
-                    ],
-                    model_selection,
-                    overscan_width,
-                    overscan_height,
-                    1 if attr_data["export_uv_textures"] else 0,
-                    scale_factor,
-                    offset,
-                    1 if attr_data["hide_reference_frame"] else 0,
-                )
-
-                representation = {
-                    "name": "mel",
-                    "ext": "mel",
-                    "files": f"{file_path.name}.mel",
-                    "stagingDir": staging_dir,
-                }
-            elif instance.context.data["tde4_version"].major == EQUALIZER_8:
-                exporter.script_version = "4.7"
-                status, npoly_warning = exporter._maya_export_python_file(  # noqa: SLF001
-                    file_path.as_posix(),  # staging path,
-                    point_group,  # camera point group,
-                    [
-                        c["id"] for c in instance.data["cameras"]
-                        if c["enabled"]
-                    ],
-                    model_selection,
-                    overscan_width,
-                    overscan_height,
-                    1 if attr_data["export_uv_textures"] else 0,
-                    scale_factor,
-                    offset,
-                    1 if attr_data["hide_reference_frame"] else 0,
-                    # scene_name
-                    maya_valid_name(f"{instance.data['name']}_GRP"),
-                    1 if attr_data["point_sets"] else 0,
-                    1 if attr_data["export_2p5d"] else 0)
-                if npoly_warning:
-                    self.log.warning("npoly warning: %s", npoly_warning)
-                representation = {
-                    "name": "py",
-                    "ext": "py",
-                    "files": f"{file_path.name}.py",
-                    "stagingDir": staging_dir,
-                }
+        # export runs in 3DEqualizer also when publishing from a tool in
+        # separate process, see `ayon_equalizer.api.export`
+        self.log.debug("Exporting to: %s", file_path.as_posix())
+        result = registered_host().run_export("maya_script", {
+            "exporter_path": exporter_path.as_posix(),
+            "version": instance.context.data["tde4_version"].major,
+            "file_path": file_path.as_posix(),
+            "point_group": point_group,
+            "camera_ids": [
+                c["id"] for c in instance.data["cameras"] if c["enabled"]
+            ],
+            "model_selection": model_selection_enum,
+            "options": {
+                "overscan_width": overscan_width,
+                "overscan_height": overscan_height,
+                "export_uv_textures": attr_data["export_uv_textures"],
+                "scale_factor": scale_factor,
+                "offset": offset,
+                "hide_reference_frame": attr_data["hide_reference_frame"],
+                "scene_name": maya_valid_name(
+                    f"{instance.data['name']}_GRP"),
+                "point_sets": attr_data["point_sets"],
+                "export_2p5d": attr_data["export_2p5d"],
+            },
+        })
+        status = result["status"]
+        if result["warning"]:
+            self.log.warning("npoly warning: %s", result["warning"])
+        representation = {
+            "name": ext,
+            "ext": ext,
+            "files": f"{file_path.name}.{ext}",
+            "stagingDir": staging_dir,
+        }
 
         if status != 1:
             # for EM102
             err_msg = f"Export failed {status}"
             raise KnownPublishError(err_msg)
 
+        self.store_export(
+            fingerprint, [f"{file_path.as_posix()}.{representation['ext']}"])
         self.log.debug("output: %s", file_path.as_posix())
-        instance.data["representations"].append(representation)
+        instance.data.setdefault("representations", []).append(representation)
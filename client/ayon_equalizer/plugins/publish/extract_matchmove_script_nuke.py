@@ -7,22 +7,30 @@ during the export. Advantage is that it is still using "vanilla" built-in
 export script, so it should be more compatible with future versions of the
 software.
 
-TODO: This can be refactored even better, split to multiple methods, etc.
+Export script always exports the current camera, so it is patched too to
+export all cameras of the instance in a single pass.
+
+The export itself is done by `ayon_equalizer.api.export` inside
+3DEqualizer, so the plugin works also in publisher running in separate
+process.
 
 """
+import re
 from pathlib import Path
 from typing import ClassVar
-from unittest.mock import patch
 
 import pyblish.api
-import tde4
-from ayon_core.pipeline import OptionalPyblishPluginMixin, publish
+from ayon_core.pipeline import (
+    OptionalPyblishPluginMixin,
+    publish,
+    registered_host,
+)
 
-# this is required because of the * import in extract_nuke script
-from vl_sdv import VL_APPLY_ZXY, mat3d, rot3d  # noqa: F401
+from ayon_equalizer.api import ExtractCacheMixin
 
 
 class ExtractMatchmoveScriptNuke(publish.Extractor,
+                                 ExtractCacheMixin,
                                  OptionalPyblishPluginMixin):
     """Extract Nuke script for matchmove.
 
@@ -42,54 +50,91 @@ class ExtractMatchmoveScriptNuke(publish.Extractor,
     order = pyblish.api.ExtractorOrder
 
     def process(self, instance: pyblish.api.Instance) -> None:
-        """Extract Nuke script from 3DEqualizer."""
+        """Extract Nuke script of every enabled camera of the instance.
+
+        Single camera is exported to `nk` representation, multiple cameras
+        to representation per camera named by the camera.
+
+        Raises:
+            KnownPublishError: When no camera of the instance is enabled.
+
+        """
         if not self.is_active(instance.data):
             return
 
-        cam = tde4.getCurrentCamera()
+        cameras = [c for c in instance.data.get("cameras", []) if c["enabled"]]
+        if not cameras:
+            msg = "No enabled camera to export"
+            raise publish.KnownPublishError(msg)
 
         staging_dir = self.staging_dir(instance)
-        file_path = Path(staging_dir) / "nuke_export.nk"
-
-        # these patched methods are used to silence 3DEqualizer UI:
-        def patched_getWidgetValue(_, key: str) -> str:  # noqa: N802, ANN001
-            """Return value for given key in widget."""
-            if key == "file_browser":
-                return file_path.as_posix()
-            return tde4.getCameraFrameOffset(cam) - 1 \
-                if key == "startframe_field" else ""
-
-        # This is simulating artist clicking on "OK" button
-        # in the export dialog.
-        def patched_postCustomRequester(*args, **kwargs) -> int:  # noqa: N802, ANN002, ANN003, ARG001
-            return 1
-
-        # This is silencing success/error message after the script
-        # is exported.
-        def patched_postQuestionRequester(*args, **kwargs) -> None:  # noqa: N802, ANN002, ANN003, ARG001
-            return None
-
-        # import maya export script from 3DEqualizer
+        # import nuke export script from 3DEqualizer
         exporter_path = instance.context.data["tde4_path"] / "sys_data" / "py_scripts" / "export_nuke.py"  # noqa: E501
-        self.log.debug("Patching 3dequalizer requester objects ...")
 
-        with patch("tde4.getWidgetValue", patched_getWidgetValue), \
-                 patch("tde4.postCustomRequester", patched_postCustomRequester), \
-                 patch("tde4.postQuestionRequester", patched_postQuestionRequester):  # noqa: E501
-            with exporter_path.open() as f:
-                script = f.read()
-            self.log.debug("Importing %s", exporter_path.as_posix())
-            exec(script, {"tde4": tde4})  # noqa: S102
+        representations = []
+        if len(cameras) == 1:
+            file_path = Path(staging_dir) / "nuke_export.nk"
+            self._export_camera(
+                instance, cameras[0]["id"], file_path, exporter_path)
+            representations.append({
+                "name": "nk",
+                "ext": "nk",
+                "files": file_path.name,
+                "stagingDir": staging_dir,
+            })
+        else:
+            output_names = set()
+            for camera in cameras:
+                output_name = re.sub(r"\W", "_", camera["name"])
+                if output_name in output_names:
+                    output_name = f"{output_name}_{camera['id']}"
+                output_names.add(output_name)
+                file_path = Path(staging_dir) / f"nuke_export_{output_name}.nk"
+                self._export_camera(
+                    instance, camera["id"], file_path, exporter_path)
+                representations.append({
+                    "name": f"nk_{output_name}",
+                    "ext": "nk",
+                    "files": file_path.name,
+                    "stagingDir": staging_dir,
+                    "outputName": output_name,
+                })
 
         # create representation data
         if "representations" not in instance.data:
             instance.data["representations"] = []
+        instance.data["representations"].extend(representations)
+
+    def _export_camera(
+            self,
+            instance: pyblish.api.Instance,
+            cam: str,
+            file_path: Path,
+            exporter_path: Path,
+    ) -> None:
+        """Export Nuke script of a single camera."""
+        scene = instance.context.data["sceneSnapshot"]
+        offset = scene.get_camera(cam).frame_offset - 1
+
+        # reuse file of previous publish if nothing changed since
+        fingerprint = self.get_export_fingerprint(instance, exporter_path, {
+            "camera": scene.get_camera(cam),
+            "offset": offset,
+            "file": file_path.name,
+        })
+        if self.restore_export(fingerprint, file_path.parent.as_posix()):
+            self.log.debug("Reusing previous export of %s", file_path.name)
+            return
 
-        representation = {
-            "name": "nk",
-            "ext": "nk",
-            "files": file_path.name,
-            "stagingDir": staging_dir,
-        }
+        # export runs in 3DEqualizer also when publishing from a tool in
+        # separate process, see `ayon_equalizer.api.export`
+        self.log.debug("Exporting with %s", exporter_path.as_posix())
+        registered_host().run_export("nuke_script", {
+            "exporter_path": exporter_path.as_posix(),
+            "camera_id": cam,
+            "file_path": file_path.as_posix(),
+            "offset": offset,
+        })
+
+        self.store_export(fingerprint, [file_path.as_posix()])
         self.log.debug("output: %s", file_path.as_posix())
-        instance.data["representations"].append(representation)
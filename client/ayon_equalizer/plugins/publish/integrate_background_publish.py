@@ -0,0 +1,43 @@
+"""Hand off integration of extracted instances to background process."""
+import os
+import tempfile
+from typing import ClassVar
+
+import pyblish.api
+from ayon_core.pipeline import registered_host
+
+from ayon_equalizer.api.background_publish import write_publish_metadata
+
+
+class IntegrateBackgroundPublish(pyblish.api.ContextPlugin):
+    """Integrate extracted instances in background process.
+
+    Process is started and polled by 3DEqualizer, even if the publisher
+    runs in separate process, so it isn't killed with the publisher.
+    Publisher finishes before the files are integrated, 3DEqualizer
+    notifies the artist about the result.
+    """
+
+    order = pyblish.api.IntegratorOrder - 0.1
+    hosts: ClassVar[list] = ["equalizer"]
+    label = "Start Integration in Background"
+
+    def process(self, context: pyblish.api.Context) -> None:
+        """Write extracted instances and start the process."""
+        instances = [
+            instance for instance in context
+            if instance.data.get("backgroundPublish")
+            and instance.data.get("publish", True)
+        ]
+        if not instances:
+            return
+
+        metadata_dir = tempfile.mkdtemp(prefix="ayon_tde4_publish_")
+        metadata_path = os.path.join(metadata_dir, "publish.json")
+        write_publish_metadata(context, instances, metadata_path)
+        publish = registered_host().launch_background_publish(
+            metadata_path, remove_dir=True)
+        self.log.warning(
+            "%d instances are not integrated yet, they are integrated in "
+            "background and 3DEqualizer notifies when it is done. Log: %s",
+            len(instances), publish["log_path"])
@@ -2,7 +2,6 @@
 from typing import ClassVar
 
 import pyblish.api
-import tde4
 from ayon_core.pipeline.publish import (
     PublishValidationError,
     ValidateContentsOrder,
@@ -20,12 +19,9 @@ class ValidateCameraPoingroup(pyblish.api.InstancePlugin):
     families: ClassVar[list] = ["matchmove"]
     label = "Validate Camera Point Group"
 
-    def process(self, _: pyblish.api.Instance) -> None:
+    def process(self, instance: pyblish.api.Instance) -> None:
         """Process the validation."""
-        valid = any(
-            tde4.getPGroupType(point_group) == "CAMERA"
-            for point_group in tde4.getPGroupList()
-        )
-        if not valid:
+        scene = instance.context.data["sceneSnapshot"]
+        if scene.camera_point_group is None:
             error_msg = "Missing Camera Point Group"
             raise PublishValidationError(error_msg)
@@ -0,0 +1,5 @@
+"""AYON tools running outside of 3DEqualizer.
+
+Nothing here imports `tde4`, the proxy has to be installed by
+`ayon_equalizer.remote.client.install_tde4_proxy` first.
+"""
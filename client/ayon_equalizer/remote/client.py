@@ -0,0 +1,249 @@
+"""Client of the command server running inside 3DEqualizer.
+
+Used by AYON tools running in separate process. `tde4` module isn't
+available outside of 3DEqualizer, so `Tde4Proxy` is installed in its
+place and forwards every call of `tde4` function to 3DEqualizer.
+
+Pipeline scripts can connect to 3DEqualizer with the command server
+enabled in settings and query scene data in batches:
+
+    >>> info = find_command_servers()[0]
+    >>> connection = RemoteConnection.from_info(info)
+    >>> connection.call("scene.query", {
+    ...     "cameras": {"fields": ["name", "playback_range", "path"]},
+    ...     "project": None,
+    ... })
+
+"""
+from __future__ import annotations
+
+import glob
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import types
+from typing import Any, Callable, Optional
+
+
+def get_command_server_info_dir() -> str:
+    """Return directory with files describing running command servers.
+
+    Each 3DEqualizer running the command server writes there a file
+    named by its process id, containing `host`, `port`, `token` and
+    `pid`.
+
+    Returns:
+        str: Path to the directory.
+
+    """
+    return os.path.join(tempfile.gettempdir(), "ayon_equalizer", "servers")
+
+
+def find_command_servers() -> list[dict]:
+    """Find command servers of running 3DEqualizer sessions.
+
+    Returns:
+        list[dict]: Info of the servers, the most recent first.
+
+    """
+    paths = glob.glob(os.path.join(get_command_server_info_dir(), "*.json"))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    servers = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as stream:
+                servers.append(json.load(stream))
+        except (OSError, ValueError):  # noqa: PERF203
+            continue
+    return servers
+
+
+class RemoteError(RuntimeError):
+    """Command failed in 3DEqualizer."""
+
+
+class RemoteConnection:
+    """Blocking connection to the command server.
+
+    Args:
+        host (str): Address of the server.
+        port (int): Port of the server.
+        token (str): Token of the server.
+        timeout (Optional[float]): Timeout of a command in seconds.
+
+    """
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            token: str,
+            timeout: Optional[float] = None,
+    ) -> None:
+        """Initialize connection."""
+        self._socket = socket.create_connection((host, port))
+        self._socket.settimeout(timeout)
+        self._stream = self._socket.makefile("rb")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._socket.sendall(token.encode() + b"\n")
+
+    @classmethod
+    def from_env(cls) -> RemoteConnection:
+        """Connect to the server passed in environment by 3DEqualizer.
+
+        Returns:
+            RemoteConnection: Connection to the server.
+
+        """
+        host, port = os.environ["AYON_TDE4_SERVER"].rsplit(":", 1)
+        return cls(host, int(port), os.environ["AYON_TDE4_SERVER_TOKEN"])
+
+    @classmethod
+    def from_info(cls, info: dict) -> RemoteConnection:
+        """Connect to the server described by `find_command_servers`.
+
+        Returns:
+            RemoteConnection: Connection to the server.
+
+        """
+        return cls(info["host"], info["port"], info["token"])
+
+    def call(self, method: str, *params: Any) -> Any:  # noqa: ANN401
+        """Call command in 3DEqualizer and wait for its result.
+
+        Args:
+            method (str): Name of the command.
+            *params (Any): Positional arguments of the command.
+
+        Returns:
+            Any: Result of the command.
+
+        Raises:
+            RemoteError: When the command failed.
+
+        """
+        request_id = next(self._ids)
+        request = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": list(params),
+        }
+        response = self._send(request)
+        if "error" in response:
+            msg = f"{method} failed: {response['error']['message']}"
+            raise RemoteError(msg)
+        return response.get("result")
+
+    def call_batch(
+            self,
+            calls: list[tuple[str, list]],
+    ) -> list[Any]:
+        """Call multiple commands in a single round-trip.
+
+        Args:
+            calls (list[tuple[str, list]]): Names and positional
+                arguments of the commands.
+
+        Returns:
+            list[Any]: Results in the order of `calls`.
+
+        Raises:
+            RemoteError: When any of the commands failed.
+
+        """
+        if not calls:
+            return []
+        index_by_id = {next(self._ids): index for index in range(len(calls))}
+        request = [
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": calls[index][0],
+                "params": list(calls[index][1]),
+            }
+            for request_id, index in index_by_id.items()
+        ]
+        responses = self._send(request)
+
+        results: list[Any] = [None] * len(calls)
+        for response in responses:
+            index = index_by_id.get(response.get("id"))
+            if index is None:
+                msg = f"Invalid batch: {response['error']['message']}"
+                raise RemoteError(msg)
+            if "error" in response:
+                method = calls[index][0]
+                msg = f"{method} failed: {response['error']['message']}"
+                raise RemoteError(msg)
+            results[index] = response.get("result")
+        return results
+
+    def _send(self, request: object) -> Any:  # noqa: ANN401
+        """Send request and return decoded response."""
+        with self._lock:
+            self._socket.sendall(json.dumps(request).encode() + b"\n")
+            line = self._stream.readline()
+        if not line:
+            msg = "Connection to 3DEqualizer was closed"
+            raise ConnectionError(msg)
+        return json.loads(line)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._stream.close()
+        self._socket.close()
+
+
+class Tde4Proxy(types.ModuleType):
+    """Module forwarding calls of `tde4` functions to 3DEqualizer.
+
+    Every attribute is considered to be a function. Arguments and results
+    are passed as JSON, so tuples are returned as lists.
+
+    Args:
+        connection (RemoteConnection): Connection to 3DEqualizer.
+
+    """
+
+    def __init__(self, connection: RemoteConnection) -> None:
+        """Initialize proxy."""
+        super().__init__("tde4")
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        """Return function calling `tde4.<name>` in 3DEqualizer."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        connection = self._connection
+        method = f"tde4.{name}"
+
+        def _call(*args: Any) -> Any:  # noqa: ANN401
+            return connection.call(method, *args)
+
+        _call.__name__ = name
+        # cache the function, so `__getattr__` isn't called again
+        setattr(self, name, _call)
+        return _call
+
+
+def install_tde4_proxy(connection: RemoteConnection) -> Tde4Proxy:
+    """Make `import tde4` use the proxy.
+
+    Must be called before anything importing `tde4` is imported.
+
+    Args:
+        connection (RemoteConnection): Connection to 3DEqualizer.
+
+    Returns:
+        Tde4Proxy: Installed proxy.
+
+    """
+    proxy = Tde4Proxy(connection)
+    sys.modules["tde4"] = proxy
+    return proxy
@@ -0,0 +1,274 @@
+"""Host used by AYON tools running in separate process.
+
+All AYON data are owned by `EqualizerHost` inside 3DEqualizer, this host
+only forwards calls to it through the command server, so tools running
+at the same time always see the same data.
+
+Changes done inside `metadata_transaction` are queued and sent together
+when it ends, they are executed in a single transaction in 3DEqualizer.
+
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+from typing import TYPE_CHECKING, Optional
+
+import pyblish.api
+from ayon_core.host import HostBase, ILoadHost, IPublishHost, IWorkfileHost
+from ayon_core.lib import register_event_callback
+from ayon_core.pipeline import (
+    register_creator_plugin_path,
+    register_loader_plugin_path,
+)
+
+from ayon_equalizer.api.host import CREATE_PATH, LOAD_PATH, PUBLISH_PATH
+from ayon_equalizer.api.scheduler import Task
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable
+    from typing import Any
+
+    from ayon_equalizer.api.pipeline import Container
+    from ayon_equalizer.remote.client import RemoteConnection
+
+# environment defining current context, shared with 3DEqualizer
+CONTEXT_ENV_KEYS = (
+    "AYON_PROJECT_NAME",
+    "AYON_FOLDER_PATH",
+    "AYON_TASK_NAME",
+    "AYON_WORKDIR",
+)
+
+
+class EqualizerProxyHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
+    """3DEqualizer host forwarding calls to 3DEqualizer process.
+
+    Args:
+        connection (RemoteConnection): Connection to 3DEqualizer.
+
+    """
+
+    name = "equalizer"
+
+    def __init__(self, connection: RemoteConnection) -> None:
+        """Initialize the host."""
+        self._connection = connection
+        # changes queued by `metadata_transaction`
+        self._transaction_depth = 0
+        self._transaction_calls: list[list] = []
+        super().__init__()
+
+    def _call(self, method: str, *params: object) -> object:
+        # data read inside transaction must include the queued changes
+        self._flush_transaction()
+        return self._connection.call(f"host.{method}", *params)
+
+    def _write(self, method: str, *params: object) -> None:
+        """Call command changing AYON data or queue it in transaction."""
+        if self._transaction_depth:
+            self._transaction_calls.append([f"host.{method}", list(params)])
+        else:
+            self._call(method, *params)
+
+    def _flush_transaction(self) -> None:
+        """Send queued changes to be executed in a single transaction."""
+        calls, self._transaction_calls = self._transaction_calls, []
+        if calls:
+            self._connection.call("host.transaction", calls)
+
+    def install(self) -> None:
+        """Install the host."""
+        pyblish.api.register_host("equalizer")
+
+        pyblish.api.register_plugin_path(PUBLISH_PATH)
+        register_loader_plugin_path(LOAD_PATH)
+        register_creator_plugin_path(CREATE_PATH)
+
+        # context could be changed in 3DEqualizer since the tool started
+        env = self._call("get_environment", list(CONTEXT_ENV_KEYS))
+        for key, value in env.items():
+            if value is not None:
+                os.environ[key] = value
+        register_event_callback("taskChanged", self._on_task_changed)
+
+    def _on_task_changed(self) -> None:
+        """Propagate context changed in the tool to 3DEqualizer."""
+        self._call("update_environment", {
+            key: os.environ[key]
+            for key in CONTEXT_ENV_KEYS
+            if key in os.environ
+        })
+
+    def get_main_window(self) -> None:
+        """Tools don't have parent window outside of 3DEqualizer."""
+        return
+
+    def workfile_has_unsaved_changes(self) -> bool:
+        """Return the state of the current workfile."""
+        return self._call("workfile_has_unsaved_changes")
+
+    def workfile_has_only_ayon_changes(self) -> bool:
+        """Return whether AYON data are the only unsaved changes."""
+        return self._call("workfile_has_only_ayon_changes")
+
+    def get_workfile_extensions(self) -> list[str]:
+        """Return the workfile extensions for 3DEqualizer."""
+        return [".3de"]
+
+    def save_workfile(self, dst_path: Optional[str] = None) -> str:
+        """Save the current workfile."""
+        return self._call("save_workfile", dst_path)
+
+    def open_workfile(self, filepath: str) -> str:
+        """Open a workfile in 3DEqualizer."""
+        return self._call("open_workfile", filepath)
+
+    def get_current_workfile(self) -> str:
+        """Return the current workfile path."""
+        return self._call("get_current_workfile")
+
+    def get_containers(self) -> list[dict]:
+        """Get containers from the current workfile."""
+        return self._call("get_containers")
+
+    def get_container(self, name: str, namespace: str) -> Optional[dict]:
+        """Get a container by its name and namespace."""
+        return self._call("get_container", name, namespace)
+
+    def add_container(self, container: Container) -> None:
+        """Add or replace a container in the current workfile."""
+        self.add_containers([container])
+
+    def add_containers(self, containers: Iterable[Container]) -> None:
+        """Add or replace multiple containers with a single write."""
+        self._write(
+            "add_containers",
+            [container.to_dict() for container in containers])
+
+    def remove_container(self, name: str, namespace: str) -> None:
+        """Remove a container from the current workfile."""
+        self._write("remove_container", name, namespace)
+
+    @contextlib.contextmanager
+    def metadata_transaction(
+            self) -> Generator[EqualizerProxyHost, None, None]:
+        """Batch changes of AYON data into a single command.
+
+        Changes are sent when the outermost transaction ends and written
+        by `EqualizerHost.metadata_transaction` in 3DEqualizer. Reading
+        AYON data inside the transaction sends the changes queued so
+        far, which then can't be discarded. If an exception is raised,
+        changes not sent yet are discarded.
+
+        Yields:
+            EqualizerProxyHost: The host itself.
+
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._transaction_calls = []
+            raise
+
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self._flush_transaction()
+
+    def defer_metadata_write(self) -> None:
+        """Postpone writing of AYON data in 3DEqualizer."""
+        self._call("defer_metadata_write")
+
+    def get_ayon_data(self) -> dict:
+        """Get AYON data from the current project."""
+        return self._call("get_ayon_data")
+
+    def update_ayon_data(self, data: dict) -> None:
+        """Update AYON data in the current project."""
+        self._write("update_ayon_data", data)
+
+    def get_context_data(self) -> dict:
+        """Get context data from the current project."""
+        return self._call("get_context_data")
+
+    def update_context_data(self, data: dict, changes: dict) -> None:
+        """Update context data in the current project."""
+        self._write("update_context_data", data)
+
+    def get_publish_instances(self) -> list[dict]:
+        """Get publish instances from the current project."""
+        return self._call("get_publish_instances")
+
+    def get_publish_instance(self, instance_id: str) -> Optional[dict]:
+        """Get a publish instance by its id."""
+        return self._call("get_publish_instance", instance_id)
+
+    def add_publish_instance(self, instance_data: dict) -> None:
+        """Add a publish instance to the current project."""
+        self._write("add_publish_instance", instance_data)
+
+    def update_publish_instance(self, instance_id: str, data: dict) -> None:
+        """Update a publish instance in the current project."""
+        self._write("update_publish_instance", instance_id, data)
+
+    def patch_publish_instance(
+            self,
+            instance_id: str,
+            changed: dict,
+            removed_keys: Iterable[str] = (),
+            data: Optional[dict] = None,
+    ) -> bool:
+        """Apply changed keys to a stored publish instance.
+
+        Inside transaction the result isn't known yet and True is
+        returned, pass `data` to store instance which isn't stored.
+        """
+        params = (instance_id, changed, list(removed_keys), data)
+        if self._transaction_depth:
+            self._write("patch_publish_instance", *params)
+            return True
+        return self._call("patch_publish_instance", *params)
+
+    def write_create_instances(self, instances: list[dict]) -> None:
+        """Write publish instances to the current project."""
+        self._write("write_create_instances", instances)
+
+    def remove_create_instance(self, instance_id: str) -> None:
+        """Remove a publish instance from the current project."""
+        self._write("remove_create_instance", instance_id)
+
+    def run_task(
+            self,
+            generator: Generator[Optional[float], None, Any],
+            label: str = "",
+            on_progress: Optional[Callable[[Task], None]] = None,
+            on_done: Optional[Callable[[Task], None]] = None,
+    ) -> Task:
+        """Run long operation right away.
+
+        Tool process doesn't block 3DEqualizer, which handles other
+        requests between the calls of the operation.
+        """
+        task = Task(generator, label, on_progress, on_done)
+        task.run()
+        return task
+
+    def run_export(self, name: str, kwargs: dict) -> object:
+        """Run export script in 3DEqualizer."""
+        return self._call("run_export", name, kwargs)
+
+    def launch_background_publish(
+            self,
+            metadata_path: str,
+            remove_dir: bool = False,  # noqa: FBT001, FBT002
+    ) -> dict:
+        """Integrate extracted instances in process started by 3DE."""
+        return self._call(
+            "launch_background_publish", metadata_path, remove_dir)
+
+    def get_background_publishes(self) -> list[dict]:
+        """Get state of background publishes started by 3DEqualizer."""
+        return self._call("get_background_publishes")
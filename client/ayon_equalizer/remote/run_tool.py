@@ -0,0 +1,57 @@
+"""Run AYON tool in separate process connected to 3DEqualizer.
+
+Started by `EqualizerHost.launch_tool` through AYON launcher, tool name,
+its options and address of the command server are passed in environment.
+
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+from ayon_equalizer.remote.client import RemoteConnection, install_tde4_proxy
+
+# interval of checking that 3DEqualizer is still running
+PING_INTERVAL = 5000
+
+
+def main() -> int:
+    """Connect to 3DEqualizer and show the tool.
+
+    Returns:
+        int: Exit code of the Qt application.
+
+    """
+    connection = RemoteConnection.from_env()
+    # must be done before importing anything using tde4
+    install_tde4_proxy(connection)
+
+    from ayon_core.pipeline import install_host
+    from ayon_core.tools.utils import host_tools
+    from qtpy import QtCore, QtWidgets
+
+    from ayon_equalizer.remote.host import EqualizerProxyHost
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(
+        sys.argv)
+    install_host(EqualizerProxyHost(connection))
+
+    def _ping() -> None:
+        try:
+            connection.call("host.get_environment", [])
+        except OSError:
+            # 3DEqualizer was closed
+            app.quit()
+
+    timer = QtCore.QTimer()
+    timer.timeout.connect(_ping)
+    timer.start(PING_INTERVAL)
+
+    options = json.loads(os.getenv("AYON_TDE4_TOOL_OPTIONS") or "{}")
+    host_tools.show_tool_by_name(os.environ["AYON_TDE4_TOOL"], **options)
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
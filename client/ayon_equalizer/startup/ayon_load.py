@@ -6,9 +6,9 @@
 #
 
 from ayon_core.pipeline import install_host, is_installed
-from ayon_core.tools.utils import host_tools
 
 from ayon_equalizer.api import EqualizerHost
+from ayon_equalizer.api.host import TOOLS_MODE_PROCESS
 
 
 def install_3de_host() -> None:
@@ -21,7 +21,15 @@ if not is_installed():
     install_3de_host()
 
 # show the UI
-print("Opening loader window ...")  # noqa: T201
-host_tools.show_loader(
-    parent=EqualizerHost.get_host().get_main_window(),
-    use_context=True)
+host = EqualizerHost.get_host()
+if host.tools_mode == TOOLS_MODE_PROCESS:
+    print("Launching loader ...")  # noqa: T201
+    host.launch_tool("loader", use_context=True)
+else:
+    from ayon_core.tools.utils import host_tools
+
+    host.wake_heartbeat()
+    print("Opening loader window ...")  # noqa: T201
+    host_tools.show_loader(
+        parent=host.get_main_window(),
+        use_context=True)
@@ -6,9 +6,9 @@
 #
 
 from ayon_core.pipeline import install_host, is_installed
-from ayon_core.tools.utils import host_tools
 
 from ayon_equalizer.api import EqualizerHost
+from ayon_equalizer.api.host import TOOLS_MODE_PROCESS
 
 
 def install_3de_host() -> None:
@@ -21,6 +21,14 @@ if not is_installed():
     install_3de_host()
 
 # show the UI
-print("Opening Workfile tool window ...")  # noqa: T201
-host_tools.show_workfiles(
-    parent=EqualizerHost.get_host().get_main_window())
+host = EqualizerHost.get_host()
+if host.tools_mode == TOOLS_MODE_PROCESS:
+    print("Launching workfiles ...")  # noqa: T201
+    host.launch_tool("workfiles")
+else:
+    from ayon_core.tools.utils import host_tools
+
+    host.wake_heartbeat()
+    print("Opening Workfile tool window ...")  # noqa: T201
+    host_tools.show_workfiles(
+        parent=host.get_main_window())
@@ -0,0 +1,177 @@
+"""asyncio loop tests.
+
+Loop is stepped by heartbeat ticks the same way as in 3DEqualizer, with
+a stand-in of `tde4` and without Qt application.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import types
+import unittest
+from typing import Any, Callable, Optional
+from unittest import mock
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+from ayon_equalizer.api import heartbeat as heartbeat_module  # noqa: E402
+from ayon_equalizer.api import host as host_module  # noqa: E402
+from ayon_equalizer.api.async_loop import AsyncLoop  # noqa: E402
+from ayon_equalizer.api.heartbeat import Heartbeat  # noqa: E402
+from ayon_equalizer.api.host import EqualizerHost  # noqa: E402
+from ayon_equalizer.api.pipeline import Container  # noqa: E402
+from ayon_equalizer.test.test_metadata import Tde4Notes  # noqa: E402
+
+# seconds to wait for worker threads
+TIMEOUT = 5.0
+
+
+class HeartbeatLoopTestCase(unittest.TestCase):
+    """Heartbeat without Qt stepping the loop."""
+
+    def setUp(self) -> None:
+        """Create heartbeat."""
+        for name, value in (
+            ("tde4", mock.Mock()),
+            ("_get_application", lambda: None),
+        ):
+            patcher = mock.patch.object(heartbeat_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.heartbeat = Heartbeat("timer")
+        self.done: list[tuple[Any, Optional[BaseException], int]] = []
+
+    def on_done(self, result: Any, error: Optional[BaseException]) -> None:  # noqa: ANN401
+        """Record the result and the thread it was reported on."""
+        self.done.append((result, error, threading.get_ident()))
+
+    def tick_until(self, condition: Callable[[], bool]) -> None:
+        """Tick the heartbeat until the condition is met."""
+        deadline = time.monotonic() + TIMEOUT
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("Timed out waiting for the loop")
+            self.heartbeat.tick()
+            time.sleep(0.001)
+
+
+class TestAsyncLoop(HeartbeatLoopTestCase):
+    """Test results are reported on the heartbeat thread."""
+
+    def setUp(self) -> None:
+        """Create loop stepped by the heartbeat."""
+        super().setUp()
+        self.loop = AsyncLoop()
+        self.addCleanup(self.loop.close)
+        self.heartbeat.add_callback(self.loop.step)
+
+    def test_executor(self) -> None:
+        """Test function runs in worker and on_done on main thread."""
+        worker_threads = []
+
+        def func(value: int) -> int:
+            worker_threads.append(threading.get_ident())
+            return value * 2
+
+        self.loop.run_in_executor(func, 21, on_done=self.on_done)
+        self.tick_until(lambda: self.done)
+        assert self.done == [(42, None, threading.get_ident())]  # noqa: S101
+        assert worker_threads != [threading.get_ident()]  # noqa: S101
+
+    def test_executor_error(self) -> None:
+        """Test exception of the function is passed to on_done."""
+        def func() -> None:
+            msg = "server error"
+            raise ValueError(msg)
+
+        self.loop.run_in_executor(func, on_done=self.on_done)
+        self.tick_until(lambda: self.done)
+        result, error, thread = self.done[0]
+        assert result is None  # noqa: S101
+        assert isinstance(error, ValueError)  # noqa: S101
+        assert thread == threading.get_ident()  # noqa: S101
+
+    def test_coroutine(self) -> None:
+        """Test coroutine is advanced by ticks."""
+        async def coroutine() -> str:
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return "done"
+
+        future = self.loop.run(coroutine(), on_done=self.on_done)
+        self.heartbeat.tick()
+        assert not future.done()  # noqa: S101
+        self.tick_until(lambda: self.done)
+        assert self.done == [("done", None, threading.get_ident())]  # noqa: S101
+        # nothing is pending, adaptive heartbeat can back off
+        assert not self.loop.step()  # noqa: S101
+
+    def test_call_in_main_thread(self) -> None:
+        """Test calls from other threads are drained by the next tick."""
+        called = []
+
+        def call() -> None:
+            self.loop.call_in_main_thread(
+                lambda: called.append(threading.get_ident()))
+
+        thread = threading.Thread(target=call)
+        thread.start()
+        thread.join(TIMEOUT)
+        assert called == []  # noqa: S101
+        self.heartbeat.tick()
+        assert called == [threading.get_ident()]  # noqa: S101
+
+
+class TestOutdatedContainers(HeartbeatLoopTestCase):
+    """Test host checks versions of containers in worker thread."""
+
+    def setUp(self) -> None:
+        """Create host with containers."""
+        super().setUp()
+        self.tde4 = Tde4Notes(project_path="/work/sh010.3de")
+        EqualizerHost._instance = None  # noqa: SLF001
+        self.host = EqualizerHost()
+        self.host._heartbeat = self.heartbeat  # noqa: SLF001
+        self.addCleanup(lambda: self.host.get_async_loop().close())
+        self.check = mock.Mock(return_value={"r1"})
+        for name, value in (
+            ("tde4", self.tde4),
+            ("get_outdated_representation_ids", self.check),
+            ("_show_message", mock.Mock()),
+        ):
+            target = self.host if name == "_show_message" else host_module
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(
+            "os.environ", {"AYON_PROJECT_NAME": "project"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.host.add_containers([
+            Container(name="plate", namespace="plate_01", representation="r1"),
+            Container(name="model", namespace="model_01", representation="r2"),
+        ])
+
+    def test_notified(self) -> None:
+        """Test artist is notified about outdated containers."""
+        with self.assertLogs(self.host.log, "WARNING") as logs:
+            self.host._check_outdated_containers()  # noqa: SLF001
+            self.tick_until(lambda: self.host._show_message.called)  # noqa: SLF001
+        self.check.assert_called_once_with("project", {"r1", "r2"})
+        assert "plate_01" in logs.output[0]  # noqa: S101
+        assert "model_01" not in logs.output[0]  # noqa: S101
+
+    def test_workfile_changed(self) -> None:
+        """Test result for previous workfile is ignored."""
+        self.host._check_outdated_containers()  # noqa: SLF001
+        self.tde4.project_path = "/work/sh020.3de"
+        loop = self.host.get_async_loop()
+        self.tick_until(lambda: not loop.step())
+        self.host._show_message.assert_not_called()  # noqa: SLF001
+
+
+if __name__ == "__main__":
+    unittest.main()
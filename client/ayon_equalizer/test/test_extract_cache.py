@@ -0,0 +1,176 @@
+"""Extract cache tests."""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+from ayon_equalizer.api import host as host_module  # noqa: E402
+from ayon_equalizer.api import plugin as plugin_module  # noqa: E402
+from ayon_equalizer.api.extract_cache import (  # noqa: E402
+    ExtractCache,
+    get_fingerprint,
+)
+from ayon_equalizer.api.host import EqualizerHost  # noqa: E402
+from ayon_equalizer.api.plugin import ExtractCacheMixin  # noqa: E402
+from ayon_equalizer.test.test_metadata import Tde4Notes  # noqa: E402
+
+
+class Tde4Project(Tde4Notes):
+    """Stand-in of `tde4` tracking unsaved changes of the project."""
+
+    def __init__(self, project_path: str) -> None:
+        """Initialize saved project."""
+        super().__init__(project_path=project_path)
+        self.up_to_date = 1
+        self.save()
+
+    def save(self) -> None:
+        """Write the project file with new modification time."""
+        with open(self.project_path, "w", encoding="utf-8") as stream:
+            stream.write(self.notes)
+        stat = os.stat(self.project_path)
+        mtime = stat.st_mtime_ns + self.writes * 1_000_000_000
+        os.utime(self.project_path, ns=(mtime, mtime))
+        self.up_to_date = 1
+
+    def setProjectNotes(self, notes: str) -> None:  # noqa: N802
+        """Set project notes, which modifies the project."""
+        super().setProjectNotes(notes)
+        self.up_to_date = 0
+
+    def isProjectUpToDate(self) -> int:  # noqa: N802
+        """Return project state."""
+        return self.up_to_date
+
+
+class Extractor(ExtractCacheMixin):
+    """Extractor using the cache."""
+
+    log = mock.Mock()
+
+
+class TestExtractCache(unittest.TestCase):
+    """Test storing, restoring and eviction of extracted files."""
+
+    def setUp(self) -> None:
+        """Create cache and staging directory."""
+        self.root = tempfile.mkdtemp()
+        self.cache = ExtractCache(os.path.join(self.root, "cache"), 10)
+        self.staging_dir = os.path.join(self.root, "staging")
+        os.makedirs(self.staging_dir)
+
+    def tearDown(self) -> None:
+        """Remove the files."""
+        shutil.rmtree(self.root)
+
+    def _export(self, name: str, content: str) -> str:
+        path = os.path.join(self.staging_dir, name)
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        return path
+
+    def test_fingerprint(self) -> None:
+        """Test fingerprint doesn't depend on order of inputs."""
+        assert get_fingerprint({"a": 1, "b": [1, 2]}) == get_fingerprint(  # noqa: S101
+            {"b": [1, 2], "a": 1})
+        assert get_fingerprint({"a": 1}) != get_fingerprint({"a": 2})  # noqa: S101
+
+    def test_restore(self) -> None:
+        """Test stored files are restored."""
+        path = self._export("export.nk", "nuke")
+        assert not self.cache.restore("fp", self.staging_dir)  # noqa: S101
+        self.cache.store("fp", [path])
+        os.remove(path)
+        assert self.cache.restore("fp", self.staging_dir)  # noqa: S101
+        with open(path, encoding="utf-8") as stream:
+            assert stream.read() == "nuke"  # noqa: S101
+
+    def test_evict(self) -> None:
+        """Test the least recently used entry is removed over limit."""
+        self.cache.store("first", [self._export("first.nk", "1234")])
+        self.cache.store("second", [self._export("second.nk", "1234")])
+        first = os.path.join(self.cache.root, "first")
+        os.utime(first, (0, 0))
+        self.cache.store("third", [self._export("third.nk", "1234")])
+        assert sorted(os.listdir(self.cache.root)) == [  # noqa: S101
+            "second", "third"]
+
+
+class TestExportFingerprint(unittest.TestCase):
+    """Test cache is used only for projects without unsaved changes."""
+
+    def setUp(self) -> None:
+        """Create saved project and host."""
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.tde4 = Tde4Project(os.path.join(self.root, "sh010.3de"))
+        EqualizerHost._instance = None  # noqa: SLF001
+        self.host = EqualizerHost()
+        for module, name, value in (
+            (host_module, "tde4", self.tde4),
+            (plugin_module, "tde4", self.tde4),
+            (plugin_module, "registered_host", lambda: self.host),
+            (plugin_module, "get_extract_cache", mock.Mock()),
+            (plugin_module, "get_exporter_digest", lambda _path: "digest"),
+        ):
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.instance = types.SimpleNamespace(
+            context=types.SimpleNamespace(data={}))
+
+    def _fingerprint(self) -> str:
+        return Extractor().get_export_fingerprint(
+            self.instance, "export_nuke.py", {"camera": "c1"})
+
+    def test_saved_project(self) -> None:
+        """Test fingerprint changes when the project is saved."""
+        fingerprint = self._fingerprint()
+        assert fingerprint is not None  # noqa: S101
+        self.tde4.save()
+        assert self._fingerprint() not in (None, fingerprint)  # noqa: S101
+
+    def test_unsaved_project(self) -> None:
+        """Test cache isn't used for project with unsaved changes."""
+        self.tde4.up_to_date = 0
+        assert self._fingerprint() is None  # noqa: S101
+
+    def test_ayon_changes(self) -> None:
+        """Test writes of AYON data don't disable the cache."""
+        fingerprint = self._fingerprint()
+        self.host.update_context_data({"variant": "Main"}, {})
+        assert not self.tde4.isProjectUpToDate()  # noqa: S101
+        assert self._fingerprint() == fingerprint  # noqa: S101
+
+    def test_ayon_changes_of_unsaved_project(self) -> None:
+        """Test AYON write doesn't hide changes done before it."""
+        self.tde4.up_to_date = 0
+        self.host.update_context_data({"variant": "Main"}, {})
+        assert self._fingerprint() is None  # noqa: S101
+
+    def test_saved_after_ayon_changes(self) -> None:
+        """Test project changed after save from 3DEqualizer isn't cached."""
+        self.host.update_context_data({"variant": "Main"}, {})
+        self.tde4.save()
+        self.tde4.up_to_date = 0
+        assert self._fingerprint() is None  # noqa: S101
+
+    def test_reloaded_after_ayon_changes(self) -> None:
+        """Test project loaded again from disk isn't cached."""
+        saved_notes = self.tde4.notes
+        self.host.update_context_data({"variant": "Main"}, {})
+        self.tde4.notes = saved_notes
+        self.tde4.up_to_date = 0
+        assert self._fingerprint() is None  # noqa: S101
+
+
+if __name__ == "__main__":
+    unittest.main()
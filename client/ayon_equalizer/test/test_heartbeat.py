@@ -0,0 +1,362 @@
+"""Heartbeat tests.
+
+Heartbeat is driven by a fake Qt application, fake clock and a stand-in
+of `tde4` recording registration of the timer callback.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+from ayon_equalizer.api import heartbeat as heartbeat_module  # noqa: E402
+from ayon_equalizer.api.heartbeat import (  # noqa: E402
+    HEARTBEAT_MODE_ADAPTIVE,
+    Heartbeat,
+    HeartbeatSample,
+    HeartbeatStats,
+)
+from ayon_equalizer.api.host import EqualizerHost  # noqa: E402
+
+ALL_EVENTS = 0
+
+
+class FakeClock:
+    """Clock advanced only by the fake application."""
+
+    def __init__(self) -> None:
+        """Initialize clock."""
+        self.now = 0.0
+
+    def perf_counter(self) -> float:
+        """Return current time in seconds."""
+        return self.now
+
+
+class FakeWidget:
+    """Top level widget with visibility."""
+
+    def __init__(self, visible: bool) -> None:  # noqa: FBT001
+        """Initialize widget."""
+        self.visible = visible
+
+    def isVisible(self) -> bool:  # noqa: N802
+        """Return visibility."""
+        return self.visible
+
+
+class FakeEventCounter:
+    """Event filter counting events processed by the fake application."""
+
+    count = 0
+
+
+class FakeApp:
+    """Qt application recording processing of events."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        """Initialize application."""
+        self.clock = clock
+        self.widgets: list[FakeWidget] = []
+        self.pending = False
+        self.process_calls: list[tuple] = []
+        # seconds a call of `processEvents` takes
+        self.process_time = 0.0
+        # events processed by a call of `processEvents`
+        self.events = 0
+        self.filters: list[FakeEventCounter] = []
+
+    def processEvents(self, *args: int) -> None:  # noqa: N802
+        """Record the call and let the time pass."""
+        self.process_calls.append(args)
+        self.clock.now += self.process_time
+        for event_filter in self.filters:
+            event_filter.count += self.events
+
+    def installEventFilter(self, event_filter: FakeEventCounter) -> None:  # noqa: N802
+        """Install event filter."""
+        self.filters.append(event_filter)
+
+    def removeEventFilter(self, event_filter: FakeEventCounter) -> None:  # noqa: N802
+        """Remove event filter."""
+        self.filters.remove(event_filter)
+
+    def topLevelWidgets(self) -> list[FakeWidget]:  # noqa: N802
+        """Return top level widgets."""
+        return self.widgets
+
+    def hasPendingEvents(self) -> bool:  # noqa: N802
+        """Return whether there are pending events."""
+        return self.pending
+
+
+class HeartbeatTestCase(unittest.TestCase):
+    """Patch Qt, clock and `tde4` used by the heartbeat."""
+
+    def setUp(self) -> None:
+        """Create fake application."""
+        self.tde4 = mock.Mock()
+        self.clock = FakeClock()
+        self.app = FakeApp(self.clock)
+        qt_core = types.SimpleNamespace(
+            QEventLoop=types.SimpleNamespace(AllEvents=ALL_EVENTS))
+        for name, value in (
+            ("tde4", self.tde4),
+            ("time", self.clock),
+            ("QtCore", qt_core),
+            ("_get_application", lambda: self.app),
+        ):
+            patcher = mock.patch.object(heartbeat_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def registered(self) -> list[int]:
+        """Return intervals the timer callback was registered with."""
+        return [
+            call[0][1]
+            for call in self.tde4.setTimerCallbackFunction.call_args_list
+        ]
+
+
+class TestAdaptive(HeartbeatTestCase):
+    """Test interval backs off when idle and resets when active."""
+
+    def setUp(self) -> None:
+        """Create and start adaptive heartbeat."""
+        super().setUp()
+        self.heartbeat = Heartbeat(
+            "timer", 100, idle_interval=500, mode=HEARTBEAT_MODE_ADAPTIVE)
+        self.heartbeat.start()
+
+    def test_back_off(self) -> None:
+        """Test interval doubles up to the idle interval."""
+        for _ in range(5):
+            self.heartbeat.tick()
+        assert self.heartbeat.current_interval == 500  # noqa: PLR2004, S101
+        # re-registered only when the interval changed
+        assert self.registered() == [100, 200, 400, 500]  # noqa: S101
+
+    def test_visible_window(self) -> None:
+        """Test visible window switches back to the fast interval."""
+        self.heartbeat.tick()
+        self.heartbeat.tick()
+        self.app.widgets.append(FakeWidget(visible=True))
+        self.heartbeat.tick()
+        self.heartbeat.tick()
+        assert self.registered() == [100, 200, 400, 100]  # noqa: S101
+
+    def test_hidden_window(self) -> None:
+        """Test hidden window doesn't keep the fast interval."""
+        self.app.widgets.append(FakeWidget(visible=False))
+        self.heartbeat.tick()
+        assert self.heartbeat.current_interval == 200  # noqa: PLR2004, S101
+
+    def test_pending_events(self) -> None:
+        """Test pending events switch back to the fast interval."""
+        self.heartbeat.tick()
+        self.app.pending = True
+        self.heartbeat.tick()
+        assert self.registered() == [100, 200, 100]  # noqa: S101
+
+    def test_busy_callback(self) -> None:
+        """Test callback with more work keeps the fast interval."""
+        self.heartbeat.add_callback(lambda: True)
+        self.heartbeat.tick()
+        self.heartbeat.tick()
+        assert self.registered() == [100]  # noqa: S101
+
+    def test_wake(self) -> None:
+        """Test wake switches to the fast interval only once."""
+        self.heartbeat.tick()
+        self.heartbeat.wake()
+        self.heartbeat.wake()
+        assert self.registered() == [100, 200, 100]  # noqa: S101
+
+    def test_fixed_mode(self) -> None:
+        """Test fixed mode never changes the interval."""
+        heartbeat = Heartbeat("timer", 100)
+        for _ in range(3):
+            heartbeat.tick()
+        assert heartbeat.current_interval == 100  # noqa: PLR2004, S101
+        assert self.registered() == [100]  # noqa: S101
+
+
+class TestBudget(HeartbeatTestCase):
+    """Test time spent processing events is limited."""
+
+    def _heartbeat(self, budget: int) -> Heartbeat:
+        heartbeat = Heartbeat(
+            "timer", 100, idle_interval=500,
+            mode=HEARTBEAT_MODE_ADAPTIVE, budget=budget)
+        heartbeat.start()
+        # back off, so it is visible when the fast interval is set
+        heartbeat.tick()
+        heartbeat.tick()
+        return heartbeat
+
+    def test_without_budget(self) -> None:
+        """Test events are processed without time limit."""
+        self._heartbeat(0)
+        assert self.app.process_calls[-1] == (ALL_EVENTS,)  # noqa: S101
+
+    def test_max_time(self) -> None:
+        """Test budget is passed as maximum time of processing."""
+        self._heartbeat(20)
+        assert self.app.process_calls[-1] == (ALL_EVENTS, 20)  # noqa: S101
+
+    def test_budget_used(self) -> None:
+        """Test tick using the whole budget keeps the fast interval."""
+        heartbeat = self._heartbeat(20)
+        self.app.process_time = 0.02
+        heartbeat.tick()
+        heartbeat.tick()
+        assert self.registered() == [100, 200, 400, 100]  # noqa: S101
+
+    def test_budget_not_used(self) -> None:
+        """Test tick within the budget keeps backing off."""
+        heartbeat = self._heartbeat(20)
+        self.app.process_time = 0.005
+        heartbeat.tick()
+        assert heartbeat.current_interval == 500  # noqa: PLR2004, S101
+
+
+def make_samples(count: int) -> list[HeartbeatSample]:
+    """Create samples with durations, jitter and events from 1 to count.
+
+    Jitter of every other sample is negative.
+    """
+    return [
+        HeartbeatSample(
+            timestamp=i * 100.0,
+            interval=100,
+            duration=float(i),
+            jitter=float(i if i % 2 else -i),
+            events=i,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class TestStats(unittest.TestCase):
+    """Test summary of collected samples."""
+
+    def test_summary(self) -> None:
+        """Test summary values of known samples."""
+        stats = HeartbeatStats()
+        for sample in make_samples(20):
+            stats.add(sample)
+        summary = stats.summary()
+        assert summary["ticks"] == 20  # noqa: PLR2004, S101
+        assert summary["duration_mean"] == 10.5  # noqa: PLR2004, S101
+        assert summary["duration_p95"] == 19  # noqa: PLR2004, S101
+        assert summary["duration_max"] == 20  # noqa: PLR2004, S101
+        assert summary["jitter_mean"] == 10.5  # noqa: PLR2004, S101
+        assert summary["jitter_max"] == 20  # noqa: PLR2004, S101
+        assert summary["events"] == 210  # noqa: PLR2004, S101
+        assert summary["events_mean"] == 10.5  # noqa: PLR2004, S101
+        assert math.isclose(summary["load"], 210 / 1900)  # noqa: S101
+        assert summary["histogram"] == [  # noqa: S101
+            (1, 1), (2, 1), (5, 3), (10, 5), (20, 10),
+            (50, 0), (100, 0), (200, 0), (500, 0), (None, 0),
+        ]
+
+    def test_empty(self) -> None:
+        """Test summary without samples."""
+        assert HeartbeatStats().summary() == {"ticks": 0}  # noqa: S101
+
+    def test_ring(self) -> None:
+        """Test only the most recent samples are kept."""
+        stats = HeartbeatStats()
+        for sample in make_samples(1500):
+            stats.add(sample)
+        assert len(stats.samples) == 1000  # noqa: PLR2004, S101
+        assert stats.samples[0].events == 501  # noqa: PLR2004, S101
+        assert stats.summary()["duration_max"] == 1500  # noqa: PLR2004, S101
+
+    def test_log_batches(self) -> None:
+        """Test samples are appended to the log in batches."""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        log_path = os.path.join(root, "heartbeat.jsonl")
+        with mock.patch.object(heartbeat_module.atexit, "register") as reg:
+            stats = HeartbeatStats(log_path=log_path)
+        reg.assert_called_once_with(stats.flush)
+
+        samples = make_samples(53)
+        for sample in samples[:49]:
+            stats.add(sample)
+        assert not os.path.exists(log_path)  # noqa: S101
+        stats.add(samples[49])
+        for sample in samples[50:]:
+            stats.add(sample)
+        with open(log_path, encoding="utf-8") as stream:
+            assert len(stream.readlines()) == 50  # noqa: PLR2004, S101
+
+        stats.flush()
+        with open(log_path, encoding="utf-8") as stream:
+            lines = [json.loads(line) for line in stream]
+        assert [line["events"] for line in lines] == list(range(1, 54))  # noqa: S101
+
+
+class TestTickStats(HeartbeatTestCase):
+    """Test ticks are measured."""
+
+    def test_sample(self) -> None:
+        """Test duration, jitter and events of ticks."""
+        patcher = mock.patch.object(
+            heartbeat_module, "_EventCounter", FakeEventCounter, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        stats = HeartbeatStats()
+        heartbeat = Heartbeat("timer", 100, stats=stats)
+        self.app.process_time = 0.002
+        self.app.events = 3
+        heartbeat.tick()
+        self.clock.now = 0.152
+        heartbeat.tick()
+
+        first, second = stats.samples
+        assert math.isclose(first.duration, 2.0)  # noqa: S101
+        assert first.jitter == 0  # noqa: S101
+        assert first.events == 3  # noqa: PLR2004, S101
+        assert math.isclose(second.jitter, 52.0)  # noqa: S101
+        assert self.app.filters == []  # noqa: S101
+
+
+class TestHostStats(unittest.TestCase):
+    """Test statistics are exposed by the host."""
+
+    def setUp(self) -> None:
+        """Create host."""
+        EqualizerHost._instance = None  # noqa: SLF001
+        self.host = EqualizerHost()
+
+    def test_disabled(self) -> None:
+        """Test there are no statistics without collecting them."""
+        assert self.host.get_heartbeat_stats() is None  # noqa: S101
+        self.host._heartbeat = Heartbeat("timer")  # noqa: SLF001
+        assert self.host.get_heartbeat_stats() is None  # noqa: S101
+        self.host.reset_heartbeat_stats()
+
+    def test_get_and_reset(self) -> None:
+        """Test summary is returned and reset drops samples."""
+        stats = HeartbeatStats()
+        self.host._heartbeat = Heartbeat("timer", stats=stats)  # noqa: SLF001
+        for sample in make_samples(3):
+            stats.add(sample)
+        assert self.host.get_heartbeat_stats()["ticks"] == 3  # noqa: PLR2004, S101
+        self.host.reset_heartbeat_stats()
+        assert self.host.get_heartbeat_stats() == {"ticks": 0}  # noqa: S101
+
+
+if __name__ == "__main__":
+    unittest.main()
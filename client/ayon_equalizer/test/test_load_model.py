@@ -0,0 +1,140 @@
+"""Model loader tests.
+
+Loader runs with a stand-in of `tde4` keeping project notes and models
+in memory.
+"""
+from __future__ import annotations
+
+import sys
+import types
+import unittest
+from unittest import mock
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+from ayon_core.pipeline.load import LoadError  # noqa: E402
+
+from ayon_equalizer.api import host as host_module  # noqa: E402
+from ayon_equalizer.api.host import EqualizerHost  # noqa: E402
+from ayon_equalizer.plugins.load import load_model  # noqa: E402
+from ayon_equalizer.plugins.load.load_model import LoadModel  # noqa: E402
+from ayon_equalizer.test.test_metadata import Tde4Notes  # noqa: E402
+
+CONTEXT = {
+    "representation": {"id": "repre", "context": {}},
+    "version": {"version": 1},
+    "path": "/model.obj",
+}
+
+
+class Tde4Models(Tde4Notes):
+    """Stand-in of `tde4` with models of a single point group."""
+
+    def __init__(self) -> None:
+        """Initialize project."""
+        super().__init__()
+        self.models: dict[str, str] = {}
+        self.imported: list[str] = []
+        self.broken: set[str] = set()
+
+    def getPGroupList(self) -> list[str]:  # noqa: N802
+        """Return point groups."""
+        return ["pg"]
+
+    def getPGroupSelectionFlag(self, _pg: str) -> int:  # noqa: N802
+        """Return selection of the point group."""
+        return 1
+
+    def create3DModel(self, _pg: str) -> str:  # noqa: N802
+        """Create model."""
+        model_id = f"model{len(self.models)}"
+        self.models[model_id] = model_id
+        return model_id
+
+    def set3DModelName(self, _pg: str, model_id: str, name: str) -> None:  # noqa: N802
+        """Rename model."""
+        self.models[model_id] = name
+
+    def get3DModelName(self, _pg: str, model_id: str) -> str:  # noqa: N802
+        """Return name of the model."""
+        return self.models[model_id]
+
+    def delete3DModel(self, _pg: str, model_id: str) -> None:  # noqa: N802
+        """Delete model."""
+        del self.models[model_id]
+
+    def importOBJ3DModel(self, _pg: str, _model: str, path: str) -> None:  # noqa: N802
+        """Import OBJ file."""
+        if path in self.broken:
+            msg = f"Cannot import {path}"
+            raise RuntimeError(msg)
+        self.imported.append(path)
+
+    def set3DModelRotationScale3D(self, *_args: object) -> None:  # noqa: N802
+        """Set rotation of the model."""
+
+
+class TestLoadModel(unittest.TestCase):
+    """Test models are imported by tasks of the host scheduler."""
+
+    def setUp(self) -> None:
+        """Create host and loader."""
+        self.tde4 = Tde4Models()
+        EqualizerHost._instance = None  # noqa: SLF001
+        self.host = EqualizerHost()
+        self.host._scheduler.budget = 0  # noqa: SLF001
+        for module, name, value in (
+            (host_module, "tde4", self.tde4),
+            (load_model, "tde4", self.tde4),
+            (load_model, "registered_host", lambda: self.host),
+            (LoadModel, "filepath_from_context",
+             lambda _self, context: context["path"]),
+        ):
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.loader = LoadModel(CONTEXT)
+
+    def _load(self, name: str) -> None:
+        self.loader.load(dict(CONTEXT, path=f"/{name}.obj"), name)
+
+    def test_import_per_tick(self) -> None:
+        """Test each model is imported on separate heartbeat tick."""
+        self.host._heartbeat = mock.Mock()  # noqa: SLF001
+        self._load("chair")
+        self._load("table")
+        assert self.tde4.imported == []  # noqa: S101
+        self.host._scheduler.step()  # noqa: SLF001
+        assert self.tde4.imported == ["/chair.obj"]  # noqa: S101
+        self.host._scheduler.step()  # noqa: SLF001
+        assert self.tde4.imported == ["/chair.obj", "/table.obj"]  # noqa: S101
+        while self.host._scheduler.step():  # noqa: SLF001
+            pass
+        names = [c["name"] for c in self.host.get_containers()]
+        assert names == ["chair", "table"]  # noqa: S101
+
+    def test_failed_import(self) -> None:
+        """Test model and container are removed when import fails."""
+        self.host._heartbeat = mock.Mock()  # noqa: SLF001
+        self.tde4.broken.add("/chair.obj")
+        self._load("chair")
+        with self.assertLogs(self.loader.log, "ERROR"):
+            self.host._scheduler.step()  # noqa: SLF001
+        assert self.tde4.models == {}  # noqa: S101
+        assert list(self.host.get_containers()) == []  # noqa: S101
+
+    def test_without_heartbeat(self) -> None:
+        """Test model is imported right away without heartbeat."""
+        self._load("chair")
+        assert self.tde4.imported == ["/chair.obj"]  # noqa: S101
+        self.tde4.broken.add("/table.obj")
+        with self.assertRaises(LoadError), \
+                self.assertLogs(self.loader.log, "ERROR"):  # noqa: PT027
+            self._load("table")
+        names = [c["name"] for c in self.host.get_containers()]
+        assert names == ["chair"]  # noqa: S101
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,377 @@
+"""AYON metadata storage tests.
+
+Host is tested with a stand-in of `tde4` keeping project notes in
+memory, so reading and writing of AYON data can be tested outside of
+3DEqualizer.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+from ayon_equalizer.api import host as host_module  # noqa: E402
+from ayon_equalizer.api.host import (  # noqa: E402
+    AYON_METADATA_FORMATS,
+    AYON_METADATA_REGEX,
+    AYON_METADATA_SCHEMA_VERSION,
+    AYON_METADATA_STORAGE_SIDECAR,
+    AYON_METADATA_ZLIB_PREFIX,
+    EqualizerHost,
+)
+from ayon_equalizer.api.pipeline import Container  # noqa: E402
+
+
+class Tde4Notes:
+    """Stand-in of `tde4` with project notes kept in memory."""
+
+    def __init__(self, notes: str = "", project_path: str = "") -> None:
+        """Initialize project."""
+        self.notes = notes
+        self.project_path = project_path
+        self.writes = 0
+        self.save_result = 1
+
+    def getProjectNotes(self) -> str:  # noqa: N802
+        """Return project notes."""
+        return self.notes
+
+    def setProjectNotes(self, notes: str) -> None:  # noqa: N802
+        """Set project notes."""
+        self.notes = notes
+        self.writes += 1
+
+    def updateGUI(self) -> None:  # noqa: N802
+        """Do nothing, there is no GUI."""
+
+    def isProjectUpToDate(self) -> int:  # noqa: N802
+        """Return project state."""
+        return 1
+
+    def getProjectPath(self) -> str:  # noqa: N802
+        """Return project path."""
+        return self.project_path
+
+    def saveProject(self, path: str, _flag: bool) -> int:  # noqa: N802, FBT001
+        """Pretend the project was saved."""
+        if self.save_result:
+            self.project_path = path
+        return self.save_result
+
+
+class MetadataTestCase(unittest.TestCase):
+    """Create fresh host with stand-in `tde4` for each test."""
+
+    notes = ""
+
+    def setUp(self) -> None:
+        """Create host."""
+        self.tde4 = Tde4Notes(self.notes)
+        patcher = mock.patch.object(host_module, "tde4", self.tde4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        EqualizerHost._instance = None  # noqa: SLF001
+        self.host = EqualizerHost()
+
+    def reload(self) -> None:
+        """Drop cached data, so next read parses the notes."""
+        self.host._invalidate_ayon_data()  # noqa: SLF001
+
+
+class TestFormats(MetadataTestCase):
+    """Test writing and reading data in every format."""
+
+    def test_round_trip(self) -> None:
+        """Test data read back are the same as written."""
+        data = {"context": {"folder": "/shots/sh010", "variant": "Main"}}
+        for metadata_format in AYON_METADATA_FORMATS:
+            with self.subTest(metadata_format=metadata_format):
+                self.host.metadata_format = metadata_format
+                self.host.update_ayon_data(data)
+                self.reload()
+                assert self.host.get_context_data() == data["context"]  # noqa: S101
+
+    def test_zlib_payload(self) -> None:
+        """Test zlib payload is stored compressed."""
+        self.host.metadata_format = "zlib"
+        self.host.update_context_data({"key": "value"}, {})
+        payload = AYON_METADATA_REGEX.search(self.tde4.notes)["context"]
+        assert payload.startswith(AYON_METADATA_ZLIB_PREFIX)  # noqa: S101
+
+    def test_containers(self) -> None:
+        """Test containers survive a round trip."""
+        self.host.add_containers([
+            Container(name="plate", namespace="sh010_plate_01"),
+            Container(name="model", namespace="sh010_model_01"),
+        ])
+        self.reload()
+        names = [c["name"] for c in self.host.get_containers()]
+        assert names == ["plate", "model"]  # noqa: S101
+
+
+class TestTransaction(MetadataTestCase):
+    """Test batching, nesting and rollback of changes."""
+
+    def test_single_write(self) -> None:
+        """Test nested transactions write the notes once."""
+        self.host.update_context_data({"key": "value"}, {})
+        writes = self.tde4.writes
+        with self.host.metadata_transaction():
+            self.host.add_publish_instance(
+                {"instance_id": "a", "creator_identifier": "c"})
+            with self.host.metadata_transaction():
+                self.host.add_publish_instance(
+                    {"instance_id": "b", "creator_identifier": "c"})
+            assert self.tde4.writes == writes  # noqa: S101
+        assert self.tde4.writes == writes + 1  # noqa: S101
+        self.reload()
+        ids = [i["instance_id"] for i in self.host.get_publish_instances()]
+        assert ids == ["a", "b"]  # noqa: S101
+
+    def test_rollback(self) -> None:
+        """Test failed transaction leaves stored data untouched."""
+        self.host.update_context_data({"key": "value"}, {})
+        notes = self.tde4.notes
+        with self.assertRaises(RuntimeError), \
+                self.host.metadata_transaction():  # noqa: PT027
+            self.host.update_context_data({"key": "changed"}, {})
+            self.host.add_publish_instance(
+                {"instance_id": "a", "creator_identifier": "c"})
+            msg = "failed"
+            raise RuntimeError(msg)
+        assert self.tde4.notes == notes  # noqa: S101
+        assert self.host.get_context_data() == {"key": "value"}  # noqa: S101
+        assert self.host.get_publish_instances() == []  # noqa: S101
+    def test_nested_rollback(self) -> None:
+        """Test failed nested transaction discards only its changes."""
+        with self.host.metadata_transaction():
+            self.host.add_publish_instance(
+                {"instance_id": "a", "creator_identifier": "c"})
+            with self.assertRaises(RuntimeError), \
+                    self.host.metadata_transaction():  # noqa: PT027
+                self.host.add_publish_instance(
+                    {"instance_id": "b", "creator_identifier": "c"})
+                msg = "failed"
+                raise RuntimeError(msg)
+        self.reload()
+        ids = [i["instance_id"] for i in self.host.get_publish_instances()]
+        assert ids == ["a"]  # noqa: S101
+
+
+class TestDeferredWrite(MetadataTestCase):
+    """Test changes of independent calls are written once."""
+
+    def test_flush_on_heartbeat(self) -> None:
+        """Test deferred changes are written by the heartbeat."""
+        self.host._heartbeat = mock.Mock()  # noqa: SLF001
+        self.host.update_context_data({"key": "value"}, {})
+        writes = self.tde4.writes
+        for name in ("plate", "model"):
+            self.host.defer_metadata_write()
+            self.host.add_container(
+                Container(name=name, namespace=f"sh010_{name}_01"))
+        assert self.tde4.writes == writes  # noqa: S101
+        self.host._flush_deferred_metadata()  # noqa: SLF001
+        assert self.tde4.writes == writes + 1  # noqa: S101
+        self.reload()
+        assert len(list(self.host.get_containers())) == 2  # noqa: PLR2004, S101
+
+    def test_project_switched(self) -> None:
+        """Test deferred changes are not written to another project."""
+        self.host._heartbeat = mock.Mock()  # noqa: SLF001
+        self.tde4.project_path = "/work/sh010.3de"
+        self.host.update_context_data({"key": "value"}, {})
+        self.host.defer_metadata_write()
+        self.host.add_container(
+            Container(name="plate", namespace="sh010_plate_01"))
+        # artist opens another project from 3DEqualizer menu
+        self.tde4.project_path = "/work/sh020.3de"
+        self.tde4.notes = ""
+        self.host._flush_deferred_metadata()  # noqa: SLF001
+        assert "sh010_plate_01" not in self.tde4.notes  # noqa: S101
+        assert list(self.host.get_containers()) == []  # noqa: S101
+
+    def test_notes_replaced(self) -> None:
+        """Test deferred changes are dropped when notes were replaced."""
+        self.host._heartbeat = mock.Mock()  # noqa: SLF001
+        self.host.update_context_data({"key": "value"}, {})
+        notes = self.tde4.notes.replace("value", "reloaded")
+        self.host.defer_metadata_write()
+        self.host.update_context_data({"key": "changed"}, {})
+        self.tde4.notes = notes
+        self.host._flush_deferred_metadata()  # noqa: SLF001
+        assert self.tde4.notes == notes  # noqa: S101
+        assert self.host.get_context_data() == {"key": "reloaded"}  # noqa: S101
+
+    def test_failed_transaction(self) -> None:
+        """Test failed transaction keeps only the deferred changes."""
+        self.host._heartbeat = mock.Mock()  # noqa: SLF001
+        self.host.update_context_data({"key": "value"}, {})
+        self.host.defer_metadata_write()
+        self.host.add_container(
+            Container(name="plate", namespace="sh010_plate_01"))
+        with self.assertRaises(RuntimeError), \
+                self.host.metadata_transaction():  # noqa: PT027
+            self.host.add_container(
+                Container(name="model", namespace="sh010_model_01"))
+            msg = "failed"
+            raise RuntimeError(msg)
+        self.host._flush_deferred_metadata()  # noqa: SLF001
+        self.reload()
+        names = [c["name"] for c in self.host.get_containers()]
+        assert names == ["plate"]  # noqa: S101
+
+    def test_without_heartbeat(self) -> None:
+        """Test changes are written immediately without heartbeat."""
+        self.host.update_context_data({"key": "value"}, {})
+        writes = self.tde4.writes
+        self.host.defer_metadata_write()
+        self.host.add_container(
+            Container(name="plate", namespace="sh010_plate_01"))
+        assert self.tde4.writes == writes + 1  # noqa: S101
+
+
+class TestSplice(MetadataTestCase):
+    """Test text around AYON block is kept."""
+
+    notes = "Shot notes\nAYON_CONTEXT::{}::AYON_CONTEXT_END\nfooter"
+
+    def test_changed_around_block(self) -> None:
+        """Test block is found again when notes changed around it."""
+        self.host.update_context_data({"key": "value"}, {})
+        # artist edits the notes in 3DEqualizer
+        self.tde4.notes = f"Edited\n{self.tde4.notes}\nmore notes"
+        self.host.update_context_data({"key": "changed"}, {})
+
+        assert self.tde4.notes.startswith("Edited\nShot notes\n")  # noqa: S101
+        assert self.tde4.notes.endswith("footer\nmore notes")  # noqa: S101
+        assert self.tde4.notes.count("AYON_CONTEXT::") == 1  # noqa: S101
+        self.reload()
+        assert self.host.get_context_data() == {"key": "changed"}  # noqa: S101
+
+    def test_cache_kept(self) -> None:
+        """Test data are not parsed again for change outside the block."""
+        self.host.update_context_data({"key": "value"}, {})
+        self.tde4.notes = f"Edited\n{self.tde4.notes}"
+        with mock.patch.object(
+                host_module, "decode_ayon_data") as decode:
+            assert self.host.get_context_data() == {"key": "value"}  # noqa: S101
+        decode.assert_not_called()
+
+    def test_backslashes(self) -> None:
+        """Test payload is inserted literally, not as regex template."""
+        path = "C:\\shots\\a"
+        self.host.update_context_data({"path": path}, {})
+        self.host.update_context_data({"path": path, "key": "value"}, {})
+        self.reload()
+        assert self.host.get_context_data()["path"] == path  # noqa: S101
+
+
+class TestMigration(MetadataTestCase):
+    """Test migration of data stored by older versions."""
+
+    notes = "AYON_CONTEXT::{}::AYON_CONTEXT_END".format(json.dumps({
+        "context": {"key": "value"},
+        "containers": [
+            {"name": "plate", "namespace": "sh010_plate_01",
+             "loader": "LoadPlate"},
+            {"name": "broken"},
+        ],
+        "publish_instances": [
+            {"instance_id": "a", "creator_identifier": "c"},
+            {"instance_id": "b"},
+        ],
+    }))
+
+    def test_legacy_schema(self) -> None:
+        """Test containers are normalized and invalid items dropped."""
+        containers = list(self.host.get_containers())
+        assert containers == [Container(  # noqa: S101
+            name="plate", namespace="sh010_plate_01", loader="LoadPlate",
+        ).to_dict()]
+        ids = [i["instance_id"] for i in self.host.get_publish_instances()]
+        assert ids == ["a"]  # noqa: S101
+        assert self.host.get_context_data() == {"key": "value"}  # noqa: S101
+
+        # migrated data are stored with the next write
+        self.host.update_context_data({"key": "changed"}, {})
+        payload = AYON_METADATA_REGEX.search(self.tde4.notes)["context"]
+        stored = json.loads(payload)
+        assert stored["schema_version"] == AYON_METADATA_SCHEMA_VERSION  # noqa: S101
+        assert len(stored["containers"]) == 1  # noqa: S101
+
+
+class TestSidecar(MetadataTestCase):
+    """Test AYON data stored in sidecar file."""
+
+    def setUp(self) -> None:
+        """Create host storing data in sidecar file."""
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.host.metadata_storage = AYON_METADATA_STORAGE_SIDECAR
+
+    def test_round_trip(self) -> None:
+        """Test data are written to sidecar file on save."""
+        path = os.path.join(self.root, "sh010.3de")
+        self.host.update_context_data({"key": "value"}, {})
+        self.host.save_workfile(path)
+        assert os.path.exists(  # noqa: S101
+            os.path.join(self.root, "sh010.ayon.json"))
+        assert not self.host.workfile_has_unsaved_changes()  # noqa: S101
+        self.reload()
+        assert self.host.get_context_data() == {"key": "value"}  # noqa: S101
+
+    def test_menu_save(self) -> None:
+        """Test changes since the last save are kept in the notes."""
+        path = os.path.join(self.root, "sh010.3de")
+        self.host.update_context_data({"key": "value"}, {})
+        self.host.save_workfile(path)
+        self.host.update_context_data({"key": "changed"}, {})
+        # artist saves and reopens the project from 3DEqualizer menu
+        self.reload()
+        assert self.host.get_context_data() == {"key": "changed"}  # noqa: S101
+
+    def test_failed_save(self) -> None:
+        """Test sidecar and pointer are not written if save fails."""
+        path = os.path.join(self.root, "sh010.3de")
+        self.host.update_context_data({"key": "value"}, {})
+        notes = self.tde4.notes
+        self.tde4.save_result = 0
+        with self.assertRaises(RuntimeError):  # noqa: PT027
+            self.host.save_workfile(path)
+        assert self.tde4.notes == notes  # noqa: S101
+        assert os.listdir(self.root) == []  # noqa: S101
+
+    def test_empty_path(self) -> None:
+        """Test project without path is not saved."""
+        self.host.update_context_data({"key": "value"}, {})
+        with self.assertRaises(RuntimeError):  # noqa: PT027
+            self.host.save_workfile()
+
+    def test_missing_sidecar(self) -> None:
+        """Test pointer to missing sidecar file is not overwritten."""
+        path = os.path.join(self.root, "sh010.3de")
+        self.host.update_context_data({"key": "value"}, {})
+        self.host.save_workfile(path)
+        os.remove(os.path.join(self.root, "sh010.ayon.json"))
+        notes = self.tde4.notes
+        self.reload()
+        with self.assertLogs(self.host.log, "ERROR"):
+            assert self.host.get_context_data() == {}  # noqa: S101
+        with self.assertRaises(RuntimeError):  # noqa: PT027
+            self.host.update_context_data({"key": "changed"}, {})
+        self.host.save_workfile(path)
+        assert self.tde4.notes == notes  # noqa: S101
+
+
+if __name__ == "__main__":
+    unittest.main()
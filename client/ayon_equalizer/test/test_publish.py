@@ -0,0 +1,210 @@
+"""Publish plugin tests.
+
+Plugins run on a scene snapshot created in the test, so they don't
+need 3DEqualizer.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+import pyblish.api  # noqa: E402
+from ayon_core.pipeline.publish import KnownPublishError  # noqa: E402
+
+from ayon_equalizer.api import export as export_module  # noqa: E402
+from ayon_equalizer.api import plugin as plugin_module  # noqa: E402
+from ayon_equalizer.api.exporters import clear_exporter_cache  # noqa: E402
+from ayon_equalizer.api.scene import (  # noqa: E402
+    CameraSnapshot,
+    SceneSnapshot,
+)
+from ayon_equalizer.plugins.publish import (  # noqa: E402
+    extract_matchmove_script_nuke,
+)
+from ayon_equalizer.plugins.publish.collect_camera_data import (  # noqa: E402
+    CollectCameraData,
+)
+from ayon_equalizer.plugins.publish.extract_matchmove_script_nuke import (  # noqa: E402
+    ExtractMatchmoveScriptNuke,
+)
+
+# stand-in of `export_nuke.py` writing the camera and the start frame
+# it was asked to export
+EXPORTER_CODE = """
+camera_id = tde4.getCurrentCamera()
+file_path = tde4.getWidgetValue(None, "file_browser")
+offset = tde4.getWidgetValue(None, "startframe_field")
+with open(file_path, "w") as stream:
+    stream.write(f"{camera_id} {offset}")
+"""
+
+
+def make_camera(camera_id: str, **kwargs: object) -> CameraSnapshot:
+    """Create camera snapshot with default values."""
+    data = {
+        "id": camera_id,
+        "name": camera_id,
+        "enabled": True,
+        "type": "SEQUENCE",
+        "path": f"/plates/{camera_id}.####.exr",
+        "fps": 24.0,
+        "fov": (0.0, 1.0, 0.0, 1.0),
+        "frame_offset": 1001,
+        "calculation_range": (1, 10),
+        "playback_range": (1, 10),
+    }
+    data.update(kwargs)
+    return CameraSnapshot(**data)
+
+
+def make_instance(
+        scene: SceneSnapshot, data: dict) -> pyblish.api.Instance:
+    """Create matchmove instance in context with the scene."""
+    context = pyblish.api.Context()
+    context.data["sceneSnapshot"] = scene
+    instance = context.create_instance("matchmoveMain")
+    instance.data.update(data)
+    return instance
+
+
+class TestCollectCameraData(unittest.TestCase):
+    """Test cameras are collected from the snapshot."""
+
+    def setUp(self) -> None:
+        """Create scene with two cameras."""
+        self.scene = SceneSnapshot(
+            cameras=(
+                make_camera("c1"),
+                make_camera("c2", type="REF_FRAME"),
+            ),
+            point_groups=(),
+            current_camera="c2",
+        )
+
+    def _collect(self, selection: str) -> pyblish.api.Instance:
+        instance = make_instance(self.scene, {
+            "creator_attributes": {"camera_selection": selection},
+        })
+        CollectCameraData().process(instance)
+        return instance
+
+    def test_selection(self) -> None:
+        """Test cameras of each selection."""
+        for selection, expected in (
+            ("__all__", ["c1", "c2"]),
+            ("__current__", ["c2"]),
+            ("__ref__", ["c2"]),
+            ("c1", ["c1"]),
+        ):
+            with self.subTest(selection):
+                instance = self._collect(selection)
+                ids = [camera["id"] for camera in instance.data["cameras"]]
+                assert ids == expected  # noqa: S101
+
+    def test_no_current_camera(self) -> None:
+        """Test cameras are not collected without current camera."""
+        self.scene = self.scene._replace(current_camera=None)
+        with self.assertLogs(CollectCameraData.log, "WARNING"):
+            instance = self._collect("__current__")
+        assert "cameras" not in instance.data  # noqa: S101
+
+
+class TestExtractMatchmoveScriptNuke(unittest.TestCase):
+    """Test Nuke scripts are exported for every enabled camera."""
+
+    def setUp(self) -> None:
+        """Create export script and patch 3DEqualizer modules."""
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.addCleanup(clear_exporter_cache)
+        scripts_dir = os.path.join(self.root, "sys_data", "py_scripts")
+        os.makedirs(scripts_dir)
+        with open(os.path.join(scripts_dir, "export_nuke.py"), "w") as f:
+            f.write(EXPORTER_CODE)
+        self.staging_dir = os.path.join(self.root, "staging")
+        os.makedirs(self.staging_dir)
+
+        def get_current_camera() -> str:
+            return "current"
+
+        self.get_current_camera = get_current_camera
+        vl_sdv = types.ModuleType("vl_sdv")
+        vl_sdv.VL_APPLY_ZXY = vl_sdv.mat3d = vl_sdv.rot3d = None
+        host = types.SimpleNamespace(run_export=export_module.run_export)
+        for patcher in (
+            mock.patch.multiple(
+                export_module.tde4,
+                create=True,
+                getCurrentCamera=get_current_camera,
+                getWidgetValue=mock.Mock(),
+                postCustomRequester=mock.Mock(),
+                postQuestionRequester=mock.Mock(),
+            ),
+            mock.patch.dict(sys.modules, {"vl_sdv": vl_sdv}),
+            mock.patch.object(
+                extract_matchmove_script_nuke, "registered_host",
+                return_value=host),
+            mock.patch.object(
+                plugin_module, "get_extract_cache", return_value=None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _extract(self, *cameras: CameraSnapshot) -> pyblish.api.Instance:
+        scene = SceneSnapshot(
+            cameras=cameras, point_groups=(), current_camera="current")
+        instance = make_instance(scene, {
+            "cameras": [camera._asdict() for camera in cameras],
+            "stagingDir": self.staging_dir,
+        })
+        instance.context.data["tde4_path"] = Path(self.root)
+        ExtractMatchmoveScriptNuke().process(instance)
+        return instance
+
+    def _read(self, representation: dict) -> str:
+        path = os.path.join(
+            representation["stagingDir"], representation["files"])
+        with open(path, encoding="utf-8") as stream:
+            return stream.read()
+
+    def test_single_camera(self) -> None:
+        """Test single camera is exported to `nk` representation."""
+        instance = self._extract(
+            make_camera("c1"), make_camera("c2", enabled=False))
+        representations = instance.data["representations"]
+        assert [r["name"] for r in representations] == ["nk"]  # noqa: S101
+        assert "outputName" not in representations[0]  # noqa: S101
+        assert self._read(representations[0]) == "c1 1000"  # noqa: S101
+
+    def test_multiple_cameras(self) -> None:
+        """Test each camera is exported with its own frame offset."""
+        instance = self._extract(
+            make_camera("c1", name="main"),
+            make_camera("c2", name="witness cam", frame_offset=51),
+        )
+        representations = instance.data["representations"]
+        assert [  # noqa: S101
+            (r["name"], r["outputName"]) for r in representations
+        ] == [("nk_main", "main"), ("nk_witness_cam", "witness_cam")]
+        assert [  # noqa: S101
+            self._read(r) for r in representations
+        ] == ["c1 1000", "c2 50"]
+        assert export_module.tde4.getCurrentCamera is self.get_current_camera  # noqa: S101
+
+    def test_no_enabled_camera(self) -> None:
+        """Test publishing fails without enabled camera."""
+        with self.assertRaises(KnownPublishError):  # noqa: PT027
+            self._extract(make_camera("c1", enabled=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
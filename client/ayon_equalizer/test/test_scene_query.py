@@ -0,0 +1,211 @@
+"""Batch scene query tests.
+
+Queries and the command server are tested with a stand-in of `tde4`,
+so these tests can run outside of 3DEqualizer.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import unittest
+from typing import ClassVar
+
+
+class Tde4StandIn:
+    """Stand-in of `tde4` with a fixed scene."""
+
+    cameras: ClassVar[dict] = {
+        "c1": {"name": "plate", "type": "SEQUENCE", "range": [1, 100]},
+        "c2": {"name": "ref", "type": "REF_FRAME", "range": [1, 1]},
+    }
+    point_groups: ClassVar[dict] = {
+        "pg1": {"name": "camera", "type": "CAMERA", "models": ["m1"]},
+        "pg2": {"name": "object", "type": "OBJECT", "models": []},
+    }
+
+    def getCameraList(self) -> list[str]:  # noqa: N802
+        """Return camera ids."""
+        return list(self.cameras)
+
+    def getCameraName(self, camera: str) -> str:  # noqa: N802
+        """Return camera name."""
+        return self.cameras[camera]["name"]
+
+    def getCameraEnabledFlag(self, _camera: str) -> int:  # noqa: N802
+        """Return enabled flag."""
+        return 1
+
+    def getCameraType(self, camera: str) -> str:  # noqa: N802
+        """Return camera type."""
+        return self.cameras[camera]["type"]
+
+    def getCameraPath(self, camera: str) -> str:  # noqa: N802
+        """Return camera footage path."""
+        return f"/footage/{camera}.####.exr"
+
+    def getCameraFPS(self, _camera: str) -> float:  # noqa: N802
+        """Return camera fps."""
+        return 24.0
+
+    def getCameraFOV(self, _camera: str) -> tuple:  # noqa: N802
+        """Return camera fov."""
+        return (0.0, 1.0, 0.0, 1.0)
+
+    def getCameraNoFrames(self, camera: str) -> int:  # noqa: N802
+        """Return number of frames."""
+        start, end = self.cameras[camera]["range"]
+        return end - start + 1
+
+    def getCameraFrameOffset(self, _camera: str) -> int:  # noqa: N802
+        """Return frame offset."""
+        return 1001
+
+    def getCameraCalculationRange(self, camera: str) -> tuple:  # noqa: N802
+        """Return calculation range."""
+        return tuple(self.cameras[camera]["range"])
+
+    def getCameraPlaybackRange(self, camera: str) -> tuple:  # noqa: N802
+        """Return playback range."""
+        return tuple(self.cameras[camera]["range"])
+
+    def getPGroupList(self) -> list[str]:  # noqa: N802
+        """Return point group ids."""
+        return list(self.point_groups)
+
+    def getPGroupName(self, point_group: str) -> str:  # noqa: N802
+        """Return point group name."""
+        return self.point_groups[point_group]["name"]
+
+    def getPGroupType(self, point_group: str) -> str:  # noqa: N802
+        """Return point group type."""
+        return self.point_groups[point_group]["type"]
+
+    def getPGroupSelectionFlag(self, _point_group: str) -> int:  # noqa: N802
+        """Return point group selection flag."""
+        return 0
+
+    def get3DModelList(self, point_group: str, _selected: int) -> list:  # noqa: N802
+        """Return model ids of point group."""
+        return self.point_groups[point_group]["models"]
+
+    def get3DModelName(self, _point_group: str, model: str) -> str:  # noqa: N802
+        """Return model name."""
+        return f"{model}_mesh"
+
+    def getProjectPath(self) -> str:  # noqa: N802
+        """Return project path."""
+        return "/work/shot.3de"
+
+    def isProjectUpToDate(self) -> int:  # noqa: N802
+        """Return project state."""
+        return 1
+
+    def getCurrentCamera(self) -> str:  # noqa: N802
+        """Return current camera."""
+        return "c1"
+
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", Tde4StandIn())
+
+from ayon_equalizer.api.command_server import CommandServer  # noqa: E402
+from ayon_equalizer.api.scene_query import SceneQuery  # noqa: E402
+from ayon_equalizer.remote.client import (  # noqa: E402
+    RemoteConnection,
+    RemoteError,
+)
+
+
+class TestSceneQuery(unittest.TestCase):
+    """Test batch scene queries."""
+
+    def setUp(self) -> None:
+        """Create queries with stand-in backend."""
+        self.query = SceneQuery(Tde4StandIn())
+
+    def test_cameras(self) -> None:
+        """Test selected fields of all cameras."""
+        cameras = self.query.cameras(fields=["name", "playback_range"])
+        assert cameras == [  # noqa: S101
+            {"id": "c1", "name": "plate", "playback_range": (1, 100)},
+            {"id": "c2", "name": "ref", "playback_range": (1, 1)},
+        ]
+
+    def test_unknown_field(self) -> None:
+        """Test unknown field is rejected."""
+        with self.assertRaises(ValueError):  # noqa: PT027
+            self.query.cameras(fields=["focal_length"])
+
+    def test_query(self) -> None:
+        """Test multiple queries at once."""
+        result = self.query.query({
+            "point_groups": {"fields": ["type"]},
+            "models": None,
+            "project": None,
+        })
+        assert result["point_groups"] == [  # noqa: S101
+            {"id": "pg1", "type": "CAMERA"},
+            {"id": "pg2", "type": "OBJECT"},
+        ]
+        assert result["models"] == [  # noqa: S101
+            {"id": "m1", "name": "m1_mesh", "point_group": "pg1"},
+        ]
+        assert result["project"]["current_camera"] == "c1"  # noqa: S101
+
+
+class TestCommandServer(unittest.TestCase):
+    """Test command server with batch requests."""
+
+    def setUp(self) -> None:
+        """Start server polled from a thread."""
+        self.server = CommandServer()
+        SceneQuery(Tde4StandIn()).register(self.server)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll)
+        self._thread.start()
+        host, port = self.server.address
+        self.connection = RemoteConnection(host, port, self.server.token)
+
+    def tearDown(self) -> None:
+        """Stop the server."""
+        self.connection.close()
+        self._stop.set()
+        self._thread.join()
+        self.server.close()
+
+    def _poll(self) -> None:
+        while not self._stop.wait(0.001):
+            self.server.poll()
+
+    def test_call(self) -> None:
+        """Test single request."""
+        project = self.connection.call("scene.project")
+        assert project["path"] == "/work/shot.3de"  # noqa: S101
+
+    def test_batch(self) -> None:
+        """Test batch of requests in a single round-trip."""
+        cameras, point_groups = self.connection.call_batch([
+            ("scene.cameras", [["fps", "path"]]),
+            ("scene.point_groups", [["name"]]),
+        ])
+        assert cameras[0] == {  # noqa: S101
+            "id": "c1", "fps": 24.0, "path": "/footage/c1.####.exr"}
+        assert [pg["name"] for pg in point_groups] == [  # noqa: S101
+            "camera", "object"]
+
+    def test_error(self) -> None:
+        """Test failed command raises error."""
+        with self.assertRaises(RemoteError):  # noqa: PT027
+            self.connection.call("scene.unknown")
+
+    def test_invalid_token(self) -> None:
+        """Test connection with invalid token is closed."""
+        host, port = self.server.address
+        connection = RemoteConnection(host, port, "invalid")
+        with self.assertRaises(ConnectionError):  # noqa: PT027
+            connection.call("scene.project")
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
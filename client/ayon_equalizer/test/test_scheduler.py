@@ -0,0 +1,82 @@
+"""Task scheduler tests."""
+from __future__ import annotations
+
+import sys
+import types
+import unittest
+from typing import TYPE_CHECKING, Optional
+
+# `ayon_equalizer.api` imports `tde4` when imported
+sys.modules.setdefault("tde4", types.ModuleType("tde4"))
+
+from ayon_equalizer.api.scheduler import (  # noqa: E402
+    TASK_STATE_DONE,
+    TASK_STATE_FAILED,
+    Task,
+    TaskScheduler,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+
+class TestTaskScheduler(unittest.TestCase):
+    """Test running tasks and handling of failing callbacks."""
+
+    def setUp(self) -> None:
+        """Create scheduler and task."""
+        self.scheduler = TaskScheduler(budget=1000)
+        self.closed = False
+        self.done: list[Task] = []
+
+    def _steps(self, count: int) -> Generator[Optional[float], None, int]:
+        try:
+            for i in range(count):
+                yield (i + 1) / count
+        finally:
+            self.closed = True
+        return count
+
+    def test_done(self) -> None:
+        """Test task runs to the end and reports result."""
+        task = self.scheduler.submit(
+            self._steps(3), on_done=self.done.append)
+        assert not self.scheduler.step()  # noqa: S101
+        assert task.state == TASK_STATE_DONE  # noqa: S101
+        assert task.result == 3  # noqa: PLR2004, S101
+        assert self.done == [task]  # noqa: S101
+
+    def test_progress_callback_fails(self) -> None:
+        """Test task fails and is closed when progress callback raises."""
+        def on_progress(_task: Task) -> None:
+            msg = "progress"
+            raise RuntimeError(msg)
+
+        task = self.scheduler.submit(
+            self._steps(3),
+            on_progress=on_progress,
+            on_done=self.done.append,
+        )
+        with self.assertLogs("ayon_equalizer.api.scheduler", "ERROR"):
+            assert not self.scheduler.step()  # noqa: S101
+        assert task.state == TASK_STATE_FAILED  # noqa: S101
+        assert isinstance(task.error, RuntimeError)  # noqa: S101
+        assert self.closed  # noqa: S101
+        assert self.done == [task]  # noqa: S101
+
+    def test_done_callback_fails(self) -> None:
+        """Test failing done callback doesn't break the scheduler."""
+        def on_done(_task: Task) -> None:
+            msg = "done"
+            raise RuntimeError(msg)
+
+        task = self.scheduler.submit(self._steps(1), on_done=on_done)
+        other = self.scheduler.submit(self._steps(1))
+        with self.assertLogs("ayon_equalizer.api.scheduler", "ERROR"):
+            assert not self.scheduler.step()  # noqa: S101
+        assert task.state == TASK_STATE_DONE  # noqa: S101
+        assert other.state == TASK_STATE_DONE  # noqa: S101
+
+
+if __name__ == "__main__":
+    unittest.main()
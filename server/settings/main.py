@@ -7,6 +7,39 @@ from .creator_plugins import (
 )
 
 
+def heartbeat_mode_enum() -> list[dict[str, str]]:
+    """Return modes of passing control to Qt UI."""
+    return [
+        {"value": "fixed", "label": "Fixed interval"},
+        {"value": "adaptive", "label": "Adaptive"},
+    ]
+
+
+def tools_mode_enum() -> list[dict[str, str]]:
+    """Return modes of running AYON tools."""
+    return [
+        {"value": "host", "label": "Inside 3DEqualizer"},
+        {"value": "process", "label": "Separate process"},
+    ]
+
+
+def metadata_format_enum() -> list[dict[str, str]]:
+    """Return storage formats of AYON data in project notes."""
+    return [
+        {"value": "json", "label": "JSON"},
+        {"value": "compact", "label": "Compact JSON"},
+        {"value": "zlib", "label": "Compressed"},
+    ]
+
+
+def metadata_storage_enum() -> list[dict[str, str]]:
+    """Return storages of AYON data."""
+    return [
+        {"value": "notes", "label": "Project notes"},
+        {"value": "sidecar", "label": "Sidecar file"},
+    ]
+
+
 class EqualizerSettings(BaseSettingsModel):
     """3DEqualizer Addon Settings."""
 
@@ -18,6 +51,106 @@ class EqualizerSettings(BaseSettingsModel):
             "passed every 10x per second. Recommended value is 100 - 50 "
             "(20x per second).")
         )
+    heartbeat_mode: str = SettingsField(
+        "fixed", title="Heartbeat Mode",
+        enum_resolver=heartbeat_mode_enum,
+        description=(
+            "Adaptive mode uses Heartbeat Interval only while some AYON "
+            "window is visible. Otherwise the interval is doubled on "
+            "every tick up to Heartbeat Idle Interval, so less time is "
+            "taken from 3DEqualizer during tracking and solving.")
+        )
+    heartbeat_idle_interval: int = SettingsField(
+        500, title="Heartbeat Idle Interval",
+        description=(
+            "The longest interval in milliseconds to pass control to "
+            "Qt UI in adaptive mode when no AYON window is visible.")
+        )
+    heartbeat_budget: int = SettingsField(
+        0, title="Heartbeat Time Budget", ge=0,
+        description=(
+            "The maximum time in milliseconds spent processing Qt events "
+            "in one heartbeat, so busy AYON tools don't block "
+            "3DEqualizer UI. Remaining events are processed in the next "
+            "heartbeat. Zero means no limit.")
+        )
+    heartbeat_stats: bool = SettingsField(
+        default=False, title="Collect Heartbeat Statistics",
+        description=(
+            "Measure duration, jitter and number of processed Qt events "
+            "of recent heartbeats. If AYON_TDE4_HEARTBEAT_STATS_LOG "
+            "environment variable is set, every heartbeat is appended "
+            "to that file as a JSON line.")
+        )
+    task_budget: int = SettingsField(
+        20, title="Task Time Budget", ge=1,
+        description=(
+            "The time in milliseconds long running AYON operations can "
+            "run in one heartbeat before control is returned to "
+            "3DEqualizer.")
+        )
+    tools_mode: str = SettingsField(
+        "host", title="Tools Mode",
+        enum_resolver=tools_mode_enum,
+        description=(
+            "Run AYON tools in a separate process talking to 3DEqualizer "
+            "through a local socket, so their rendering and server "
+            "requests don't block 3DEqualizer and Qt doesn't have to be "
+            "installed into 3DEqualizer's Python.")
+        )
+    command_server: bool = SettingsField(
+        default=False, title="Command Server",
+        description=(
+            "Start local JSON-RPC server when AYON is installed in "
+            "3DEqualizer, so pipeline scripts can query scene data "
+            "in batches. Address and token of the server are written to "
+            "'ayon_equalizer/servers' in the temporary directory.")
+        )
+    command_server_port: int = SettingsField(
+        0, title="Command Server Port", ge=0, le=65535,
+        description="Port of the command server, 0 picks a free port."
+        )
+    background_publish: bool = SettingsField(
+        default=False, title="Background Publish",
+        description=(
+            "Integrate published files in a separate process, so "
+            "3DEqualizer can be used as soon as the files are extracted. "
+            "Output of the process is written next to its publish data "
+            "in the temporary directory.")
+        )
+    extract_cache: bool = SettingsField(
+        default=False, title="Extract Cache",
+        description=(
+            "Reuse files exported by previous publish of a saved project "
+            "if cameras, attributes and export script didn't change. "
+            "Files are cached in 'ayon_equalizer/extract_cache' in "
+            "the temporary directory.")
+        )
+    extract_cache_size: int = SettingsField(
+        1024, title="Extract Cache Size (MB)", ge=1,
+        description=(
+            "Maximum size of the extract cache, the least recently used "
+            "files are removed first.")
+        )
+    metadata_format: str = SettingsField(
+        "json", title="Metadata Format",
+        enum_resolver=metadata_format_enum,
+        description=(
+            "Format used to store AYON data in 3DEqualizer project notes. "
+            "Compact and compressed formats make workfiles smaller and "
+            "faster to parse on projects with many instances and "
+            "containers. All formats can be read regardless of this "
+            "setting, but older addon versions can read only JSON.")
+        )
+    metadata_storage: str = SettingsField(
+        "notes", title="Metadata Storage",
+        enum_resolver=metadata_storage_enum,
+        description=(
+            "Where to store AYON data. Sidecar file is written next to "
+            "the workfile when it is saved through AYON and project notes "
+            "keep only a pointer to it. Changes done since then are kept "
+            "in project notes until the next save through AYON.")
+        )
 
     create: EqualizerCreatorPlugins = SettingsField(
         default_factory=EqualizerCreatorPlugins,